@@ -1,12 +1,17 @@
+import time
+STARTED_AT = time.perf_counter()
+
 from flask import Flask, request, jsonify, send_from_directory, abort
 from flask_cors import CORS
-from pathlib import Path
-from scrape import get_info 
-import google.generativeai as genai
+from scrape import HandbookUnavailable, ScraperBusy, fetch_metrics
+from handbook_cache import HandbookOffline, get_info
 import json
 import os
+import sys
 
 
+# sklearn, nltk, matplotlib, selenium and google.generativeai are imported by the modules
+# below only when an endpoint first needs them, see startup_report()
 from core_planner import PlannerForCore, UserInfo
 from elective_planner import PlannerForElective
 from pass_info import PreviousDetails
@@ -14,9 +19,15 @@ from update_result import UpdateResult
 from update_units import ViewMenu
 from chat import UnitAdvisorAI
 from forum import ForumManager
+from resources_rec import SimpleResourceRecommender
 from utilities import initialize_user 
+from eligibility import check_eligibility, current_semester
+from session_cache import session_cache
+from storage import get_store
+from sentiment_model import model_registry
 
 import re
+import threading
 
 app = Flask(__name__, static_folder='static', static_url_path='')
 vm = ViewMenu()
@@ -25,6 +36,49 @@ CORS(app)
 # Initialize global UpdateResult instance
 update_result = UpdateResult()
 
+# Load the sentiment model in the background at import (for WSGI workers), off by default so
+# importing the app never pulls in nltk; the development server below always does it
+WARM_UP_MODELS = os.environ.get("PLANNER_WARM_UP", "").lower() in ("1", "true", "yes")
+
+# Libraries that are only imported on first use, listed by the startup report and /api/health
+HEAVY_MODULES = ("numpy", "sklearn", "nltk", "matplotlib", "selenium", "lxml", "google.generativeai")
+
+
+def loaded_heavy_modules():
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def startup_report():
+    """
+    Print how long the app took to import and which heavy libraries that pulled in
+    @returns import time in seconds
+    """
+    elapsed = round(time.perf_counter() - STARTED_AT, 3)
+    loaded = loaded_heavy_modules()
+    print(f"App ready in {elapsed:.3f}s, heavy libraries loaded: {', '.join(loaded) if loaded else 'none'}")
+    return elapsed
+
+# Forum paging: default and largest page size (threads or replies)
+FORUM_PAGE_SIZE = 20
+FORUM_MAX_PAGE_SIZE = 100
+
+#most queries one /api/recommend-electives/batch request may carry, and most recommendations per query
+ELECTIVE_BATCH_MAX_QUERIES = 200
+ELECTIVE_BATCH_MAX_RECO = 50
+
+
+def read_page_size(data):
+    """
+    @returns the requested page size clamped to 1..FORUM_MAX_PAGE_SIZE
+    @raises ValueError if limit is not a number
+    """
+    try:
+        limit = int(data.get('limit', FORUM_PAGE_SIZE))
+    except TypeError:
+        # null, a list or an object from the client
+        raise ValueError('limit must be a number')
+    return max(1, min(limit, FORUM_MAX_PAGE_SIZE))
+
 
 @app.route('/')
 def index():
@@ -72,6 +126,22 @@ def forum_page():
     return send_from_directory('static', 'forum.html')
 
 
+@app.route('/api/health', methods=['GET'])
+def health():
+    """
+    Report whether the shared models are loaded, which heavy libraries are imported and
+    how many handbook pages needed the browser (does not load anything)
+    """
+    sentiment = model_registry.health()
+    return jsonify({
+        'success': True,
+        'sentiment_model': sentiment,
+        'startup_seconds': STARTUP_SECONDS,
+        'loaded_libraries': loaded_heavy_modules(),
+        'handbook_fetches': fetch_metrics()
+    })
+
+
 @app.route('/api/check-unit-availability', methods=['POST'])
 def check_unit_availability():
     """
@@ -109,14 +179,11 @@ def check_unit_availability():
         pass_info = PreviousDetails(user_info, update_result)
         completed_units = pass_info.saved_all_pass_unit()
 
-        # Read core units directly from JSON
-        json_path = os.path.join('user_info', username, 'core_units.json')
-        if not os.path.exists(json_path):
+        # Read the user's saved core units
+        core_units_all = get_store().load_units(username, "core")
+        if not core_units_all:
             return jsonify({'success': False, 'error': 'core_units.json not found'}), 404
 
-        with open(json_path, 'r') as f:
-            core_units_all = json.load(f)
-
         # Determine current semester
         if intake == 2 and sem == 1:
             current_sem = 2
@@ -176,6 +243,59 @@ def check_unit_availability():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/api/eligibility', methods=['POST'])
+def eligibility_matrix():
+    """
+    Check semester availability and prerequisites for every unit in the catalog at once
+
+    @returns
+    JSON response
+    - success (bool)
+    - current_sem (int): teaching period the matrix was built for (1 = February, 2 = July)
+    - completed (list): units the user has passed
+    - eligibility (dict): unit_code -> {available_this_sem, prereq_fulfilled, can_take}
+    """
+    try:
+        data = request.json
+        if not data:
+            return jsonify({'success': False, 'error': 'No JSON data received'}), 400
+
+        username = data.get('username')
+        try:
+            sem = int(data.get('semester', 0))
+            intake = int(data.get('intake', 0))
+        except (ValueError, TypeError):
+            return jsonify({'success': False, 'error': 'Invalid numeric values'}), 400
+
+        if not all([username, sem, intake]):
+            return jsonify({'success': False, 'error': 'Missing required parameters'}), 400
+
+        user_info = UserInfo()
+        user_info.username = username
+        pass_info = PreviousDetails(user_info, update_result)
+        completed_units = pass_info.saved_all_pass_unit()
+
+        current_sem = current_semester(intake, sem)
+        matrix = check_eligibility(completed_units, current_sem)
+
+        # Optionally narrow the response down to the units the page asked about
+        unit_codes = data.get('unit_codes')
+        if unit_codes:
+            matrix = {code: matrix[code] for code in unit_codes if code in matrix}
+
+        return jsonify({
+            'success': True,
+            'current_sem': current_sem,
+            'completed': completed_units,
+            'eligibility': matrix
+        })
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.route('/api/start-planning', methods=['POST'])
 def start_planning():
     """
@@ -220,13 +340,14 @@ def start_planning():
             core_planner.current_sem = 2
 
         # Proceed if all good
+        # Prerequisites for every core unit are checked together against one completed set
+        eligibility = check_eligibility(core_planner.completed_list, core_planner.current_sem,
+                                        core_planner.filtered_core_units)
+
         core_units_list = []
         for code in getattr(core_planner, 'filtered_core_list', []):
             unit_info = core_planner.filtered_core_units[code]
-            
-            # Get prerequisite fulfillment (reusing elective logic)
-            prereq_dict = {u: info.get("prereq", "NONE") for u, info in core_planner.filtered_core_units.items()}
-            prereq_fulfilled = core_planner.can_take_unit(code, prereq_dict, core_planner.pass_info.saved_all_pass_unit())
+            prereq_fulfilled = eligibility[code]['prereq_fulfilled']
             
             core_units_list.append({
                 'code': code,
@@ -311,17 +432,22 @@ def get_electives():
         data = request.json
         user_info, core_planner, elective_planner = initialize_user(data)
 
+        # Availability and prerequisites for every elective in one pass
+        eligibility = check_eligibility(core_planner.completed_list, core_planner.current_sem,
+                                        elective_planner.all_electives_dict)
+
         # Build electives list while filtering core and unavailable units
         electives_list = []
         for unit_code, unit_info in elective_planner.all_electives_dict.items():
             is_core = unit_code in core_planner.core_units_all
             already_chosen = unit_code in elective_planner.final_elective
-            available_sem = elective_planner.check_elective_available_sem(unit_code)
-            prereq_fulfilled = elective_planner.check_elective_preq(unit_code)
 
             if is_core or already_chosen:
                 continue  # skip core and already chosen units
 
+            available_sem = eligibility[unit_code]['available_this_sem']
+            prereq_fulfilled = eligibility[unit_code]['prereq_fulfilled']
+
             electives_list.append({
                 'code': unit_code,
                 'name': unit_info['unit_name'],
@@ -385,23 +511,98 @@ def recommend_electives():
         elective_planner.final_elective = already_chosen
 
         recommended = elective_planner.recommend_electives_smart(level, interest, num_reco=5)
-
-        recommendations = []
-        for unit_code in recommended:
-            if unit_code in core_planner.core_units_all or unit_code in already_chosen:
-                continue
-            unit_info = elective_planner.all_electives_dict[unit_code]
-            recommendations.append({
-                'code': unit_code,
-                'name': unit_info['unit_name'],
-                'description': unit_info['description'],
-                'level': int(unit_code[3])
-            })
+        recommendations = elective_recommendations(recommended, core_planner, elective_planner, already_chosen)
 
         return jsonify({'success': True, 'recommendations': recommendations})
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
+
+
+def elective_recommendations(recommended, core_planner, elective_planner, already_chosen):
+    """
+    @returns response entries for the recommended unit codes, skipping core and already chosen units
+    """
+    recommendations = []
+    for unit_code in recommended:
+        if unit_code in core_planner.core_units_all or unit_code in already_chosen:
+            continue
+        unit_info = elective_planner.all_electives_dict[unit_code]
+        recommendations.append({
+            'code': unit_code,
+            'name': unit_info['unit_name'],
+            'description': unit_info['description'],
+            'level': int(unit_code[3])
+        })
+    return recommendations
+
+
+@app.route('/api/recommend-electives/batch', methods=['POST'])
+def recommend_electives_batch():
+    """
+    recommend electives for many (user profile, level, interest) queries at once
+    each profile is initialized once, all interests are ranked with one product
+    against the cached elective TF-IDF matrix
+
+    request JSON:
+    - queries (list): {username, stream, year, semester, intake, level, interest, already_chosen}
+    - num_reco (int, optional): recommendations per query, 1 to ELECTIVE_BATCH_MAX_RECO, default 5
+
+    @returns 
+    JSON response:
+    - success (bool): Whether the batch was processed.
+    - results (list): One entry per query, in order, each with success and
+      recommendations (or error for a query that could not be processed).
+    """
+    try:
+        data = request.json or {}
+        queries = data.get('queries')
+        num_reco = data.get('num_reco', 5)
+        if isinstance(num_reco, str) and num_reco.strip().isdigit():
+            num_reco = int(num_reco)
+        if isinstance(num_reco, bool) or not isinstance(num_reco, int) or not 1 <= num_reco <= ELECTIVE_BATCH_MAX_RECO:
+            return jsonify({'success': False, 'error': f'num_reco must be a whole number from 1 to {ELECTIVE_BATCH_MAX_RECO}'}), 400
+        if not isinstance(queries, list) or not queries:
+            return jsonify({'success': False, 'error': 'queries must be a non-empty list'}), 400
+        if len(queries) > ELECTIVE_BATCH_MAX_QUERIES:
+            return jsonify({'success': False, 'error': f'At most {ELECTIVE_BATCH_MAX_QUERIES} queries per request'}), 400
+
+        # Build every query's candidates first, users with the same profile share one initialization
+        planners = {}
+        prepared = []
+        results = []
+        for query in queries:
+            try:
+                # The interest goes straight to the TF-IDF vectorizer, which only takes text
+                interest = query.get('interest')
+                if not isinstance(interest, str):
+                    raise ValueError('interest must be a string')
+                profile = tuple(int(query[field]) for field in ('stream', 'year', 'semester', 'intake'))
+                key = (query['username'],) + profile
+                if key not in planners:
+                    planners[key] = initialize_user(query)
+                _, core_planner, elective_planner = planners[key]
+
+                already_chosen = query.get('already_chosen', [])
+                elective_planner.final_elective = already_chosen
+                candidates = elective_planner.recommendation_candidates(int(query['level']))
+                prepared.append((len(results), candidates, interest, core_planner, elective_planner, already_chosen))
+                results.append(None)
+            except Exception as e:
+                results.append({'success': False, 'error': str(e)})
+
+        from elective_index import elective_index
+        ranked = elective_index().top_many([(candidates, interest) for _, candidates, interest, _, _, _ in prepared], num_reco)
+        for (position, _, _, core_planner, elective_planner, already_chosen), recommended in zip(prepared, ranked):
+            results[position] = {
+                'success': True,
+                'recommendations': elective_recommendations(recommended, core_planner, elective_planner, already_chosen)
+            }
+
+        return jsonify({'success': True, 'results': results})
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
     
 
 @app.route('/api/elective-unit-info', methods=['POST'])
@@ -442,22 +643,17 @@ def elective_unit_info():
 
 def get_deferred_cores(user_info):
     """
-    Read all deferred units from deferred_units.json
-    Only return units that are not already planned in any Y{year}S{sem}_units.json
+    Read all deferred units of the user
+    Only return units that are not already planned in any saved semester
     """
-    deferred_path = Path(f"user_info/{user_info.username}/deferred_units.json")
-    if not deferred_path.exists():
+    store = get_store()
+    deferred_data = store.load_deferred(user_info.username)
+    if not deferred_data:
         return []
 
-    with open(deferred_path, "r", encoding="utf-8") as f:
-        deferred_data = json.load(f)
-
-    user_folder = Path(f"user_info/{user_info.username}")
     planned_units = set()
-    # Loop through all Y{year}S{sem}_units.json
-    for file in user_folder.glob("Y*S*_units.json"):
-        with open(file, "r", encoding="utf-8") as f:
-            planned_units.update(json.load(f).keys())
+    for units in store.load_plans(user_info.username).values():
+        planned_units.update(units.keys())
 
     # Filter out deferred units that are already planned
     deferred_list = [
@@ -517,22 +713,12 @@ def save_plan():
         planner.final_unit_list_for_current_sem = selected_core_codes + [e['code'] for e in electives]
         planned_dict = {unit: "planned" for unit in planner.final_unit_list_for_current_sem}
 
-        user_folder = Path(f"user_info/{username}")
-        user_folder.mkdir(parents=True, exist_ok=True)
-        planned_filename = user_folder / f"Y{year}S{sem}_units.json"
-
-        with open(planned_filename, "w", encoding="utf-8") as f:
-            json.dump(planned_dict, f, indent=4)
-
-        # --- Save deferred units into deferred_units.json ---
-        deferred_path = user_folder / "deferred_units.json"
+        store = get_store()
+        store.save_plan(username, f"Y{year}S{sem}", planned_dict)
 
+        # --- Save deferred units ---
         # Load old deferred data if exists
-        if deferred_path.exists():
-            with open(deferred_path, "r", encoding="utf-8") as f:
-                deferred_data = json.load(f)
-        else:
-            deferred_data = {}
+        deferred_data = store.load_deferred(username)
 
         # Add new deferred units with source semester info
         for d in deferred_cores:
@@ -543,8 +729,9 @@ def save_plan():
             if u in deferred_data:
                 deferred_data.pop(u)
 
-        with open(deferred_path, "w", encoding="utf-8") as f:
-            json.dump(deferred_data, f, indent=4)
+        store.save_deferred(username, deferred_data)
+
+        session_cache.invalidate_user(username)
 
         return jsonify({
             'success': True,
@@ -571,21 +758,12 @@ def get_results():
         if not username:
             return jsonify({'success': False, 'error': 'Username is required'}), 400
         
-        user_folder = Path(f"user_info/{username}")
-        
-        if not user_folder.exists():
+        store = get_store()
+        if not store.user_exists(username):
             return jsonify({'success': False, 'error': f'User {username} not found'}), 404
         
-        results = {}
-        
-        # Find all semester files (Y1S1_units.json, Y1S2_units.json, etc.)
-        for file in user_folder.glob("Y*S*_units.json"):
-            # Extract semester name from filename (e.g., "Y1S1_units.json" -> "Y1S1")
-            semester_name = file.stem.split('_')[0]
-            
-            with open(file, 'r', encoding='utf-8') as f:
-                units = json.load(f)
-                results[semester_name] = units
+        # Every saved semester keyed by name (Y1S1, Y1S2, etc.)
+        results = store.load_plans(username)
         
         return jsonify({
             'success': True,
@@ -612,18 +790,16 @@ def save_results():
         if not username or not results:
             return jsonify({'success': False, 'error': 'Username and results are required'}), 400
         
-        user_folder = Path(f"user_info/{username}")
-        
-        if not user_folder.exists():
+        store = get_store()
+        if not store.user_exists(username):
             return jsonify({'success': False, 'error': f'User {username} not found'}), 404
         
         # Save each semester's results
         for semester, units in results.items():
-            file_path = user_folder / f"{semester}_units.json"
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(units, f, indent=4)
+            store.save_plan(username, semester, units)
         
+        session_cache.invalidate_user(username)
+
         return jsonify({
             'success': True,
             'message': f'Results saved for {len(results)} semester(s)'
@@ -646,23 +822,22 @@ def view_plans():
     if not username:
         return "Username not found. Please load results first.", 400
 
-    user_folder = Path("user_info") / username
-    if not user_folder.exists():
+    if not get_store().user_exists(username):
         return f"No data found for user {username}", 404
 
     # Generate PNG using ViewMenu
     vm = ViewMenu()
     vm.visualize_user_course(username)
 
-    output_file = f"{username}_course_structure.png"
-    return send_from_directory(user_folder, output_file)
+    output_path = get_store().plan_image_path(username)
+    return send_from_directory(output_path.parent, output_path.name)
 
 
 @app.route('/api/update-unit', methods=['POST'])
 def update_unit():
     """
     Update unit information by scraping Monash Handbook
-    Uses the get_info function from scrape.py
+    Uses the get_info function from handbook_cache.py (scrape.py on a cache miss)
     USe sem_extraction() and workload_extraction() for proper formatting
     """
     try:
@@ -678,15 +853,26 @@ def update_unit():
             }), 400
 
         # Check if user exists
-        user_folder = Path(f"user_info/{username}")
-        if not user_folder.exists():
+        store = get_store()
+        if not store.user_exists(username):
             return jsonify({
                 'success': False,
                 'error': f'User {username} not found. Please complete unit planning first.'
             }), 404
 
         # Scrape unit info from Monash Handbook
-        unit_name, semesters_str, assign, test, final = get_info(intake_year, unit_code)
+        try:
+            unit_name, semesters_str, assign, test, final = get_info(intake_year, unit_code)
+        except ScraperBusy as e:
+            response = jsonify({'success': False, 'error': str(e)})
+            response.headers['Retry-After'] = '5'
+            return response, 503
+        except HandbookOffline as e:
+            return jsonify({'success': False, 'error': str(e)}), 503
+        except HandbookUnavailable as e:
+            response = jsonify({'success': False, 'error': str(e)})
+            response.headers['Retry-After'] = '30'
+            return response, 503
 
         if unit_name is None:
             return jsonify({
@@ -720,52 +906,24 @@ def update_unit():
                 'final': final or 'None'
             }
 
-        # Load user's core and elective units
-        core_file = user_folder / "core_units.json"
-        elective_file = user_folder / "elective_units.json"
-
+        # Update the unit in the user's core units, otherwise in their electives
         updated = False
         updated_location = None
 
-        # Try updating core units
-        if core_file.exists():
-            with open(core_file, 'r', encoding='utf-8') as f:
-                core_units_data = json.load(f)
-
-            if unit_code in core_units_data:
-                core_units_data[unit_code].update({
+        for kind in ("core", "elective"):
+            if unit_code in store.load_units(username, kind):
+                # Only the refreshed fields of this unit are stored for the user
+                store.update_unit(username, kind, unit_code, {
                     "unit_name": unit_name,
                     "sem_available": semesters_str,  
                     "assign": assign,                 
                     "test": test,                     
                     "final": final                    
                 })
-                
-                with open(core_file, 'w', encoding='utf-8') as f:
-                    json.dump(core_units_data, f, indent=4)
-                
-                updated = True
-                updated_location = "core_units.json"
-
-        # Try updating elective units
-        if not updated and elective_file.exists():
-            with open(elective_file, 'r', encoding='utf-8') as f:
-                elective_units_data = json.load(f)
 
-            if unit_code in elective_units_data:
-                elective_units_data[unit_code].update({
-                    "unit_name": unit_name,
-                    "sem_available": semesters_str,  
-                    "assign": assign,                 
-                    "test": test,                     
-                    "final": final                    
-                })
-                
-                with open(elective_file, 'w', encoding='utf-8') as f:
-                    json.dump(elective_units_data, f, indent=4)
-                
                 updated = True
-                updated_location = "elective_units.json"
+                updated_location = f"{kind}_units.json"
+                break
 
         if not updated:
             return jsonify({
@@ -773,6 +931,8 @@ def update_unit():
                 'error': f'{unit_code} not found in your core or elective units. You may need to add it to your course plan first.'
             }), 404
 
+        session_cache.invalidate_user(username)
+
         #Return formatted info for display (not for storage)
         return jsonify({
             'success': True,
@@ -934,7 +1094,8 @@ def chat():
             if unit_codes:
                 response = advisor.summarize_unit_overview(username, unit_codes[0])
             else:
-                response = "Please include a unit code (e.g., 'show resources for FIT1008')."
+                response = SimpleResourceRecommender().recommend_overall() + \
+                    "\nInclude a unit code for unit-specific advice (e.g., 'show resources for FIT1008')."
 
         # === General AI Help / Planning ===
         else:
@@ -976,10 +1137,11 @@ def get_forum_units():
         forum_manager = ForumManager(username)
         all_units = forum_manager.load_all_units()
         
-        # Get discussion stats for each unit
+        # Get discussion stats for every unit in one lookup
+        all_stats = forum_manager.get_all_discussion_stats(all_units.keys())
         units_with_stats = []
         for code, info in all_units.items():
-            stats = forum_manager.get_discussion_stats(code)
+            stats = all_stats[code]
             units_with_stats.append({
                 'code': code,
                 'name': info['name'],
@@ -1031,6 +1193,26 @@ def get_discussions():
                     'error': 'Access denied: Private discussions are only visible to the owner'
                 }), 403
         
+        # Paged threads (without replies) when the client asks for a page or a sort order
+        if any(key in data for key in ('limit', 'cursor', 'sort')):
+            sort = data.get('sort', 'recent')
+            try:
+                page = forum_manager.get_discussions_page(
+                    unit_code, tag, sort, data.get('cursor'), read_page_size(data)
+                )
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+            
+            return jsonify({
+                'success': True,
+                'discussions': page['discussions'],
+                'next_cursor': page['next_cursor'],
+                'sort': sort,
+                'unit_code': unit_code,
+                'tag': tag
+            })
+        
+        # Otherwise every thread with every reply, as before
         discussions = forum_manager.get_unit_discussions(unit_code, tag)
         
         return jsonify({
@@ -1046,6 +1228,49 @@ def get_discussions():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/api/forum/replies', methods=['POST'])
+def get_discussion_replies():
+    """
+    Get the replies of one discussion, a page at a time (offset and limit)
+    """
+    try:
+        data = request.json
+        username = data.get('username')
+        unit_code = data.get('unit_code')
+        tag = data.get('tag')
+        discussion_id = data.get('discussion_id')
+        
+        if not all([username, unit_code, tag, discussion_id]):
+            return jsonify({'success': False, 'error': 'Missing required fields'}), 400
+        
+        if tag not in ['general', 'resources', 'private']:
+            return jsonify({'success': False, 'error': 'Invalid tag'}), 400
+        
+        # Thread ids are ints in the forum file, a string id would never match one
+        try:
+            discussion_id = int(discussion_id)
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'discussion_id must be a number'}), 400
+        
+        try:
+            offset = max(0, int(data.get('offset', 0)))
+            limit = read_page_size(data)
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'offset and limit must be numbers'}), 400
+        
+        forum_manager = ForumManager(username)
+        result = forum_manager.get_replies(unit_code, tag, discussion_id, offset, limit)
+        
+        if not result['success']:
+            return jsonify(result), 404
+        return jsonify(result)
+    
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.route('/api/forum/add-discussion', methods=['POST'])
 def add_discussion():
     """
@@ -1158,6 +1383,21 @@ def toggle_like():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def start_warm_up():
+    """
+    Load the sentiment model in a background thread, so readiness requests never wait for it
+    """
+    threading.Thread(target=model_registry.warm_up, daemon=True).start()
+
+
+STARTUP_SECONDS = startup_report()
+
+if WARM_UP_MODELS:
+    start_warm_up()
+
+
 if __name__ == '__main__':
     os.makedirs('static', exist_ok=True)
+    if not WARM_UP_MODELS:
+        start_warm_up()
     app.run(debug=True, port=5001)
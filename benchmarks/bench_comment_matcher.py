@@ -0,0 +1,98 @@
+"""
+Microbenchmark: keyword / pain point / reasoning detection per comment,
+the previous per-keyword and per-pattern loops against the single-pass CommentMatcher
+
+Run from the repository root:
+    python benchmarks/bench_comment_matcher.py [number_of_comments]
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentiment_analyzer import SentimentDifficultyAnalyzer
+
+Analyzer = SentimentDifficultyAnalyzer
+
+WORDS = (
+    "the this unit was really not hard but assignment two exam workload lecture slides confusing "
+    "recursion tutor prereq easy simple because since i don't know great love time consuming "
+    "free marks piece of cake never overwhelming okay struggle tough deadline graph tree quiz"
+).split()
+
+
+#-------------previous implementation (reference)------------------
+def legacy_keywords(text):
+    text_lower = text.lower()
+    found_keywords = []
+    for level, keywords in Analyzer.DIFFICULTY_KEYWORDS.items():
+        for keyword in keywords:
+            if keyword in text_lower:
+                keyword_index = text_lower.find(keyword)
+                before_text = text_lower[:keyword_index].split()[-3:]
+                is_negated = any(neg in before_text for neg in Analyzer.NEGATIONS)
+                found_keywords.append({'word': keyword, 'level': level, 'negated': is_negated})
+    return found_keywords
+
+
+def legacy_pain_points(text):
+    text_lower = text.lower()
+    found_pain_points = []
+    for category, pattern in Analyzer.PAIN_POINT_PATTERNS.items():
+        matches = re.findall(pattern, text_lower, re.IGNORECASE)
+        if matches:
+            match_text = matches[0] if isinstance(matches[0], str) else ' '.join(str(m) for m in matches[0] if m)
+            found_pain_points.append({'category': category, 'match': match_text})
+    return found_pain_points
+
+
+def legacy_reasoning(text, opinion_type):
+    text_lower = text.lower()
+    for pattern in Analyzer.REASONING_PATTERNS.get(opinion_type, []):
+        match = re.search(pattern, text_lower, re.IGNORECASE)
+        if match:
+            return match.group(0).strip('.,;!? ')[:120]
+    return None
+
+
+def legacy_scan(text):
+    return legacy_keywords(text), legacy_pain_points(text), legacy_reasoning(text, 'easy'), legacy_reasoning(text, 'hard')
+
+
+def matcher_scan(text):
+    match = Analyzer.matcher().scan(text)
+    return match.keywords, match.pain_points, match.reasoning('easy'), match.reasoning('hard')
+
+
+def make_comments(count, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 80))) for _ in range(count)]
+
+
+def bench(function, comments, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in comments:
+            function(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    comments = make_comments(count)
+
+    Analyzer.matcher()  # build outside the timing
+    mismatches = sum(1 for text in comments if legacy_scan(text) != matcher_scan(text))
+    print(f"{count} comments, {mismatches} results differ from the previous implementation")
+
+    legacy_time = bench(legacy_scan, comments)
+    matcher_time = bench(matcher_scan, comments)
+    print(f"previous loops:   {legacy_time:.3f}s ({legacy_time / count * 1e6:.1f} us/comment)")
+    print(f"CommentMatcher:   {matcher_time:.3f}s ({matcher_time / count * 1e6:.1f} us/comment)")
+    print(f"speedup:          {legacy_time / matcher_time:.2f}x")
@@ -0,0 +1,168 @@
+"""
+Microbenchmark: parsing saved handbook unit pages, the previous BeautifulSoup helpers
+(html.parser, a second tree for the assessments) against the single lxml tree of parse_unit_page
+
+Pages are read from the given files or folders, by default the page store of the handbook
+cache (handbook_cache/pages). Without any saved page a synthetic one is used.
+
+Run from the repository root:
+    python benchmarks/bench_handbook_parser.py [page.html | folder ...] [--repeat N]
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from handbook_cache import HANDBOOK_CACHE_DIR
+from scrape import extract_assessments, parse_unit_page
+
+
+#-------------previous implementation (reference)------------------
+def legacy_parse(html):
+    from bs4 import BeautifulSoup
+
+    # The previous parser was given driver.page_source, a str
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="replace")
+    soup = BeautifulSoup(html, "html.parser")
+    h2_tag = soup.find("h2", {"data-testid": "ai-header"})
+    unit_name = None
+    if h2_tag:
+        text = h2_tag.get_text(strip=True)
+        unit_name = text.split("-", 1)[1].strip() if "-" in text else text.strip()
+
+    semesters_set = set()
+    for h in soup.find_all("h4", class_="css-3d3idg-AccordionRowComponent--SDefaultHeading evoq1ba0"):
+        text = h.get_text(strip=True).upper()
+        if "-MALAYSIA-" in text:
+            if "S1" in text:
+                semesters_set.add("1")
+            if "S2" in text:
+                semesters_set.add("2")
+    semesters = ";".join(sorted(semesters_set, key=int)) if semesters_set else "NONE"
+
+    # The assessments were read from a second parse of the page source
+    soup = BeautifulSoup(html, "html.parser")
+    assign_list, test_list, final_list = [], [], []
+    assessment_section = soup.find("div", id=lambda x: x and x.startswith("Assessment-"))
+    if assessment_section:
+        for section in assessment_section.find_all("h4", class_="css-3d3idg-AccordionRowComponent--SDefaultHeading"):
+            section_title = section.get_text(strip=True).lower()
+            accordion_row = section.find_parent("div", class_=lambda x: x and "SAccordionItemHeader" in str(x))
+            content_div = accordion_row.find_next_sibling() if accordion_row else None
+            if not content_div:
+                continue
+            for vdiv in content_div.find_all("div", class_=lambda x: x and "CardBody" in str(x)):
+                text = vdiv.get_text(strip=True)
+                if "Value %" in text or "Value%" in text:
+                    value = text.replace("Value %", "").replace("Value%", "").replace(":", "").strip()
+                    if "quiz" in section_title or "test" in section_title:
+                        test_list.append(value)
+                    elif "examination" in section_title or "final" in section_title:
+                        final_list.append(value)
+                    else:
+                        assign_list.append(value)
+                    break
+
+    return (
+        unit_name, semesters,
+        ";".join(assign_list) if assign_list else "NONE",
+        ";".join(test_list) if test_list else "NONE",
+        ";".join(final_list) if final_list else "NONE",
+    )
+
+
+def lxml_parse(html):
+    unit_name, semesters, rows = parse_unit_page(html)
+    return (unit_name, semesters) + extract_assessments(rows or [])
+
+
+#-------------pages------------------
+def synthetic_page():
+    heading = "css-3d3idg-AccordionRowComponent--SDefaultHeading evoq1ba0"
+
+    def section(title, value):
+        return (
+            f'<div class="css-1 SAccordionItemHeader"><button aria-expanded="true">'
+            f'<h4 class="{heading}">{title}</h4></button></div>'
+            f'<div class="css-2 SAccordionContentContainer"><div class="css-3 CardBody">Value %: {value}</div>'
+            f'<div class="css-3 CardBody">Hurdle: <span>No</span></div></div>'
+        )
+
+    offerings = "".join(
+        f'<h4 class="{heading}">{period}-01-{campus}-ON-CAMPUS</h4>'
+        for period in ("S1", "S2", "FY") for campus in ("CLAYTON", "MALAYSIA")
+    )
+    navigation = "".join(f'<li><a href="/2025/units/FIT{n}">FIT{n}</a></li>' for n in range(1000, 1400))
+    assessments = section("Assignment 1", 20) + section("Weekly quizzes", 10) + section("Final Examination", 70)
+    return (
+        f'<html><head><title>FIT2004</title></head><body><nav><ul>{navigation}</ul></nav>'
+        f'<main><h2 data-testid="ai-header">FIT2004 - Algorithms and data structures</h2>'
+        f'<div id="Offerings">{offerings}</div><div id="Assessment-1">{assessments}</div>'
+        f'<p>{"Unit content. " * 2000}</p></main></body></html>'
+    )
+
+
+def load_pages(args):
+    paths = []
+    for arg in args or [os.path.join(HANDBOOK_CACHE_DIR, "pages")]:
+        path = Path(arg)
+        if path.is_dir():
+            paths.extend(sorted(path.glob("*.html")))
+        elif path.is_file():
+            paths.append(path)
+    if not paths:
+        return [("synthetic", synthetic_page().encode("utf-8"))]
+    return [(path.name, path.read_bytes()) for path in paths]
+
+
+def bench(function, html, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(html)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    repeat = 5
+    if "--repeat" in args:
+        position = args.index("--repeat")
+        repeat = int(args[position + 1])
+        del args[position:position + 2]
+
+    pages = load_pages(args)
+    try:
+        import bs4  # noqa: F401
+        with_legacy = True
+    except ImportError:
+        with_legacy = False
+        print("beautifulsoup4 not installed, timing the lxml parser only")
+
+    parse_unit_page(pages[0][1])  # compile the selectors outside the timing
+    total_legacy = total_lxml = 0.0
+    mismatches = 0
+    print(f"{'page':<70} {'size':>8} {'previous':>10} {'lxml':>10}")
+    for name, html in pages:
+        lxml_time = bench(lxml_parse, html, repeat)
+        total_lxml += lxml_time
+        legacy = ""
+        if with_legacy:
+            legacy_time = bench(legacy_parse, html, repeat)
+            total_legacy += legacy_time
+            legacy = f"{legacy_time * 1000:.2f}ms"
+            if legacy_parse(html) != lxml_parse(html):
+                mismatches += 1
+                print(f"  {name}: results differ")
+        print(f"{name[:70]:<70} {len(html) // 1024:>6}KB {legacy:>10} {lxml_time * 1000:>8.2f}ms")
+
+    print(f"{len(pages)} page(s), best of {repeat}")
+    print(f"lxml single tree: {total_lxml / len(pages) * 1000:.2f} ms/page")
+    if with_legacy:
+        print(f"previous parser:  {total_legacy / len(pages) * 1000:.2f} ms/page, {mismatches} result(s) differ")
+        print(f"speedup:          {total_legacy / total_lxml:.2f}x")
@@ -0,0 +1,158 @@
+import csv
+import os
+import threading
+from types import MappingProxyType
+
+#core unit csv for each (stream, year)
+#stream 1 = Data Science, stream 2 = Algorithms and Software
+CORE_FILES = {
+    (1, 1): "data/d_y1_core_units.csv",
+    (2, 1): "data/a_y1_core_units.csv",
+    (1, 2): "data/d_y2_core_units.csv",
+    (2, 2): "data/a_y2_core_units.csv",
+    (1, 3): "data/d_y3_core_units.csv",
+    (2, 3): "data/a_y3_core_units.csv",
+}
+ELECTIVE_FILE = "data/elective_units.csv"
+
+
+def normalize_code(code):
+    """
+    Unit codes in the csv files sometimes carry stray spaces ("FIT1043 ")
+    so every code is stripped and upper-cased before it is used as a key
+    """
+    return code.strip().upper()
+
+
+def _file_mtime(path):
+    """
+    @returns the file modification time in ns, or None if the file is missing
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _read_unit_csv(path, elective=False):
+    """
+    Parse one unit csv file into an ordered tuple of codes and a read-only dict of unit info
+
+    @param path - csv file to read
+    @param elective - elective csv also has the Approved column
+    @returns (codes, units)
+    """
+    codes = []
+    units = {}
+    if not os.path.isfile(path):
+        return tuple(codes), MappingProxyType(units)
+
+    with open(path, mode="r", encoding="utf-8-sig") as file:
+        for line in csv.DictReader(file):
+            unit_code = normalize_code(line["unit_code"])
+            info = {
+                "unit_name": line["unit_name"].strip(),
+                "sem_available": line["semester_available"].strip(),
+                "description": line["description "].strip(),
+                "prereq": line["prereq"].strip(),
+                "assign": line["Assignment"].strip(),
+                "test": line["Test"].strip(),
+                "final": line["Final"].strip()
+            }
+            if elective:
+                info["approved_elective"] = line["Approved"].strip()
+
+            if unit_code not in units:
+                codes.append(unit_code)
+            units[unit_code] = MappingProxyType(info)
+
+    return tuple(codes), MappingProxyType(units)
+
+
+class UnitCatalog():
+    """
+    Immutable snapshot of every core and elective csv under data/
+
+    A snapshot is never changed after it is built, a new one replaces it when any csv changes.
+    Planners receive copies of the unit dicts so they are free to edit them.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.mtimes = {}
+        core = {}
+        for key, path in CORE_FILES.items():
+            self.mtimes[path] = _file_mtime(path)
+            core[key] = _read_unit_csv(path)
+        self.mtimes[ELECTIVE_FILE] = _file_mtime(ELECTIVE_FILE)
+        self._core = MappingProxyType(core)
+        self._electives = _read_unit_csv(ELECTIVE_FILE, elective=True)
+
+    def is_stale(self):
+        """
+        @returns True if any csv file was changed, added or removed since the snapshot was built
+        """
+        return any(_file_mtime(path) != mtime for path, mtime in self.mtimes.items())
+
+    def core_units(self, stream, year):
+        """
+        @param stream, year - select the core unit file
+        @returns (list of core unit codes in csv order, dict of unit_code -> unit info)
+        both are empty if no file exists for that stream and year
+        """
+        codes, units = self._core.get((stream, year), ((), {}))
+        return list(codes), {code: dict(units[code]) for code in codes}
+
+    def elective_units(self):
+        """
+        @returns (list of elective unit codes in csv order, dict of unit_code -> unit info)
+        """
+        codes, units = self._electives
+        return list(codes), {code: dict(units[code]) for code in codes}
+
+    def get_unit(self, unit_code):
+        """
+        @returns a copy of the unit info from any core or elective file, None if unknown
+        """
+        unit_code = normalize_code(unit_code)
+        for _, units in self._core.values():
+            if unit_code in units:
+                return dict(units[unit_code])
+        info = self._electives[1].get(unit_code)
+        return dict(info) if info is not None else None
+
+    def all_units(self):
+        """
+        Every unit in the catalog, core files first then electives (a core entry wins)
+
+        @returns read-only view of unit_code -> read-only unit info
+        """
+        merged = {}
+        for codes, units in self._core.values():
+            for code in codes:
+                merged.setdefault(code, units[code])
+        codes, units = self._electives
+        for code in codes:
+            merged.setdefault(code, units[code])
+        return MappingProxyType(merged)
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """
+    Return the process-wide catalog, loading it on first use
+    and reloading it when a csv under data/ has changed on disk
+    """
+    global _catalog
+    catalog = _catalog
+    if catalog is not None and not catalog.is_stale():
+        return catalog
+
+    with _catalog_lock:
+        if _catalog is None or _catalog.is_stale():
+            version = _catalog.version + 1 if _catalog is not None else 1
+            _catalog = UnitCatalog(version)
+        return _catalog
@@ -0,0 +1,208 @@
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from catalog import CORE_FILES, ELECTIVE_FILE, normalize_code
+from forum_store import atomic_write_json, match_target_mode
+from handbook_cache import HandbookCache
+from scrape import ScraperService
+
+#refresh every unit in data/*.csv from the handbook for one intake year
+#    python3 catalog_refresh.py 2025 [--workers N] [--max-age SECONDS] [--dry-run]
+
+#threads fetching units at once, pages that need the browser queue for one of the
+#scraper's SCRAPER_POOL_SIZE drivers instead of being turned away
+REFRESH_WORKERS = 8
+#previous versions of the replaced csv files and the change report of each refresh
+HISTORY_DIR = "data/history"
+
+#csv column filled from each field of get_info (unit_name, semesters, assign, test, final)
+SCRAPED_COLUMNS = ("unit_name", "semester_available", "Assignment", "Test", "Final")
+
+
+def catalog_files():
+    """
+    @returns every core csv and the elective csv, in a fixed order
+    """
+    return sorted(set(CORE_FILES.values())) + [ELECTIVE_FILE]
+
+
+def read_rows(path):
+    """
+    @returns (column names, rows as dicts) of one csv, both empty if the file is missing
+    """
+    if not os.path.isfile(path):
+        return [], []
+    with open(path, mode="r", encoding="utf-8-sig", newline="") as file:
+        reader = csv.DictReader(file)
+        return list(reader.fieldnames or []), list(reader)
+
+
+def fetch_units(year, unit_codes, workers=REFRESH_WORKERS, cache=None):
+    """
+    Fetch every unit concurrently through the handbook cache
+
+    @returns ({unit_code: (unit_name, semesters, assign, test, final)}, {unit_code: error message})
+    """
+    cache = cache or HandbookCache()
+    results = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(cache.get_info, year, unit_code): unit_code for unit_code in unit_codes}
+        for future in as_completed(futures):
+            unit_code = futures[future]
+            try:
+                results[unit_code] = future.result()
+            except Exception as e:
+                errors[unit_code] = str(e)
+    return results, errors
+
+
+def diff_rows(path, rows, results):
+    """
+    Apply the fetched info to the rows of one csv
+
+    Only the scraped columns are compared (ignoring surrounding spaces) and replaced, every
+    other column and the row order stay as they are. Units without a fetched result keep their row.
+
+    @returns (new rows, [{"file", "unit_code", "column", "old", "new"}])
+    """
+    changes = []
+    new_rows = []
+    for row in rows:
+        row = dict(row)
+        info = results.get(normalize_code(row["unit_code"]))
+        if info is not None and info[0] is not None:
+            for column, value in zip(SCRAPED_COLUMNS, info):
+                if column in row and value is not None and (row[column] or "").strip() != value.strip():
+                    changes.append({
+                        "file": path, "unit_code": normalize_code(row["unit_code"]),
+                        "column": column, "old": row[column], "new": value
+                    })
+                    row[column] = value
+        new_rows.append(row)
+    return new_rows, changes
+
+
+def render_csv(fieldnames, rows):
+    """
+    @returns the csv text, written the way the shipped files are (LF line endings, minimal quoting)
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def _replace_text(path, text):
+    """
+    Write to a temporary file in the same folder, then rename it over the target
+    """
+    path = Path(path)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        match_target_mode(temp_path, path)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def refresh_catalog(year, workers=REFRESH_WORKERS, max_age=0, dry_run=False):
+    """
+    Re-scrape every catalog unit for an intake year and rewrite the csv files that changed
+
+    The previous version of each changed file and a change report are kept in
+    data/history/{timestamp}/. Each csv is replaced atomically, so the catalog (which reloads
+    on file changes) never reads a half-written file.
+
+    @param year - intake year to fetch
+    @param workers - units fetched at once
+    @param max_age - seconds a cached page is used without revalidating it with the handbook
+    @param dry_run - only report the changes
+    @returns the change report {"year", "generated_at", "units", "changes", "missing", "errors", "files"}
+    """
+    start = time.perf_counter()
+    tables = {path: read_rows(path) for path in catalog_files()}
+    unit_codes = list(dict.fromkeys(
+        normalize_code(row["unit_code"]) for _, rows in tables.values() for row in rows
+    ))
+
+    # Its own scraper, where every worker may queue for a driver (none is ever turned away
+    # with ScraperBusy) and a page's timeout only starts once it has a driver
+    scraper = ScraperService(max_waiting=workers, wait_for_driver=True)
+    cache = HandbookCache(ttl=max_age, miss_ttl=max_age, scraper=scraper)
+    try:
+        results, errors = fetch_units(year, unit_codes, workers, cache)
+    finally:
+        scraper.close()
+
+    changes = []
+    rendered = {}
+    for path, (fieldnames, rows) in tables.items():
+        new_rows, file_changes = diff_rows(path, rows, results)
+        if file_changes:
+            changes.extend(file_changes)
+            rendered[path] = render_csv(fieldnames, new_rows)
+
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    report = {
+        "year": str(year),
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "units": len(unit_codes),
+        "changes": changes,
+        "missing": sorted(code for code, info in results.items() if info[0] is None),
+        "errors": errors,
+        "files": sorted(rendered),
+    }
+
+    if not dry_run and rendered:
+        history = Path(HISTORY_DIR) / stamp
+        history.mkdir(parents=True, exist_ok=True)
+        for path in rendered:
+            (history / Path(path).name).write_bytes(Path(path).read_bytes())
+        atomic_write_json(history / "report.json", report)
+        # Every new file is complete before the first one is swapped in
+        for path, text in rendered.items():
+            _replace_text(path, text)
+
+    elapsed = time.perf_counter() - start
+    print(f"Catalog refresh {year}: {len(results)}/{len(unit_codes)} unit(s) fetched with {workers} worker(s) "
+          f"in {elapsed:.1f}s, {len(changes)} change(s) in {len(rendered)} file(s)"
+          + (" (dry run, nothing written)" if dry_run else ""))
+    for change in changes:
+        print(f"  {change['unit_code']} {change['column']}: {change['old']!r} -> {change['new']!r}")
+    for unit_code in report["missing"]:
+        print(f"  {unit_code}: not in the {year} handbook, row kept")
+    for unit_code, error in sorted(errors.items()):
+        print(f"  {unit_code}: failed ({error}), row kept")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Refresh data/*.csv from the Monash Handbook")
+    parser.add_argument("year", help="intake year to fetch")
+    parser.add_argument("--workers", type=int, default=REFRESH_WORKERS, help=f"units fetched at once (default: {REFRESH_WORKERS})")
+    parser.add_argument("--max-age", type=float, default=0,
+                        help="seconds a cached page is used without revalidating it (default: always revalidate)")
+    parser.add_argument("--dry-run", action="store_true", help="print the changes without writing anything")
+    args = parser.parse_args()
+
+    report = refresh_catalog(args.year, args.workers, args.max_age, args.dry_run)
+    if report["errors"]:
+        sys.exit(1)
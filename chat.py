@@ -2,11 +2,13 @@ from utilities import initialize_user
 from sentiment_analyzer import SentimentDifficultyAnalyzer
 from resources_rec import SimpleResourceRecommender
 from performance import SemesterReadinessAnalyzer 
-import google.generativeai as genai
+from storage import get_store
 import os, json
 
 class UnitAdvisorAI:
     def __init__(self, api_key):
+        # Imported on first use, it takes a while to load
+        import google.generativeai as genai
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
         self.os = os
@@ -14,61 +16,34 @@ class UnitAdvisorAI:
 
     def load_unit_data(self, username, unit_code):
         """Load data for a specific unit"""
-        core_path = f"user_info/{username}/core_units.json"
-        elective_path = f"user_info/{username}/elective_units.json"
-
-        for path in [core_path, elective_path]:
-            if self.os.path.exists(path):
-                with open(path, 'r') as f:
-                    data = self.json.load(f)
-                    if unit_code in data:
-                        return data[unit_code]
+        store = get_store()
+        for kind in ("core", "elective"):
+            data = store.load_units(username, kind)
+            if unit_code in data:
+                return data[unit_code]
         return None
     
     def load_core_units(self, username):
         """Load core units"""
-        core_units = {}
-        elective_path = f"user_info/{username}/core_units.json"
-        if self.os.path.exists(elective_path):
-            with open(elective_path, 'r') as f:
-                core_units.update(self.json.load(f))
-        return core_units
+        return get_store().load_units(username, "core")
 
     def load_elective_units(self, username):
         """Load elective units, excluding any that are already in core units"""
-        elective_units = {}
-        elective_path = f"user_info/{username}/elective_units.json"
         core_units = self.load_core_units(username)
-
-        if self.os.path.exists(elective_path):
-            with open(elective_path, 'r') as f:
-                all_electives = self.json.load(f)
-                for code, data in all_electives.items():
-                    if code not in core_units:
-                        elective_units[code] = data
-        return elective_units
+        all_electives = get_store().load_units(username, "elective")
+        return {code: data for code, data in all_electives.items() if code not in core_units}
 
     def load_all_units(self, username):
         """Load all available units"""
         all_units = {}
-        core_path = f"user_info/{username}/core_units.json"
-        elective_path = f"user_info/{username}/elective_units.json"
-
-        if self.os.path.exists(core_path):
-            with open(core_path, 'r') as f:
-                all_units.update(self.json.load(f))
-        if self.os.path.exists(elective_path):
-            with open(elective_path, 'r') as f:
-                all_units.update(self.json.load(f))
+        store = get_store()
+        all_units.update(store.load_units(username, "core"))
+        all_units.update(store.load_units(username, "elective"))
         return all_units
 
     def load_planned_units(self, username, year, semester):
         """Load planned units for a specific semester"""
-        planned_path = f"user_info/{username}/Y{year}S{semester}_units.json"
-        if self.os.path.exists(planned_path):
-            with open(planned_path, 'r') as f:
-                return self.json.load(f)
-        return {}
+        return get_store().load_plan(username, f"Y{year}S{semester}") or {}
     
     def recommend_units(self, username, intake, stream, year, semester, interest):
         """
@@ -253,26 +228,20 @@ class UnitAdvisorAI:
         @param username to get the correct database
         @return unit code and unit name of all plans
         """
-        user_folder = f"user_info/{username}"
-        if not self.os.path.exists(user_folder):
+        store = get_store()
+        if not store.user_exists(username):
             return f"User {username} not found."
 
         all_units = self.load_all_units(username)
         if not all_units:
             return f"No core/elective units found for {username}."
 
-        sem_files = [f for f in self.os.listdir(user_folder) if f.startswith("Y") and f.endswith("_units.json")]
-        if not sem_files:
+        plans = store.load_plans(username)
+        if not plans:
             return "No semester unit files found."
 
-        sem_files.sort()
         output_lines = []
-        for sem_file in sem_files:
-            sem_path = self.os.path.join(user_folder, sem_file)
-            with open(sem_path, 'r') as f:
-                semester_units = self.json.load(f)
-
-            semester_name = sem_file.replace("_units.json", "")
+        for semester_name, semester_units in plans.items():
             output_lines.append(f"📘 {semester_name} Units:")
             for code, status in semester_units.items():
                 unit_data = all_units.get(code)
@@ -293,7 +262,7 @@ class UnitAdvisorAI:
         """
         try:
             analyzer = SentimentDifficultyAnalyzer()
-            analysis = analyzer.analyze_unit(unit_code)
+            analysis = analyzer.unit_summary(unit_code)
         except Exception as e:
             return f"Sorry, I couldn't analyze feedback for {unit_code}. ({e})"
         
@@ -471,17 +440,13 @@ class UnitAdvisorAI:
         Analyze the impact of ADDING a new unit to an existing semester plan.
         Shows before/after workload comparison.
         """
-        from pathlib import Path
-        
         # Load existing semester plan
-        sem_file = Path(f"user_info/{username}/Y{year}S{semester}_units.json")
+        existing_semester = get_store().load_plan(username, f"Y{year}S{semester}")
         
-        if not sem_file.exists():
+        if existing_semester is None:
             return f"❌ No semester plan found for Y{year}S{semester}. Please create it first."
         
-        with open(sem_file, 'r') as f:
-            existing_semester = self.json.load(f)
-            existing_units = list(existing_semester.keys())
+        existing_units = list(existing_semester.keys())
         
         # Check if unit is already in the plan
         if new_unit_code in existing_units:
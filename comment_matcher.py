@@ -0,0 +1,189 @@
+import re
+
+#characters that mean a pattern alternative is not a plain literal
+REGEX_META = re.compile(r"[.^$*+?{}\[\]|()\\]")
+#what may follow the leading group for a pattern to match wherever one of its literals
+#starts: nothing, or optional spaces and an optional group ("\s*(unclear|bad)?")
+OPTIONAL_TRAILER = re.compile(r"^(\\s\*)?(\([^()]*\)\?)?$")
+
+
+def _literal_prefixes(pattern):
+    """
+    Literal strings one of which starts every match of the pattern: the alternatives of its
+    leading group, cut before the first optional character ("slides?" -> "slide")
+
+    @returns list of literals, None if the pattern cannot be reduced (it is then always run)
+    """
+    match = re.match(r"^\(([^()]*)\)", pattern)
+    if not match:
+        return None
+
+    literals = []
+    for alternative in match.group(1).split("|"):
+        literal = re.sub(r"\\(.)", r"\1", re.split(r"(?<!\\).\?", alternative)[0])
+        if not literal or REGEX_META.search(literal):
+            return None
+        literals.append(literal.lower())
+    return literals
+
+
+def _matches_at_literal(pattern):
+    """
+    @returns True if the pattern matches wherever one of its literal prefixes starts (each
+    alternative is the literal, at most followed by one optional character, and the rest of the
+    pattern is optional), its first match is then found by running it at the earliest of those
+    positions only
+    """
+    if _literal_prefixes(pattern) is None:
+        return False
+    match = re.match(r"^\(([^()]*)\)", pattern)
+    for alternative in match.group(1).split("|"):
+        if "?" in (alternative[:-2] if alternative.endswith("?") else alternative):
+            return False
+    return OPTIONAL_TRAILER.match(pattern[match.end():]) is not None
+
+
+def _literal_trie(literals):
+    """
+    Regex matching the longest of the literals at a position, with common prefixes factored
+    out ("exam|examination" -> "exam(?:ination)?"), so each position is tried one character
+    at a time instead of once per literal
+    """
+    trie = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy, a literal that ends here only wins when no longer one matches
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+
+class CommentMatch():
+    """
+    Result of scanning one comment, the parts are worked out from the single scan on demand
+    """
+
+    def __init__(self, matcher, text_lower, found):
+        self.matcher = matcher
+        self.text_lower = text_lower
+        self.found = found
+
+    def _triggered(self, literals):
+        return literals is None or any(literal in self.found for literal in literals)
+
+    @property
+    def keywords(self):
+        """
+        @returns [{'word', 'level', 'negated'}] in DIFFICULTY_KEYWORDS order, first occurrence of each
+        negated when one of the 3 words before it is a negation
+        """
+        keywords = []
+        for word, level in self.matcher.keywords:
+            index = self.found.get(word)
+            if index is None:
+                continue
+            before_text = self.text_lower[:index].rsplit(None, 3)[-3:]
+            is_negated = any(token in self.matcher.negations for token in before_text)
+            keywords.append({'word': word, 'level': level, 'negated': is_negated})
+        return keywords
+
+    @property
+    def pain_points(self):
+        """
+        @returns [{'category', 'match'}] with the first match of each category
+        the scan gives where each pattern can first match, the pattern is only run there to
+        read its optional suffix ("assignment 2"), other patterns search when triggered
+        """
+        found_pain_points = []
+        for category, regex, literals, at_literal in self.matcher.pain_points:
+            if at_literal:
+                positions = [self.found[literal] for literal in literals if literal in self.found]
+                if not positions:
+                    continue
+                match = regex.match(self.text_lower, min(positions))
+            elif self._triggered(literals):
+                match = regex.search(self.text_lower)
+            else:
+                continue
+            if match:
+                groups = match.groups()
+                if not groups:
+                    match_text = match.group(0)
+                elif len(groups) == 1:
+                    match_text = groups[0]
+                else:
+                    match_text = ' '.join(group for group in groups if group)
+                found_pain_points.append({'category': category, 'match': match_text})
+        return found_pain_points
+
+    def reasoning(self, opinion_type):
+        """
+        @returns the first reasoning span for 'easy' or 'hard', None if no pattern matches
+        """
+        for regex, literals in self.matcher.reasoning.get(opinion_type, []):
+            if not self._triggered(literals):
+                continue
+            match = regex.search(self.text_lower)
+            if match:
+                return match.group(0).strip('.,;!? ')[:120]
+        return None
+
+
+class CommentMatcher():
+    """
+    Precompiled matcher for difficulty keywords, pain points and reasoning
+
+    Every keyword and every leading word of the pain point / reasoning patterns go into one
+    lookahead over a trie of the literals, so one scan of a comment finds the first position
+    of all of them. Keywords come straight from the scan. A pain point pattern whose suffix is
+    optional matches at the first of its leading words, it is only run there to read the suffix.
+    The other patterns (reasoning) only search when one of their leading words was seen.
+    """
+
+    def __init__(self, difficulty_keywords, pain_point_patterns, negations, reasoning_patterns):
+        self.keywords = [(word, level) for level, words in difficulty_keywords.items() for word in words]
+        self.negations = set(negations)
+        self.pain_points = [
+            (category, re.compile(pattern, re.IGNORECASE), _literal_prefixes(pattern), _matches_at_literal(pattern))
+            for category, pattern in pain_point_patterns.items()
+        ]
+        self.reasoning = {
+            opinion_type: [(re.compile(pattern, re.IGNORECASE), _literal_prefixes(pattern)) for pattern in patterns]
+            for opinion_type, patterns in reasoning_patterns.items()
+        }
+
+        literals = {word for word, _ in self.keywords}
+        for _, _, prefixes, _ in self.pain_points:
+            literals.update(prefixes or [])
+        for patterns in self.reasoning.values():
+            for _, prefixes in patterns:
+                literals.update(prefixes or [])
+
+        #at one position the alternation reports the longest literal, every literal starting
+        #at that position is a prefix of it
+        ordered = sorted(literals, key=len, reverse=True)
+        self._scanner = re.compile("(?=(" + _literal_trie(ordered) + "))")
+        self._prefixes = {
+            literal: [other for other in ordered if literal.startswith(other)] for literal in ordered
+        }
+
+    def scan(self, text):
+        """
+        @returns CommentMatch for the text (scanned once, lower-cased)
+        """
+        text_lower = text.lower()
+        found = {}
+        for match in self._scanner.finditer(text_lower):
+            for literal in self._prefixes[match.group(1)]:
+                if literal not in found:
+                    found[literal] = match.start()
+        return CommentMatch(self, text_lower, found)
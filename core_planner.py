@@ -6,6 +6,9 @@ from enum import Enum
 from elective_planner import PlannerForElective
 from update_result import UpdateResult
 from pass_info import PreviousDetails
+from catalog import CORE_FILES, get_catalog
+from prereq import compile_prereq, completed_mask
+from storage import get_store
 
 #index for the code list to stop at (core unit)
 #since both a/d for year 1 have 3 core for sem 1, we only need 1 constant
@@ -107,26 +110,11 @@ class PlannerForCore():
         @returns
         the correct file path to the corret core unit csv
         """
-        stream = self.user_info.stream
-        year = self.user_info.year
-        if (stream == 1 and year == 1):
-            return "data/d_y1_core_units.csv"
-        elif (stream == 2 and year == 1):
-            return "data/a_y1_core_units.csv"
-        elif (stream == 1 and year == 2):
-            return "data/d_y2_core_units.csv"
-        elif (stream == 2 and year == 2):
-            return "data/a_y2_core_units.csv"
-        elif (stream == 1 and year == 3):
-            return "data/d_y3_core_units.csv"
-        elif (stream == 2 and year == 3):
-            return "data/a_y3_core_units.csv"
-        else:
-            return("No information found for your option")
+        return CORE_FILES.get((self.user_info.stream, self.user_info.year), "No information found for your option")
         
     def read_core_unit(self):
         """
-        read csv file and store the filtered (based on sem) and unfiltered dictionary of core units
+        read core units from the shared catalog and store the filtered (based on sem) and unfiltered dictionary of core units
         """
 
         stream = self.user_info.stream
@@ -134,35 +122,12 @@ class PlannerForCore():
         sem = self.user_info.sem
         intake = self.user_info.intake
 
-        core_file = Path(self.choose_core_file())
-
-        #core unit list 
-        core_unit_code_list = []
+        #core unit list and dict come from the shared catalog (csv is parsed once per process)
+        core_unit_code_list, core_unit_dict = get_catalog().core_units(stream, year)
         filter_core_code_list = []
-    
-        #core unit dict
-        core_unit_dict = {}
 
-        #get all the info into core_unit dict and list
-        if (not core_file.is_file()):
+        if (not core_unit_code_list):
             print("System error: No information found")
-        else:
-            with open(self.choose_core_file(), mode='r', encoding="utf-8-sig") as file:
-                core_unit_file = csv.DictReader(file)
-                for line in core_unit_file:
-                    #get the core_unit_code into a list
-                    core_unit_code_list.append(line["unit_code"].strip())
-                    #unit_code as key, get unit_name, semester, description, prereq and workload
-                    core_unit_dict[line["unit_code"]] = {
-                    #create dictionary so each row will be a key as well 
-                        "unit_name": line["unit_name"].strip(), 
-                        "sem_available": line["semester_available"].strip(),
-                        "description": line["description "].strip(),
-                        "prereq": line["prereq"].strip(),
-                        "assign": line["Assignment"].strip(),
-                        "test": line["Test"].strip(),
-                        "final": line["Final"].strip()
-                    }
 
         #filter the core unit dict and list based on sem
         #extend this for different year and sem 
@@ -204,24 +169,14 @@ class PlannerForCore():
                 self.filtered_core_units[unit_code] = unit_info
 
         #check if the unit going to show had been swapped
-        user_folder = Path(f"user_info/{self.user_info.username}")
         already_taken_units = set()
-        
-        if user_folder.exists():
-            # Loop through all Y{year}S{sem}_units.json files
-            for file in user_folder.glob("Y*S*_units.json"):
-                # Skip the current semester file
-                current_sem_file = f"Y{year}S{sem}_units.json"
-                if file.name == current_sem_file:
-                    continue
-                    
-                try:
-                    with open(file, "r", encoding="utf-8") as f:
-                        semester_units = json.load(f)
-                        # Add all units from this semester to the set
-                        already_taken_units.update(semester_units.keys())
-                except Exception as e:
-                    print(f"Error reading {file}: {e}")
+        current_sem_key = f"Y{year}S{sem}"
+        for semester, semester_units in get_store().load_plans(self.user_info.username).items():
+            # Skip the current semester plan
+            if semester == current_sem_key:
+                continue
+            # Add all units from this semester to the set
+            already_taken_units.update(semester_units.keys())
         
         # Remove already-taken units from the filter list
         filter_core_code_list = [
@@ -241,34 +196,15 @@ class PlannerForCore():
     
     def save_user_core(self):
         """
-        Check if user's JSON already has the unit info saved.
-        If not, add new core unit entries from self.core_units into JSON.
+        Check if user's saved core units already include this stream and year.
+        If not, add them to the user store (only the stream and year is recorded, the unit info
+        itself stays in the shared catalog).
         """
-        user_folder = Path("user_info") / self.user_info.username
-        user_folder.mkdir(parents=True, exist_ok=True)
-        file_path = user_folder / "core_units.json"
-
-        # Load existing JSON data
-        if file_path.exists():
-            with open(file_path, "r", encoding="utf-8") as f:
-                saved_data = json.load(f)
-        else:
-            saved_data = {}
-
-        # Track if anything new added
-        new_added = False
-
-        # Add missing core units
-        for unit_code, unit_info in self.core_units_all.items():
-            if unit_code not in saved_data:
-                saved_data[unit_code] = unit_info
-                new_added = True
+        new_added = get_store().add_core_set(self.user_info.username, self.user_info.stream, self.user_info.year)
 
-        # Save only if something was added
+        # Report whether anything was added
         if new_added:
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(saved_data, f, indent=4)
-            print(f"Updated {file_path} with new core units.")
+            print(f"Updated {self.user_info.username}'s core units.")
         else:
             print("No new core units to add. JSON already up-to-date.")
 
@@ -472,12 +408,11 @@ class PlannerForCore():
         Return detailed info about a core unit as a dictionary,
         including formatted workload.
         """
-        user_path = Path(f"user_info/{self.user_info.username}/core_units.json")
-        if not user_path.is_file():
+        saved_units = get_store().load_units(self.user_info.username, "core")
+        if not saved_units:
             return None
 
-        with open(user_path, "r", encoding="utf-8") as f:
-            self.core_units_all = json.load(f)
+        self.core_units_all = saved_units
 
         unit_info = self.core_units_all.get(searched_unit)
         if not unit_info:
@@ -518,50 +453,14 @@ class PlannerForCore():
     def can_take_unit(self, unit_code, prereq_dict, completed_list):
         """
         Check if a unit can be taken based on prerequisites
-        """
-        completed_list = self.pass_info.saved_all_pass_unit()
-        prereq_str = prereq_dict.get(unit_code, "")
-        
-        if not prereq_str or prereq_str == "NONE":
-            print("No prerequisites required")
-            return True
-
-        # Check if it's an "a;" type (all units required)
-        if prereq_str.startswith('a;'):
-            prereq_units = [self.normalize_code(u) for u in prereq_str[2:].split(';') if u.strip()]
-            print(f"Type: ALL required. Prereqs: {prereq_units}")
-            result = all(unit in completed_list for unit in prereq_units)
-            print(f"Result: {result}")
-            return result
-
-        # Check if it's a "12" type (any 2 units required)
-        elif prereq_str == "12":
-            print(f"Type: Any 12 CP. Completed: {len(completed_list)} units")
-            result = len(completed_list) >= 2
-            print(f"Result: {result}")
-            return result
-        
-        elif prereq_str == "12":
-            print(f"Type: Any 72 CP. Completed: {len(completed_list)} units")
-            result = len(completed_list) >= 12
-            print(f"Result: {result}")
-            return result
-        
-        # Check if it's an "o;" type (one of the units required)
-        elif prereq_str.startswith('o;'):
-            prereq_units = [self.normalize_code(u) for u in prereq_str[2:].split(';') if u.strip()]
-            print(f"Type: ONE OF required. Prereqs: {prereq_units}")
-            result = any(unit in completed_list for unit in prereq_units)
-            print(f"Result: {result}")
-            return result
 
-        else:
-            # Single unit prerequisite
-            normalized_prereq = self.normalize_code(prereq_str.strip())
-            print(f"Type: Single unit. Normalized prereq: '{normalized_prereq}'")
-            result = normalized_prereq in completed_list
-            print(f"Result: {result}")
-            return result
+        @param unit_code - unit to check
+        @param prereq_dict - unit_code -> prereq string
+        @param completed_list - passed unit codes, or a bitmask from prereq.completed_mask
+        @returns True if the prerequisites are fulfilled
+        """
+        prereq = compile_prereq(prereq_dict.get(unit_code, ""))
+        return prereq.is_met(completed_mask(completed_list))
         
     def check_core_prereq(self):
         """
@@ -571,11 +470,12 @@ class PlannerForCore():
         prereq_dict = self.check_unit_prereq()
         completed_list = self.pass_info.saved_all_pass_unit()
         self.completed_list = completed_list
+        passed_mask = completed_mask(completed_list)
         
         unmet_units = []  
 
         for unit_code in self.filtered_core_list:
-            can_take = self.can_take_unit(unit_code, prereq_dict, completed_list)
+            can_take = self.can_take_unit(unit_code, prereq_dict, passed_mask)
             self.list_fullfilled.append(can_take)
             
             if not can_take:
@@ -665,6 +565,7 @@ class PlannerMenu():
             self.pass_info.check_json_planned()
         # Try to load saved core units first
         self.planner_core.read_core_unit()
+        self.planner_core.completed_list = self.pass_info.saved_all_pass_unit()
         for code, info in self.planner_core.core_units_all.items():
             if code not in self.planner_core.user_core_progress:
                 pass
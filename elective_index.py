@@ -0,0 +1,105 @@
+import threading
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from catalog import get_catalog
+
+
+class ElectiveIndex():
+    """
+    TF-IDF vectors of every elective description in one catalog version
+
+    The vectorizer is fitted once over the whole elective catalog, so every request shares
+    the same vocabulary and idf weights and a query only needs transform(). Vectors are
+    l2-normalised, so cosine similarity is a single sparse product.
+    """
+
+    def __init__(self, catalog):
+        self.version = catalog.version
+        codes, units = catalog.elective_units()
+        self.rows = {code: row for row, code in enumerate(codes)}
+        self.descriptions = [units[code]["description"] for code in codes]
+        self.vectorizer = TfidfVectorizer(stop_words='english')
+        try:
+            self.matrix = self.vectorizer.fit_transform(self.descriptions)
+        except ValueError:
+            # No catalog or nothing but stop words, every similarity is 0
+            self.matrix = None
+
+    def similarities_many(self, queries):
+        """
+        @param queries - list of (candidates, query text), candidates is a list of
+        (unit_code, description), descriptions the user edited are vectorised on the fly
+        with the same vocabulary
+        @returns list of numpy arrays, cosine similarities in candidate order for each query
+        """
+        results = [np.zeros(len(candidates)) for candidates, _ in queries]
+        if self.matrix is None or not queries:
+            return results
+
+        # One sparse query matrix and one product against the catalog for the whole batch
+        query_matrix = self.vectorizer.transform([query or "" for _, query in queries])
+        catalog_scores = (self.matrix @ query_matrix.T).toarray()
+
+        for column, (candidates, _) in enumerate(queries):
+            scores = results[column]
+            indexed = []
+            rows = []
+            edited = []
+            for i, (unit_code, description) in enumerate(candidates):
+                row = self.rows.get(unit_code)
+                if row is not None and self.descriptions[row] == description:
+                    indexed.append(i)
+                    rows.append(row)
+                else:
+                    edited.append(i)
+
+            # The candidates are the query's eligibility mask over the catalog rows
+            if rows:
+                scores[indexed] = catalog_scores[rows, column]
+            if edited:
+                edited_vectors = self.vectorizer.transform([candidates[i][1] for i in edited])
+                scores[edited] = (edited_vectors @ query_matrix[column].T).toarray().ravel()
+        return results
+
+    def top_many(self, queries, k):
+        """
+        @param queries - list of (candidates, query text), see similarities_many
+        @returns for each query the unit codes of the k most similar candidates, best first
+        (ties keep candidate order)
+        """
+        results = []
+        for (candidates, _), scores in zip(queries, self.similarities_many(queries)):
+            count = min(k, len(candidates))
+            if count <= 0:
+                results.append([])
+                continue
+            best = np.argpartition(-scores, count - 1)[:count]
+            best = best[np.lexsort((best, -scores[best]))]
+            results.append([candidates[i][0] for i in best])
+        return results
+
+    def top(self, candidates, query, k):
+        """
+        @returns the unit codes of the k candidates most similar to the query, best first
+        """
+        return self.top_many([(candidates, query)], k)[0]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def elective_index():
+    """
+    @returns the process-wide ElectiveIndex, refitted when the catalog version changes
+    """
+    global _index
+    catalog = get_catalog()
+    index = _index
+    if index is not None and index.version == catalog.version:
+        return index
+
+    with _index_lock:
+        if _index is None or _index.version != catalog.version:
+            _index = ElectiveIndex(catalog)
+        return _index
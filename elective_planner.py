@@ -2,8 +2,8 @@ import utilities as u
 from pathlib import Path
 import csv, json
 import os
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from catalog import get_catalog
+from storage import get_store
 
 
 class PlannerForElective():
@@ -37,41 +37,22 @@ class PlannerForElective():
 
     def read_elective(self):
         """
-        Read the elective unit csv file and save all the elective info as a dictionary 
+        Read the elective units from the shared catalog and save all the elective info as a dictionary 
         Save the elective unit code as list to allow easier sorting
         Skip electives that already exist in the user's core_units.json
         """
         # Load the user's core units first
-        core_units = {}
-        core_path = f"user_info/{self.user_info.username}/core_units.json"
-
-        if os.path.exists(core_path):
-            with open(core_path, "r", encoding="utf-8") as f:
-                core_units = json.load(f)
-
-        with open("data/elective_units.csv", mode="r", encoding="utf-8-sig") as file:
-            elective_unit_file = csv.DictReader(file)
-            for line in elective_unit_file:
-                unit_code = line["unit_code"].strip()
-
-                # Skip if the elective already exists in core units
-                if unit_code in core_units:
-                    continue
-
-                # Save into list
-                self.all_electives_list.append(unit_code)
-
-                # Save into dict
-                self.all_electives_dict[unit_code] = {
-                    "unit_name": line["unit_name"].strip(), 
-                    "sem_available": line["semester_available"].strip(),
-                    "description": line["description "].strip(),
-                    "prereq": line["prereq"].strip(),
-                    "assign": line["Assignment"].strip(),
-                    "test": line["Test"].strip(),
-                    "final": line["Final"].strip(),
-                    "approved_elective": line["Approved"].strip()
-                }
+        core_units = get_store().load_units(self.user_info.username, "core")
+
+        elective_codes, elective_units = get_catalog().elective_units()
+        for unit_code in elective_codes:
+            # Skip if the elective already exists in core units
+            if unit_code in core_units:
+                continue
+
+            # Save into list and dict
+            self.all_electives_list.append(unit_code)
+            self.all_electives_dict[unit_code] = elective_units[unit_code]
 
         
     def manually_choose_based_on_level(self):
@@ -111,32 +92,27 @@ class PlannerForElective():
         chosen_elective = user_choice_elective_list[user_option_index]
         return chosen_elective
 
+    def recommendation_candidates(self, level):
+        """
+        @returns [(unit_code, description)] of the electives of that level the user can still choose
+        """
+        return [(unit, self.all_electives_dict[unit]["description"]) for unit in self.get_available_electives_by_level(level)]
+
     def recommend_electives_smart(self, level, user_interest, num_reco=3):
         """
         Recommend electives based on similarity between user's interest and elective descriptions.
         """
         #Filter electives by level and availability
-        available_units = self.get_available_electives_by_level(level)
+        candidates = self.recommendation_candidates(level)
         
-        if not available_units:
+        if not candidates:
             print("No available electives found for this level.")
             return []
         
-        #Prepare descriptions
-        descriptions = [self.all_electives_dict[unit]["description"] for unit in available_units]
-        
-        #Vectorize descriptions and user interest
-        vectorizer = TfidfVectorizer(stop_words='english')
-        vectors = vectorizer.fit_transform(descriptions + [user_interest])
-        
-        #Compute cosine similarity
-        user_vector = vectors[-1]  # last vector is user input
-        elective_vectors = vectors[:-1]
-        similarities = cosine_similarity(user_vector, elective_vectors)[0]
-        
-        #Rank electives by similarity
-        ranked_indices = similarities.argsort()[::-1]  # highest first
-        recommended_units = [available_units[i] for i in ranked_indices[:num_reco]]
+        #Rank against the TF-IDF index fitted once per catalog version (only the interest is vectorised here)
+        #imported here so sklearn is only loaded once recommendations are asked for
+        from elective_index import elective_index
+        recommended_units = elective_index().top(candidates, user_interest, num_reco)
         
         return recommended_units
 
@@ -177,9 +153,9 @@ class PlannerForElective():
         @return true if prereq been met
         """
         preq_dict = {}
-        for unit_code, unit_info in self.all_electives_dict.items():
-            if (unit_code == chosen_elective):
-                preq_dict[chosen_elective] = unit_info["prereq"]
+        unit_info = self.all_electives_dict.get(chosen_elective)
+        if unit_info is not None:
+            preq_dict[chosen_elective] = unit_info["prereq"]
         
         can_take = self.core_planner.can_take_unit(chosen_elective, preq_dict, self.core_planner.completed_list)
             
@@ -192,9 +168,9 @@ class PlannerForElective():
         @return true if the unit is available at that semester
         """
         sems_list_str = []
-        for unit_code, unit_info in self.all_electives_dict.items():
-            if (unit_code == chosen_elective):
-                sems_list_str = unit_info["sem_available"].split(";") 
+        unit_info = self.all_electives_dict.get(chosen_elective)
+        if unit_info is not None:
+            sems_list_str = unit_info["sem_available"].split(";") 
     
         sems_list = [int(s) for s in sems_list_str]
         if (self.core_planner.current_sem not in sems_list):
@@ -234,14 +210,12 @@ class PlannerForElective():
         """
         Display prerequisites for a unit in a readable format.
         """
-        user_path = Path(f"user_info/{self.user_info.username}/elective_units.json")
-
         # Always reload data
-        if user_path.is_file():
-            with open(user_path, "r", encoding="utf-8") as f:
-                self.all_electives_dict = json.load(f)
+        saved_units = get_store().load_units(self.user_info.username, "elective")
+        if saved_units:
+            self.all_electives_dict = saved_units
         else:
-            print(f"Error: {user_path} not found.")
+            print(f"Error: elective units of {self.user_info.username} not found.")
             return
         
         prereq_dict = {}
@@ -279,12 +253,11 @@ class PlannerForElective():
         including formatted workload using core_planner's workload_extraction.
         """
 
-        user_path = Path(f"user_info/{self.user_info.username}/elective_units.json")
-        if not user_path.is_file():
+        saved_units = get_store().load_units(self.user_info.username, "elective")
+        if not saved_units:
             return None
 
-        with open(user_path, "r", encoding="utf-8") as f:
-            self.all_electives_dict = json.load(f)
+        self.all_electives_dict = saved_units
 
         unit_info = self.all_electives_dict.get(chosen_elective)
         if not unit_info:
@@ -367,34 +340,15 @@ class PlannerForElective():
     
     def save_user_elective(self):
         """
-        Check if user's JSON already has the elective info saved.
-        If not, add new elective unit entries from self.elective_units into JSON.
+        Check if user's saved elective units already include the catalog electives.
+        If not, add them to the user store (only a flag is recorded, the elective info
+        itself stays in the shared catalog).
         """
-        user_folder = Path("user_info") / self.user_info.username
-        user_folder.mkdir(parents=True, exist_ok=True)
-        file_path = user_folder / "elective_units.json"
-
-        # Load existing JSON data
-        if file_path.exists():
-            with open(file_path, "r", encoding="utf-8") as f:
-                saved_data = json.load(f)
-        else:
-            saved_data = {}
-
-        # Track if anything new added
-        new_added = False
+        new_added = get_store().enable_electives(self.user_info.username)
 
-        # Add new elective units if not already in JSON
-        for unit_code, unit_info in self.all_electives_dict.items():
-            if unit_code not in saved_data:
-                saved_data[unit_code] = unit_info
-                new_added = True
-
-        # Save only if something new was added
+        # Report whether anything was added
         if new_added:
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(saved_data, f, indent=4)
-            print(f"Updated {file_path} with new elective units.")
+            print(f"Updated {self.user_info.username}'s elective units.")
         else:
             print("No new elective units to add. JSON already up-to-date.")
     
@@ -479,7 +433,7 @@ class PlannerForElective():
     #-----------------------Save Info----------------------------------
     def saved_as_JSON(self):
         """
-        Save final planner as JSON. Returns True if successful, False otherwise.
+        Save final planner into the user store. Returns True if successful, False otherwise.
         """
         json_dict = {}
         status = "planned"
@@ -496,11 +450,7 @@ class PlannerForElective():
         for unit in self.final_unit_list_for_current_sem:
             json_dict[unit] = status
 
-        filename = f"user_info/{self.user_info.username}/Y{self.user_info.year}S{self.user_info.sem}_units.json"
-        os.makedirs(f"user_info/{self.user_info.username}", exist_ok=True)
-
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(json_dict, f, indent=4)
+        get_store().save_plan(self.user_info.username, f"Y{self.user_info.year}S{self.user_info.sem}", json_dict)
 
         print(f"Planner saved for Y{self.user_info.year}S{self.user_info.sem}")
         return True  # indicate success
@@ -0,0 +1,109 @@
+import threading
+from catalog import get_catalog
+from prereq import compile_prereq, completed_mask
+
+
+def current_semester(intake, sem):
+    """
+    Convert the user's own semester number into the teaching period
+
+    Feb intake: sem 1 -> February (1), sem 2 -> July (2)
+    July intake: sem 1 -> July (2), sem 2 -> February (1)
+    """
+    intake = int(intake)
+    sem = int(sem)
+    if intake == 2:
+        return 2 if sem == 1 else 1
+    return sem
+
+
+def _offered_semesters(sem_available):
+    """
+    @param sem_available - csv style "1;2" string
+    @returns set of semester numbers, ignoring anything that is not a number
+    """
+    return {int(s) for s in sem_available.split(";") if s.strip().isdigit()}
+
+
+class EligibilityTable():
+    """
+    Precomputed availability and prerequisite data for a set of units
+
+    Each unit gets a position, semester availability is stored as one bitmask per semester,
+    and units that share a prereq string share one compiled rule, so a whole table is
+    evaluated with one check per distinct rule plus a few mask operations.
+    """
+
+    def __init__(self, units):
+        """
+        @param units - dict of unit_code -> unit info (needs sem_available and prereq)
+        """
+        self.codes = list(units.keys())
+        self.sem_masks = {}
+        self.rule_groups = {}
+
+        for position, code in enumerate(self.codes):
+            info = units[code]
+            for sem in _offered_semesters(info.get("sem_available", "")):
+                self.sem_masks[sem] = self.sem_masks.get(sem, 0) | (1 << position)
+
+            rule = compile_prereq(info.get("prereq", "NONE"))
+            self.rule_groups[rule] = self.rule_groups.get(rule, 0) | (1 << position)
+
+    def evaluate(self, completed_units, current_sem):
+        """
+        @param completed_units - passed unit codes (or a bitmask from prereq.completed_mask)
+        @param current_sem - teaching period, 1 (February) or 2 (July)
+        @returns dict of unit_code -> {available_this_sem, prereq_fulfilled, can_take}
+        """
+        passed = completed_mask(completed_units)
+
+        prereq_mask = 0
+        for rule, positions in self.rule_groups.items():
+            if rule.is_met(passed):
+                prereq_mask |= positions
+
+        available_mask = self.sem_masks.get(current_sem, 0) if isinstance(current_sem, int) else 0
+        can_take_mask = prereq_mask & available_mask
+
+        matrix = {}
+        for position, code in enumerate(self.codes):
+            bit = 1 << position
+            matrix[code] = {
+                "available_this_sem": bool(available_mask & bit),
+                "prereq_fulfilled": bool(prereq_mask & bit),
+                "can_take": bool(can_take_mask & bit)
+            }
+        return matrix
+
+
+_catalog_table = None
+_catalog_table_version = None
+_table_lock = threading.Lock()
+
+
+def catalog_table():
+    """
+    @returns the EligibilityTable for every catalog unit, rebuilt only when the catalog reloads
+    """
+    global _catalog_table, _catalog_table_version
+    catalog = get_catalog()
+    if _catalog_table_version != catalog.version:
+        with _table_lock:
+            if _catalog_table_version != catalog.version:
+                _catalog_table = EligibilityTable(catalog.all_units())
+                _catalog_table_version = catalog.version
+    return _catalog_table
+
+
+def check_eligibility(completed_units, current_sem, units=None):
+    """
+    Evaluate semester availability and prerequisites for many units in one pass
+
+    @param completed_units - passed unit codes (or bitmask)
+    @param current_sem - teaching period, 1 (February) or 2 (July)
+    @param units - dict of unit_code -> unit info, defaults to the whole catalog
+    @returns dict of unit_code -> {available_this_sem, prereq_fulfilled, can_take}
+    """
+    table = catalog_table() if units is None else EligibilityTable(units)
+    return table.evaluate(completed_units, current_sem)
@@ -1,7 +1,8 @@
-import json
-import os
 from pathlib import Path
 from datetime import datetime
+from storage import get_store
+from forum_store import discussion_counts, forum_log, load_discussions
+from resources_rec import resource_index
 
 
 class ForumManager:
@@ -35,35 +36,29 @@ class ForumManager:
         """
         all_units = {}
         
-        # Load core units
-        core_path = self.user_folder / "core_units.json"
-        if core_path.exists():
-            with open(core_path, 'r', encoding='utf-8') as f:
-                core_data = json.load(f)
-                for code, info in core_data.items():
+        store = get_store()
+        
+        # Load core units, then elective units
+        for kind in ("core", "elective"):
+            for code, info in store.load_units(self.username, kind).items():
+                if code not in all_units:  # Avoid duplicates
                     all_units[code] = {
                         'code': code,
                         'name': info.get('unit_name', code),
                         'description': info.get('description', 'No description available'),
-                        'type': 'core'
+                        'type': kind
                     }
         
-        # Load elective units
-        elective_path = self.user_folder / "elective_units.json"
-        if elective_path.exists():
-            with open(elective_path, 'r', encoding='utf-8') as f:
-                elective_data = json.load(f)
-                for code, info in elective_data.items():
-                    if code not in all_units:  # Avoid duplicates
-                        all_units[code] = {
-                            'code': code,
-                            'name': info.get('unit_name', code),
-                            'description': info.get('description', 'No description available'),
-                            'type': 'elective'
-                        }
-        
         return all_units
     
+    def discussion_path(self, unit_code, tag):
+        """
+        @returns path of the discussion file, private discussions live in the user's own folder
+        """
+        if tag == 'private':
+            return self.private_folder / f"{unit_code}_private.json"
+        return self.forum_folder / f"{unit_code}_{tag}.json"
+    
     def get_unit_discussions(self, unit_code, tag):
         """
         Get all discussions for a specific unit and tag
@@ -74,22 +69,52 @@ class ForumManager:
         Returns:
             list: List of discussion threads
         """
-        if tag == 'private':
-            # Load from user's private folder
-            file_path = self.private_folder / f"{unit_code}_private.json"
-        else:
-            # Load from public forum folder
-            file_path = self.forum_folder / f"{unit_code}_{tag}.json"
-        
-        if not file_path.exists():
-            return []
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                discussions = json.load(f)
-                return discussions
-        except json.JSONDecodeError:
-            return []
+        file_path = self.discussion_path(unit_code, tag)
+        
+        # Served from the in-memory view, only new log events are read from disk
+        return load_discussions(file_path)
+    
+    def get_discussions_page(self, unit_code, tag, sort='recent', cursor=None, limit=20):
+        """
+        Get one page of discussion threads, replies are loaded separately with get_replies
+        
+        @param unit_code (str): The unit code
+        @param tag (str): Discussion tag
+        @param sort (str): 'recent', 'likes' or 'replies'
+        @param cursor (str): next_cursor from the previous page, None for the first page
+        @param limit (int): Number of threads per page
+        
+        @return dict: {'discussions': [...], 'next_cursor': str or None}
+        @raises ValueError: Unknown sort or invalid cursor
+        """
+        file_path = self.discussion_path(unit_code, tag)
+        discussions, next_cursor = forum_log(file_path).page(sort, cursor, limit)
+        return {'discussions': discussions, 'next_cursor': next_cursor}
+    
+    def get_replies(self, unit_code, tag, discussion_id, offset=0, limit=20):
+        """
+        Get replies of one discussion thread
+        
+        @param unit_code (str): The unit code
+        @param tag (str): Discussion tag
+        @param discussion_id (int): ID of the discussion
+        @param offset (int): Number of replies to skip
+        @param limit (int): Number of replies to return
+        
+        @return dict: Result with success status, replies and total reply count
+        """
+        file_path = self.discussion_path(unit_code, tag)
+        result = forum_log(file_path).replies(discussion_id, offset, limit)
+        if result is None:
+            return {'success': False, 'error': 'Discussion ID not found'}
+        
+        replies, total = result
+        return {
+            'success': True,
+            'replies': replies,
+            'total': total,
+            'next_offset': offset + len(replies) if offset + len(replies) < total else None
+        }
     
     def add_discussion(self, unit_code, tag, title, content):
         """
@@ -102,36 +127,25 @@ class ForumManager:
         
         @return dict: The created discussion with success status
         """
-        if tag == 'private':
-            file_path = self.private_folder / f"{unit_code}_private.json"
-        else:
-            file_path = self.forum_folder / f"{unit_code}_{tag}.json"
-        
-        # Load existing discussions
-        discussions = []
-        if file_path.exists():
-            with open(file_path, 'r', encoding='utf-8') as f:
-                try:
-                    discussions = json.load(f)
-                except json.JSONDecodeError:
-                    discussions = []
-        
-        # Create new discussion
-        new_discussion = {
-            'id': len(discussions) + 1,
-            'username': self.username,
-            'title': title,
-            'content': content,
-            'timestamp': datetime.now().isoformat(),
-            'likes': [],
-            'replies': []
-        }
-        
-        discussions.append(new_discussion)
-        
-        # Save discussions
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(discussions, f, indent=4)
+        file_path = self.discussion_path(unit_code, tag)
+        
+        # Lock the forum file and append the new thread to its log
+        with forum_log(file_path).writing() as thread_log:
+            # Create new discussion, ids come from a counter so they are never reused after a delete
+            new_discussion = {
+                'id': thread_log.next_id(),
+                'username': self.username,
+                'title': title,
+                'content': content,
+                'timestamp': datetime.now().isoformat(),
+                'likes': [],
+                'replies': []
+            }
+            
+            thread_log.append({'op': 'thread', 'discussion': new_discussion})
+            discussion_counts(file_path.parent).set_count(unit_code, tag, len(thread_log.threads))
+            if tag == 'resources':
+                resource_index(file_path).update(thread_log, new_discussion['id'])
         
         return {
             'success': True,
@@ -149,36 +163,21 @@ class ForumManager:
         
         @return dict: Result with success status
         """
-        if tag == 'private':
-            file_path = self.private_folder / f"{unit_code}_private.json"
-        else:
-            file_path = self.forum_folder / f"{unit_code}_{tag}.json"
-        
-        if not file_path.exists():
-            return {'success': False, 'error': 'Discussion not found'}
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            discussions = json.load(f)
-        
-        # Find the discussion
-        discussion_found = False
-        for discussion in discussions:
-            if discussion['id'] == discussion_id:
-                new_reply = {
-                    'username': self.username,
-                    'content': content,
-                    'timestamp': datetime.now().isoformat()
-                }
-                discussion['replies'].append(new_reply)
-                discussion_found = True
-                break
-        
-        if not discussion_found:
-            return {'success': False, 'error': 'Discussion ID not found'}
-        
-        # Save updated discussions
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(discussions, f, indent=4)
+        file_path = self.discussion_path(unit_code, tag)
+        
+        with forum_log(file_path).writing() as thread_log:
+            # Find the discussion
+            if thread_log.get(discussion_id) is None:
+                return {'success': False, 'error': 'Discussion ID not found'}
+            
+            new_reply = {
+                'username': self.username,
+                'content': content,
+                'timestamp': datetime.now().isoformat()
+            }
+            thread_log.append({'op': 'reply', 'id': discussion_id, 'reply': new_reply})
+            if tag == 'resources':
+                resource_index(file_path).update(thread_log, discussion_id)
         
         return {'success': True, 'message': 'Reply added successfully'}
     
@@ -190,15 +189,27 @@ class ForumManager:
         
         @return dict: Statistics including count per tag
         """
-        stats = {
-            'general': 0,
-            'resources': 0,
-            'private': 0
-        }
+        return self.get_all_discussion_stats([unit_code])[unit_code]
+    
+    def get_all_discussion_stats(self, unit_codes):
+        """
+        Get discussion counts for many units with one lookup of the public and private counters
+        
+        @param unit_codes (list): Unit codes to report
         
-        for tag in ['general', 'resources', 'private']:
-            discussions = self.get_unit_discussions(unit_code, tag)
-            stats[tag] = len(discussions)
+        @return dict: {unit_code: {'general': int, 'resources': int, 'private': int}}
+        """
+        public_counts = discussion_counts(self.forum_folder).all_counts()
+        private_counts = discussion_counts(self.private_folder).all_counts()
+        
+        stats = {}
+        for unit_code in unit_codes:
+            unit_counts = public_counts.get(unit_code, {})
+            stats[unit_code] = {
+                'general': unit_counts.get('general', 0),
+                'resources': unit_counts.get('resources', 0),
+                'private': private_counts.get(unit_code, {}).get('private', 0)
+            }
         
         return stats
     
@@ -229,34 +240,22 @@ class ForumManager:
         
         @return dict: Result with success status
         """
-        if tag == 'private':
-            file_path = self.private_folder / f"{unit_code}_private.json"
-        else:
-            file_path = self.forum_folder / f"{unit_code}_{tag}.json"
-        
-        if not file_path.exists():
-            return {'success': False, 'error': 'Discussion not found'}
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            discussions = json.load(f)
-        
-        # Find and remove the discussion
-        discussion_found = False
-        for i, discussion in enumerate(discussions):
-            if discussion['id'] == discussion_id:
-                # Check if user is the creator
-                if discussion['username'] != self.username:
-                    return {'success': False, 'error': 'You can only delete your own discussions'}
-                discussions.pop(i)
-                discussion_found = True
-                break
-        
-        if not discussion_found:
-            return {'success': False, 'error': 'Discussion ID not found'}
-        
-        # Save updated discussions
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(discussions, f, indent=4)
+        file_path = self.discussion_path(unit_code, tag)
+        
+        with forum_log(file_path).writing() as thread_log:
+            # Find the discussion
+            discussion = thread_log.get(discussion_id)
+            if discussion is None:
+                return {'success': False, 'error': 'Discussion ID not found'}
+            
+            # Check if user is the creator
+            if discussion['username'] != self.username:
+                return {'success': False, 'error': 'You can only delete your own discussions'}
+            
+            thread_log.append({'op': 'delete', 'id': discussion_id})
+            discussion_counts(file_path.parent).set_count(unit_code, tag, len(thread_log.threads))
+            if tag == 'resources':
+                resource_index(file_path).update(thread_log, discussion_id)
         
         return {'success': True, 'message': 'Discussion deleted successfully'}
     
@@ -271,40 +270,20 @@ class ForumManager:
         
         @return dict: {'success': bool, 'liked': bool, 'like_count': int}
         """
-        if tag == 'private':
-            file_path = self.private_folder / f"{unit_code}_private.json"
-        else:
-            file_path = self.forum_folder / f"{unit_code}_{tag}.json"
-        
-        if not file_path.exists():
-            return {'success': False, 'error': 'Discussion not found'}
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            discussions = json.load(f)
-        
-        # Find the discussion
-        for discussion in discussions:
-            if discussion['id'] == discussion_id:
-                # Initialize likes list if it doesn't exist (for old discussions)
-                if 'likes' not in discussion:
-                    discussion['likes'] = []
-                
-                # Toggle like
-                if username in discussion['likes']:
-                    discussion['likes'].remove(username)
-                    liked = False
-                else:
-                    discussion['likes'].append(username)
-                    liked = True
-                
-                # Save
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(discussions, f, indent=4)
-                
-                return {
-                    'success': True,
-                    'liked': liked,
-                    'like_count': len(discussion['likes'])
-                }
-        
-        return {'success': False, 'error': 'Discussion not found'}
\ No newline at end of file
+        file_path = self.discussion_path(unit_code, tag)
+        
+        with forum_log(file_path).writing() as thread_log:
+            # Find the discussion
+            discussion = thread_log.get(discussion_id)
+            if discussion is None:
+                return {'success': False, 'error': 'Discussion not found'}
+            
+            # Toggle like, the event records the new state (old discussions may have no likes list)
+            liked = username not in discussion.get('likes', [])
+            thread_log.append({'op': 'like', 'id': discussion_id, 'username': username, 'liked': liked})
+            
+            return {
+                'success': True,
+                'liked': liked,
+                'like_count': len(discussion['likes'])
+            }
\ No newline at end of file
@@ -0,0 +1,728 @@
+import base64
+import bisect
+import json
+import os
+import re
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+#number of log events after which the log is compacted into the snapshot
+COMPACT_AFTER_EVENTS = 200
+#bytes read at a time when streaming a forum snapshot
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def _sidecar(path, suffix):
+    """
+    forum_data/FIT1045_general.json -> forum_data/FIT1045_general.json.lock
+    """
+    return path.with_name(path.name + suffix)
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Exclusive advisory lock on one forum file, held through a separate .lock file
+
+    The lock is per file, so writers of different units/tags never wait for each other,
+    and it works between processes (gunicorn workers) as well as threads.
+    """
+    lock_path = _sidecar(Path(path), ".lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            #LK_LOCK retries for about 10 seconds, keep trying until the lock is free
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def read_json(path, default):
+    """
+    Read a forum file without locking, files are only ever replaced whole so a reader
+    sees either the old or the new version
+
+    @returns the parsed JSON, or default if the file is missing or invalid
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+#process umask, read once at import (os.umask can only be read by setting it)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def match_target_mode(temp_path, path):
+    """
+    Give a temporary file the permissions of the file it will replace, or the default
+    0o666 & ~umask for a new file (mkstemp creates it as 0600 and os.replace keeps that)
+    """
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    os.chmod(temp_path, mode)
+
+
+def atomic_write_json(path, data):
+    """
+    Write to a temporary file in the same folder, then rename it over the target
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        match_target_mode(temp_path, path)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def next_id(path, items):
+    """
+    Read, bump and persist the id counter kept in the .seq file of a forum file
+    A missing counter starts from the highest id in items, ids are never reused after a delete
+
+    Caller must hold file_lock(path)
+    """
+    seq_path = _sidecar(Path(path), ".seq")
+    last_id = read_json(seq_path, None)
+    if not isinstance(last_id, int):
+        last_id = max((item.get("id", 0) for item in items), default=0)
+    new_id = last_id + 1
+    #the counter is written before the thread so a crash can skip an id but never repeat one
+    atomic_write_json(seq_path, new_id)
+    return new_id
+
+
+def renumber_duplicates(path, discussions):
+    """
+    Older versions numbered a new thread len(discussions) + 1, so a delete followed by a post
+    could repeat an id. The first thread with an id keeps it (the one older code replied to,
+    liked and deleted), every later one gets a fresh id past the highest, and the .seq counter
+    is moved past them so they are never handed out again
+
+    Caller must hold file_lock(path)
+    @returns True if any id was changed (discussions are changed in place)
+    """
+    seen = set()
+    duplicates = []
+    for discussion in discussions:
+        if discussion["id"] in seen:
+            duplicates.append(discussion)
+        else:
+            seen.add(discussion["id"])
+    if not duplicates:
+        return False
+
+    seq_path = _sidecar(Path(path), ".seq")
+    last_id = read_json(seq_path, None)
+    highest = max(seen)
+    if not isinstance(last_id, int) or last_id < highest:
+        last_id = highest
+    for discussion in duplicates:
+        last_id += 1
+        print(f"Forum {Path(path).name}: duplicate thread id {discussion['id']} renumbered to {last_id}")
+        discussion["id"] = last_id
+    atomic_write_json(seq_path, last_id)
+    return True
+
+
+def _stat_key(path):
+    """
+    @returns (inode, mtime, size) of a file, None if missing
+    atomic_write_json always creates a new inode, so any rewrite changes the key
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def _log_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def apply_event(threads, event):
+    """
+    Apply one log event to a {thread_id: discussion} dict
+
+    Events are idempotent (a thread that already exists is kept, a reply already present is
+    not added twice, likes record the final state), so replaying events that were already
+    compacted into the snapshot after a crash gives the same result.
+    """
+    op = event.get("op")
+    if op == "thread":
+        discussion = event["discussion"]
+        threads.setdefault(discussion["id"], discussion)
+        return
+
+    discussion = threads.get(event.get("id"))
+    if discussion is None:
+        return
+    if op == "reply":
+        replies = discussion.setdefault("replies", [])
+        if event["reply"] not in replies:
+            replies.append(event["reply"])
+    elif op == "like":
+        likes = discussion.setdefault("likes", [])
+        if event["liked"] and event["username"] not in likes:
+            likes.append(event["username"])
+        elif not event["liked"] and event["username"] in likes:
+            likes.remove(event["username"])
+    elif op == "delete":
+        del threads[event["id"]]
+
+
+#sort orders for paging, newest first within equal counts (ids only ever grow)
+SORT_KEYS = {
+    "recent": lambda discussion: (-discussion["id"],),
+    "likes": lambda discussion: (-len(discussion.get("likes", [])), -discussion["id"]),
+    "replies": lambda discussion: (-len(discussion.get("replies", [])), -discussion["id"]),
+}
+
+
+def encode_cursor(sort, key):
+    """
+    Opaque cursor pointing just after the thread with this sort key
+    """
+    raw = json.dumps({"sort": sort, "key": list(key)}).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor, sort):
+    """
+    @returns the sort key stored in a cursor
+    @raises ValueError if the cursor is malformed or belongs to another sort order
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        key = tuple(int(part) for part in data["key"])
+    except (ValueError, TypeError, KeyError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if data.get("sort") != sort or len(key) != len(SORT_KEYS[sort]({"id": 0})):
+        raise ValueError("Cursor does not match the sort order")
+    return key
+
+
+class ThreadIndex():
+    """
+    One sorted list of keys per sort order, kept up to date as events are applied,
+    so a page is a binary search plus a slice no matter how many threads a file has
+    """
+
+    def __init__(self):
+        self.keys = {sort: [] for sort in SORT_KEYS}
+        self._thread_keys = {}
+
+    def rebuild(self, threads):
+        self._thread_keys = {
+            thread_id: {sort: key_fn(discussion) for sort, key_fn in SORT_KEYS.items()}
+            for thread_id, discussion in threads.items()
+        }
+        for sort in SORT_KEYS:
+            self.keys[sort] = sorted(keys[sort] for keys in self._thread_keys.values())
+
+    def update(self, thread_id, discussion):
+        """
+        Move a thread to its new position, discussion None removes it
+        """
+        old_keys = self._thread_keys.pop(thread_id, None)
+        if old_keys is not None:
+            for sort, key in old_keys.items():
+                keys = self.keys[sort]
+                position = bisect.bisect_left(keys, key)
+                if position < len(keys) and keys[position] == key:
+                    del keys[position]
+        if discussion is None:
+            return
+        new_keys = {sort: key_fn(discussion) for sort, key_fn in SORT_KEYS.items()}
+        for sort, key in new_keys.items():
+            bisect.insort(self.keys[sort], key)
+        self._thread_keys[thread_id] = new_keys
+
+    def page(self, sort, after_key, limit):
+        """
+        @returns (thread ids of the page, sort key of the last one or None if there is no next page)
+        """
+        keys = self.keys[sort]
+        start = bisect.bisect_right(keys, after_key) if after_key is not None else 0
+        page_keys = keys[start:start + limit]
+        has_more = start + limit < len(keys)
+        return [-key[-1] for key in page_keys], (page_keys[-1] if has_more and page_keys else None)
+
+
+class ForumLog():
+    """
+    Append-only storage of one forum file ({unit}_{tag}.json)
+
+    {unit}_{tag}.json - snapshot, the same list of discussions older versions wrote
+    {unit}_{tag}.jsonl - events written since the snapshot, one JSON object per line
+                         (thread, reply, like, delete)
+
+    A write appends one line instead of rewriting every thread. Each process keeps the
+    discussions in memory and only reads the part of the log it has not seen yet. Once enough
+    events pile up a background thread folds them into a new snapshot and empties the log.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.log_path = self.path.with_suffix(".jsonl")
+        self.threads = {}
+        self.index = ThreadIndex()
+        self._snapshot_key = None
+        self._offset = 0
+        self._pending = 0
+        self._lock = threading.RLock()
+        self._compacting = False
+
+    #-------------reading------------------
+    def _is_current(self):
+        return _stat_key(self.path) == self._snapshot_key and _log_size(self.log_path) == self._offset
+
+    def _refresh(self):
+        """
+        Bring the in-memory view up to date with the files, caller holds both locks
+        """
+        snapshot_key = _stat_key(self.path)
+        if snapshot_key != self._snapshot_key or _log_size(self.log_path) < self._offset:
+            data = read_json(self.path, [])
+            if renumber_duplicates(self.path, data):
+                # Keyed by id below, the snapshot must not lose the threads that shared an id
+                atomic_write_json(self.path, data)
+                snapshot_key = _stat_key(self.path)
+            self.threads = {discussion["id"]: discussion for discussion in data}
+            self.index.rebuild(self.threads)
+            self._snapshot_key = snapshot_key
+            self._offset = 0
+            self._pending = 0
+
+        try:
+            log_file = open(self.log_path, "rb")
+        except FileNotFoundError:
+            return
+        with log_file:
+            log_file.seek(self._offset)
+            for line in log_file:
+                #a line without newline or invalid JSON is an unfinished write, stop before it
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    break
+                self._apply(event)
+                self._offset += len(line)
+                self._pending += 1
+
+    def discussions(self):
+        """
+        @returns list of discussions in posting order, copies that the caller may change
+        """
+        self._ensure_current()
+        with self._lock:
+            return [
+                dict(discussion, likes=list(discussion.get("likes", [])), replies=list(discussion.get("replies", [])))
+                for discussion in self.threads.values()
+            ]
+
+    def _ensure_current(self):
+        if not self._is_current():
+            with self._lock, file_lock(self.path):
+                self._refresh()
+
+    def page(self, sort="recent", cursor=None, limit=20):
+        """
+        One page of threads without their replies (reply_count and like_count are included)
+
+        @param sort - "recent", "likes" or "replies"
+        @param cursor - next_cursor of the previous page, None for the first page
+        @param limit - threads per page
+        @returns (list of thread summaries, next_cursor or None on the last page)
+        @raises ValueError for an unknown sort or invalid cursor
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort: {sort}")
+        after_key = decode_cursor(cursor, sort) if cursor else None
+
+        self._ensure_current()
+        with self._lock:
+            thread_ids, last_key = self.index.page(sort, after_key, limit)
+            summaries = []
+            for thread_id in thread_ids:
+                discussion = self.threads[thread_id]
+                summary = {key: value for key, value in discussion.items() if key != "replies"}
+                summary["likes"] = list(discussion.get("likes", []))
+                summary["like_count"] = len(summary["likes"])
+                summary["reply_count"] = len(discussion.get("replies", []))
+                summaries.append(summary)
+        return summaries, (encode_cursor(sort, last_key) if last_key is not None else None)
+
+    def replies(self, thread_id, offset=0, limit=20):
+        """
+        @returns (replies of one thread from offset, total reply count), None if the thread is not found
+        """
+        self._ensure_current()
+        with self._lock:
+            discussion = self.threads.get(thread_id)
+            if discussion is None:
+                return None
+            replies = discussion.get("replies", [])
+            return list(replies[offset:offset + limit]), len(replies)
+
+    #-------------writing------------------
+    @contextmanager
+    def writing(self):
+        """
+        Lock the forum file and bring the view up to date, then the block can look at
+        threads with get() and record changes with append()
+
+        with forum_log(path).writing() as log:
+            if log.get(thread_id) is not None:
+                log.append({"op": "delete", "id": thread_id})
+        """
+        with self._lock, file_lock(self.path):
+            self._refresh()
+            #drop an unfinished line left by a crashed writer before appending after it
+            if _log_size(self.log_path) > self._offset:
+                with open(self.log_path, "r+b") as log_file:
+                    log_file.truncate(self._offset)
+            yield self
+        if self._pending >= COMPACT_AFTER_EVENTS:
+            self._start_compaction()
+
+    def get(self, thread_id):
+        """
+        @returns the live discussion dict (only inside writing()), None if not found
+        """
+        return self.threads.get(thread_id)
+
+    def next_id(self):
+        return next_id(self.path, self.threads.values())
+
+    def append(self, event):
+        """
+        Write one event to the log and apply it to the view (only inside writing())
+        """
+        line = (json.dumps(event) + "\n").encode("utf-8")
+        with open(self.log_path, "ab") as log_file:
+            log_file.write(line)
+            log_file.flush()
+            os.fsync(log_file.fileno())
+        self._offset += len(line)
+        self._pending += 1
+        self._apply(event)
+
+    def _apply(self, event):
+        """
+        Apply an event to the view and move the thread it touched in the index
+        """
+        thread_id = event["discussion"]["id"] if event.get("op") == "thread" else event.get("id")
+        apply_event(self.threads, event)
+        self.index.update(thread_id, self.threads.get(thread_id))
+
+    #-------------compaction------------------
+    def _start_compaction(self):
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+        threading.Thread(target=self.compact, daemon=True).start()
+
+    def compact(self):
+        """
+        Fold the log into a new snapshot and empty the log
+        A crash between the two steps only replays events already in the snapshot (see apply_event)
+        """
+        try:
+            with self._lock, file_lock(self.path):
+                self._refresh()
+                if self._pending == 0:
+                    return
+                atomic_write_json(self.path, list(self.threads.values()))
+                with open(self.log_path, "r+b") as log_file:
+                    log_file.truncate(0)
+                self._snapshot_key = _stat_key(self.path)
+                self._offset = 0
+                self._pending = 0
+        finally:
+            self._compacting = False
+
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+
+def forum_log(path):
+    """
+    @returns the process-wide ForumLog of a forum file
+    """
+    key = os.path.abspath(path)
+    log = _logs.get(key)
+    if log is None:
+        with _logs_lock:
+            log = _logs.setdefault(key, ForumLog(path))
+    return log
+
+
+def load_discussions(path):
+    """
+    Every discussion of a forum file, including events not compacted into the snapshot yet
+    """
+    return forum_log(path).discussions()
+
+
+def iter_json_array(path, chunk_size=READ_CHUNK_SIZE):
+    """
+    Yield the items of a JSON array file one at a time, reading it in chunks
+    so only one item (plus a chunk) is in memory at once
+
+    Stops quietly if the file is missing, and at the first invalid item like read_json
+    """
+    decoder = json.JSONDecoder()
+    try:
+        f = open(path, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with f:
+        buffer = ""
+        position = 0
+        started = False
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer):
+                if not started:
+                    if buffer[position] != "[":
+                        return
+                    started = True
+                    position += 1
+                    continue
+                if buffer[position] == "]":
+                    return
+                try:
+                    item, position = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    pass  # item continues in the next chunk
+                else:
+                    yield item
+                    continue
+
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            buffer = buffer[position:] + chunk
+            position = 0
+
+
+def _read_events(log_path):
+    """
+    @returns complete events of a forum log, stopping before an unfinished write
+    """
+    events = []
+    try:
+        log_file = open(log_path, "rb")
+    except FileNotFoundError:
+        return events
+    with log_file:
+        for line in log_file:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                break
+    return events
+
+
+def iter_discussions(path):
+    """
+    Yield every discussion of a forum file (same result and order as load_discussions)
+    without holding the whole forum in memory
+
+    If this process already keeps the forum in memory the shared discussions are yielded
+    (treat them as read-only), otherwise the snapshot is streamed from disk and the log,
+    which compaction keeps short, is applied on the way.
+    """
+    log = _logs.get(os.path.abspath(path))
+    if log is not None:
+        log._ensure_current()
+        with log._lock:
+            threads = list(log.threads.values())
+        yield from threads
+        return
+
+    yield from _stream_discussions(path)
+
+
+def _stream_discussions(path):
+    """
+    iter_discussions straight from the files, without taking any lock, so it is safe to call
+    while forum locks are held (a writer's events are seen once they are fully written)
+    """
+    # The log is read before the snapshot is opened: if a compaction happens in between,
+    # the new snapshot already contains the events and replaying them changes nothing
+    events_by_thread = {}
+    for event in _read_events(Path(path).with_suffix(".jsonl")):
+        thread_id = event["discussion"]["id"] if event.get("op") == "thread" else event.get("id")
+        events_by_thread.setdefault(thread_id, []).append(event)
+
+    for discussion in iter_json_array(path):
+        threads = {discussion["id"]: discussion}
+        for event in events_by_thread.pop(discussion["id"], []):
+            apply_event(threads, event)
+        yield from threads.values()
+
+    # Threads created since the last compaction, in posting order
+    for thread_events in events_by_thread.values():
+        threads = {}
+        for event in thread_events:
+            apply_event(threads, event)
+        yield from threads.values()
+
+
+def forum_fingerprint(path):
+    """
+    @returns JSON-friendly fingerprint of a forum file and its log, changes on every write
+    (a compaction changes it too, without changing the discussions)
+    """
+    key = _stat_key(path)
+    return [list(key) if key else None, _log_size(Path(path).with_suffix(".jsonl"))]
+
+
+#file in each forum folder that keeps the thread count of every unit/tag
+COUNTS_FILE = "discussion_counts.json"
+
+#FIT1045_general.json / FIT1045_general.jsonl -> (FIT1045, general)
+FORUM_FILE_RE = re.compile(r"^(.+)_(general|resources|private)\.jsonl?$")
+
+
+class DiscussionCounts():
+    """
+    Thread counts of every forum file in one folder, {unit_code: {tag: count}}
+
+    Writers store the new thread count of one unit/tag after a thread is added or deleted,
+    so readers answer counts for every unit with one small file instead of parsing every
+    forum file. If the counts file is missing (first use, or deleted to force a recount) it
+    is rebuilt from the forum files by whoever needs it first, reader or writer.
+
+    Lock order is forum file, then counts file. The recount holds the counts lock and reads
+    the forums without their locks; a writer it races with stores its exact count after the
+    recount, so a thread can be neither lost nor counted twice.
+    """
+
+    def __init__(self, folder):
+        self.folder = Path(folder)
+        self.path = self.folder / COUNTS_FILE
+        self._counts = {}
+        self._key = None
+        self._lock = threading.Lock()
+
+    def _recount(self):
+        """
+        Count every forum file in the folder, caller holds file_lock(self.path)
+        """
+        counts = {}
+        if not self.folder.is_dir():
+            return counts
+        for entry in self.folder.iterdir():
+            match = FORUM_FILE_RE.match(entry.name)
+            if match:
+                unit_code, tag = match.groups()
+                total = sum(1 for _ in _stream_discussions(self.folder / f"{unit_code}_{tag}.json"))
+                counts.setdefault(unit_code, {})[tag] = total
+        return counts
+
+    def _read_or_recount(self):
+        """
+        @returns the stored counts, recounted and written first if the file is missing
+        Caller holds file_lock(self.path)
+        """
+        counts = read_json(self.path, None)
+        if counts is None:
+            counts = self._recount()
+            atomic_write_json(self.path, counts)
+        return counts
+
+    def all_counts(self):
+        """
+        @returns {unit_code: {tag: count}} for the whole folder, only units with forum files appear
+        """
+        key = _stat_key(self.path)
+        if key is None:
+            with file_lock(self.path):
+                self._read_or_recount()
+            key = _stat_key(self.path)
+
+        with self._lock:
+            if key != self._key:
+                self._counts = read_json(self.path, {})
+                self._key = key
+            return self._counts
+
+    def count(self, unit_code, tag):
+        return self.all_counts().get(unit_code, {}).get(tag, 0)
+
+    def set_count(self, unit_code, tag, count):
+        """
+        Store the thread count of one unit/tag, called while the forum file's lock is held
+        with the count of its locked log, so the stored value is exact whatever ran before
+        """
+        with file_lock(self.path):
+            counts = self._read_or_recount()
+            counts.setdefault(unit_code, {})[tag] = count
+            atomic_write_json(self.path, counts)
+
+
+_counts = {}
+_counts_lock = threading.Lock()
+
+
+def discussion_counts(folder):
+    """
+    @returns the process-wide DiscussionCounts of a forum folder
+    """
+    key = os.path.abspath(folder)
+    counts = _counts.get(key)
+    if counts is None:
+        with _counts_lock:
+            counts = _counts.setdefault(key, DiscussionCounts(folder))
+    return counts
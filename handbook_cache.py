@@ -0,0 +1,232 @@
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from forum_store import atomic_write_json, file_lock, match_target_mode, read_json
+from scrape import NOT_FOUND, get_scraper, page_digest
+
+# --- Folder of the cache, shared by every worker process ---
+HANDBOOK_CACHE_DIR = os.environ.get("HANDBOOK_CACHE_DIR", "handbook_cache")
+# Seconds a cached unit is served without asking the handbook, and the same for units it had no page for
+HANDBOOK_CACHE_TTL = float(os.environ.get("HANDBOOK_CACHE_TTL", str(24 * 3600)))
+HANDBOOK_CACHE_MISS_TTL = float(os.environ.get("HANDBOOK_CACHE_MISS_TTL", "3600"))
+# Serve cached units only and never contact the handbook
+HANDBOOK_OFFLINE = os.environ.get("HANDBOOK_OFFLINE", "").lower() in ("1", "true", "yes")
+
+#bump when the entry format or the page parsing changes so cached units are fetched again
+CACHE_VERSION = 1
+
+
+class HandbookOffline(Exception):
+    """
+    Raised in offline mode for a unit that is not in the cache
+    """
+
+
+def _write_bytes(path, content):
+    """
+    Write to a temporary file in the same folder, then rename it over the target
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        match_target_mode(temp_path, path)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class HandbookCache():
+    """
+    Scraped handbook pages on disk, keyed by (year, unit_code)
+
+    {folder}/pages/{sha256}.html       raw page HTML, stored once per distinct content and removed
+                                       once no entry refers to it
+    {folder}/units/{year}_{unit}.json  {"version", "year", "unit_code",
+                                        "info": [unit_name, semesters, assign, test, final],
+                                        "source", "page", "rendered", "etag", "last_modified",
+                                        "fetched_at", "checked_at"}
+
+    An entry checked within ttl is served without any request. A stale one parsed from plain
+    HTML is revalidated with a conditional request (ETag / Last-Modified, or the page digest when
+    the handbook sends neither), so an unchanged page costs one small request and no parsing.
+    A unit that needed the browser is rendered again. Only one caller refreshes a unit at a time,
+    the others wait on its lock and get the fresh entry. A unit is only cached as missing after
+    a 404, if a refresh fails for any other reason the stale entry is served. In offline mode
+    only cached entries are served.
+    """
+
+    def __init__(self, folder=HANDBOOK_CACHE_DIR, ttl=HANDBOOK_CACHE_TTL, miss_ttl=HANDBOOK_CACHE_MISS_TTL,
+                 offline=HANDBOOK_OFFLINE, scraper=None):
+        self.folder = Path(folder)
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self.offline = offline
+        self.scraper = scraper
+
+    def _entry_path(self, year, unit_code):
+        # Year and code come from user input, keep them to one safe file name
+        key = re.sub(r"[^A-Za-z0-9]", "_", f"{year}_{unit_code}")
+        return self.folder / "units" / f"{key}.json"
+
+    def _page_path(self, digest):
+        return self.folder / "pages" / f"{digest}.html"
+
+    def _read(self, path):
+        entry = read_json(path, None)
+        if not isinstance(entry, dict) or entry.get("version") != CACHE_VERSION:
+            return None
+        return entry
+
+    def _fresh(self, entry):
+        ttl = self.ttl if entry["info"][0] is not None else self.miss_ttl
+        return time.time() - entry["checked_at"] < ttl
+
+    def _store_page(self, content):
+        """
+        @returns the digest of the page, None if there is no page
+        """
+        if content is None:
+            return None
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        digest = page_digest(content)
+        path = self._page_path(digest)
+        if not path.exists():
+            _write_bytes(path, content)
+        return digest
+
+    def read_page(self, digest):
+        """
+        @returns the stored HTML of a page digest, None if it is not stored
+        """
+        try:
+            return self._page_path(digest).read_bytes()
+        except (FileNotFoundError, TypeError):
+            return None
+
+    def lookup(self, year, unit_code):
+        """
+        @returns the cache entry of a unit, fetched or revalidated first when needed
+        @raises HandbookOffline in offline mode if the unit is not cached
+        @raises ScraperBusy if the unit is not cached and the scraper cannot take the request
+        """
+        path = self._entry_path(year, unit_code)
+        entry = self._read(path)
+        if entry is not None and (self.offline or self._fresh(entry)):
+            return entry
+        if self.offline:
+            raise HandbookOffline(f"{unit_code} ({year}) is not cached and the handbook is offline")
+
+        # Single flight: whoever holds the lock refreshes, the rest find a fresh entry after it
+        with file_lock(path):
+            entry = self._read(path)
+            if entry is not None and self._fresh(entry):
+                return entry
+            try:
+                return self._refresh(path, year, unit_code, entry)
+            except Exception as e:
+                if entry is None:
+                    raise
+                print(f"Handbook {unit_code} ({year}) refresh failed, serving the cached copy: {e}")
+                return entry
+
+    def _refresh(self, path, year, unit_code, entry):
+        scraper = self.scraper or get_scraper()
+        now = time.time()
+        if entry is not None and entry["source"] == "static":
+            fetched = scraper.fetch(year, unit_code, entry["etag"], entry["last_modified"], entry["page"])
+        else:
+            # An unchanged HTML shell says nothing about what the browser renders into it,
+            # so a unit that needed the browser is rendered again
+            fetched = scraper.fetch(year, unit_code)
+
+        if fetched["source"] == "not_modified":
+            entry["checked_at"] = now
+            entry["etag"] = fetched["etag"] or entry["etag"]
+            entry["last_modified"] = fetched["last_modified"] or entry["last_modified"]
+            atomic_write_json(path, entry)
+            return entry
+
+        # Pages are shared between entries, storing, referencing and pruning them happens
+        # under one lock so a page is never removed while another entry starts to use it
+        with file_lock(self.folder / "pages"):
+            new_entry = {
+                "version": CACHE_VERSION,
+                "year": str(year),
+                "unit_code": unit_code,
+                "info": list(fetched["info"] or NOT_FOUND),
+                "source": fetched["source"],
+                "page": self._store_page(fetched["html"]),
+                "rendered": self._store_page(fetched["rendered"]),
+                "etag": fetched["etag"],
+                "last_modified": fetched["last_modified"],
+                "fetched_at": now,
+                "checked_at": now,
+            }
+            atomic_write_json(path, new_entry)
+            if entry is not None:
+                self._prune_pages({entry["page"], entry["rendered"]} - {new_entry["page"], new_entry["rendered"]})
+        return new_entry
+
+    def _prune_pages(self, digests):
+        """
+        Remove the stored pages of digests no entry refers to any more, caller holds the pages lock
+        """
+        digests = set(digests) - {None}
+        if not digests:
+            return
+        for entry_path in (self.folder / "units").glob("*.json"):
+            entry = read_json(entry_path, None)
+            if isinstance(entry, dict):
+                digests -= {entry.get("page"), entry.get("rendered")}
+                if not digests:
+                    return
+        for digest in digests:
+            try:
+                self._page_path(digest).unlink()
+            except FileNotFoundError:
+                pass
+
+    def get_info(self, year, unit_code):
+        """
+        @returns unit_name, semester_str, assign, test, final (all None if the unit has no page)
+        """
+        return tuple(self.lookup(year, unit_code)["info"])
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def handbook_cache():
+    """
+    @returns the process-wide HandbookCache
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HandbookCache()
+        return _cache
+
+
+def get_info(year, unit_code):
+    """
+    Load unit information from the Monash Handbook, served from the cache when it is recent
+
+    @param year: The intake year to search for
+    @param unit_code: The unit code to search for
+
+    @return: unit_name, semester_str, assign, test, final
+    @raises HandbookOffline in offline mode if the unit is not cached
+    @raises ScraperBusy when the unit has to be scraped and every scraper is busy
+    """
+    return handbook_cache().get_info(year, unit_code)
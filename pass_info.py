@@ -2,6 +2,7 @@ import utilities as u
 import json
 import os
 from update_result import UpdateResult
+from storage import get_store
 
 class PreviousDetails():
     def __init__(self, user_info, update_results):
@@ -27,15 +28,14 @@ class PreviousDetails():
         self.user_info.sem = sem
         self.user_info.intake = intake
     
-    def check_file_path(self, file_path, year, sem):
+    def check_file_path(self, year, sem):
         """
-        @param file_path - path that includes username
         @param year - current year that is checking
         @param sem - current sem checking
-        check if file path exsits,
-        if file not found, append the error message to a list
+        check if the plan of that year and sem was saved,
+        if not found, append the error message to a list
         """
-        if os.path.exists(file_path):
+        if get_store().load_plan(self.user_info.username, f"Y{year}S{sem}") is not None:
             print(f"Found information for Y{year}S{sem}")
         else:
             string = (f"Cannot find information for Y{year}S{sem}")
@@ -63,8 +63,7 @@ class PreviousDetails():
         else:
             #check if previous record is available
             print("")
-            file_path = f"user_info/{self.user_info.username}/Y{year}S{sem}_units.json"
-            #check loop need to check if file exists for all previous year and sem
+            #check loop need to check if plan exists for all previous year and sem
             # Move to previous semester first
             if sem == 1:
                 sem = 2
@@ -74,8 +73,7 @@ class PreviousDetails():
 
             # Then start checking from that previous sem backward
             while year > 0:
-                file_path = f"user_info/{self.user_info.username}/Y{year}S{sem}_units.json"
-                self.check_file_path(file_path, year, sem)
+                self.check_file_path(year, sem)
 
                 if year == 1 and sem == 1:
                     break  # Stop once we reach Y1S1
@@ -92,35 +90,22 @@ class PreviousDetails():
 
     def check_json_planned(self):
         """
-        Check if the JSON file results had been entered, or just planned.
-        Only process files starting with 'Y' and ending with '.json'.
+        Check if the saved semester results had been entered, or just planned.
         """
-        file_path = f"user_info/{self.user_info.username}"
+        store = get_store()
 
-        # Ensure folder exists
-        while not os.path.exists(file_path):
+        # Ensure user exists
+        while not store.user_exists(self.user_info.username):
             print("Please enter a valid username")
             self.user_info.username = input("Enter your username: ")
-            file_path = f"user_info/{self.user_info.username}"
 
-        # List all files in folder
-        self.json_file_list = os.listdir(file_path)
+        plans = store.load_plans(self.user_info.username)
+        self.json_file_list = [f"{semester}_units.json" for semester in plans]
 
         if self.user_info.year == 1 and self.user_info.sem == 1:
             return True # nothing to check for first semester
 
-        for file in self.json_file_list:
-            # Only process JSON files starting with 'Y'
-            if not (file.startswith("Y") and file.endswith(".json")):
-                continue
-
-            file_path_full = os.path.join(file_path, file)
-            try:
-                with open(file_path_full, "r", encoding="utf-8") as f:
-                    unit_passed_info_file = json.load(f)
-            except (UnicodeDecodeError, json.JSONDecodeError):
-                continue
-
+        for unit_passed_info_file in plans.values():
             for unit_code, passed_info in unit_passed_info_file.items():
                 if passed_info == "planned":
                     print("Please update your pass unit result")
@@ -132,36 +117,7 @@ class PreviousDetails():
     def saved_all_pass_unit(self):
         """
         Return a list of unit codes that the user has passed.
-        Only loads valid JSON files (optionally starting with 'Y') from the user's folder.
+        Every saved semester is read from the user store (planned and F do not count).
         """
-        all_unit_dict = {}
-        passed_unit_list = []
-
-        folder_path = f"user_info/{self.user_info.username}"
-        if not os.path.exists(folder_path):
-            return passed_unit_list
-
-        for file in os.listdir(folder_path):
-            # Skip non-JSON files
-            if not file.endswith(".json"):
-                continue
-            if not file.startswith("Y"):
-                continue
-
-            file_path = os.path.join(folder_path, file)
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    unit_info_json = json.load(f)
-                all_unit_dict.update(unit_info_json)
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                print(f"Skipping invalid or non-JSON file: {file}")
-                continue
-
-        # Build the passed unit list
-        for unit_code, unit_passed_info in all_unit_dict.items():
-            if unit_passed_info not in ("planned", "F"):
-                passed_unit_list.append(unit_code)
-        
-        return passed_unit_list
-
+        return get_store().passed_units(self.user_info.username)
 
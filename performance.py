@@ -1,6 +1,5 @@
 from sentiment_analyzer import SentimentDifficultyAnalyzer
-from pathlib import Path
-import json
+from storage import get_store
 
 class SemesterReadinessAnalyzer:
     """
@@ -14,29 +13,10 @@ class SemesterReadinessAnalyzer:
     
     def get_past_grades(self):
         """
-        Load all past grades from ALL Y{X}S{Y}_units.json files
+        Load all past grades from ALL saved semesters
         Returns: {unit_code: grade_status}
         """
-        user_folder = Path(f"user_info/{self.username}")
-        all_grades = {}
-        
-        if not user_folder.exists():
-            return {}
-        
-        # Find ALL semester files dynamically
-        semester_files = list(user_folder.glob("Y*S*_units.json"))
-        
-        for file in semester_files:
-            try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    semester_data = json.load(f)
-                    # Update grades dictionary
-                    all_grades.update(semester_data)
-            except Exception as e:
-                print(f"Warning: Could not read {file.name}: {e}")
-                continue
-        
-        return all_grades
+        return get_store().load_grades(self.username)
     
     def get_completed_units(self):
         """
@@ -150,19 +130,11 @@ class SemesterReadinessAnalyzer:
         Main analysis function
         @returns comprehensive readiness report
         """
-        # Load core units
-        core_path = f"user_info/{username}/core_units.json"
-        elective_path = f"user_info/{username}/elective_units.json"
-        
+        # Load core and elective units
+        store = get_store()
         all_units = {}
-        
-        if Path(core_path).exists():
-            with open(core_path, 'r', encoding='utf-8') as f:
-                all_units.update(json.load(f))
-        
-        if Path(elective_path).exists():
-            with open(elective_path, 'r', encoding='utf-8') as f:
-                all_units.update(json.load(f))
+        all_units.update(store.load_units(username, "core"))
+        all_units.update(store.load_units(username, "elective"))
         
         if not all_units:
             return {"error": "No unit data found for user"}
@@ -176,7 +148,7 @@ class SemesterReadinessAnalyzer:
             self.analyze_prerequisite_strength(unit_code, all_units)
         
         # 2. Get community sentiment
-        sentiment = self.sentiment_analyzer.analyze_unit(unit_code)
+        sentiment = self.sentiment_analyzer.unit_summary(unit_code)
         
         # 3. Analyze current workload
         current_workload = self._calculate_current_workload(
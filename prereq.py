@@ -0,0 +1,137 @@
+import threading
+
+#one unit is worth 6 credit points, "12" in the csv means 12 CP (2 units), "72" means 12 units
+CREDIT_POINTS_PER_UNIT = 6
+
+
+def normalize_prereq_code(code):
+    """
+    Prereq strings sometimes drop the FIT prefix, add it back so codes can be compared
+    """
+    code = code.strip().upper()
+    if not code.startswith("FIT"):
+        code = "FIT" + code
+    return code
+
+
+class UnitIndex():
+    """
+    Map every unit code to a fixed bit position so a set of units can be held as one integer
+    Bits are handed out on first use and never change for the life of the process
+    """
+
+    def __init__(self):
+        self._bits = {}
+        self._lock = threading.Lock()
+
+    def bit(self, unit_code):
+        """
+        @returns the bit position of unit_code, registering the code if it is new
+        """
+        position = self._bits.get(unit_code)
+        if position is None:
+            with self._lock:
+                position = self._bits.setdefault(unit_code, len(self._bits))
+        return position
+
+    def mask(self, unit_codes):
+        """
+        @param unit_codes - iterable of unit codes
+        @returns integer with the bit of every unit code set
+        """
+        result = 0
+        for code in unit_codes:
+            result |= 1 << self.bit(normalize_prereq_code(code))
+        return result
+
+
+unit_index = UnitIndex()
+
+
+class Prereq():
+    """
+    Compiled prerequisite rule
+
+    kind - "none", "all" (every unit required), "one" (at least one unit) or "count" (number of completed units)
+    codes - normalized unit codes named by the rule
+    mask - bitmask of codes (from unit_index)
+    min_units - units needed for the "count" kind
+    """
+
+    def __init__(self, kind, codes=(), min_units=0):
+        self.kind = kind
+        self.codes = tuple(codes)
+        self.mask = unit_index.mask(self.codes)
+        self.min_units = min_units
+
+    def is_met(self, completed_mask):
+        """
+        @param completed_mask - bitmask of completed units (see completed_mask())
+        @returns True if the rule is satisfied
+        """
+        if self.kind == "all":
+            return completed_mask & self.mask == self.mask
+        if self.kind == "one":
+            return completed_mask & self.mask != 0
+        if self.kind == "count":
+            return completed_mask.bit_count() >= self.min_units
+        return True
+
+    def __repr__(self):
+        if self.kind == "count":
+            return f"Prereq(count>={self.min_units})"
+        return f"Prereq({self.kind}, {list(self.codes)})"
+
+
+NO_PREREQ = Prereq("none")
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def _parse(prereq_str):
+    """
+    Turn the csv prereq string into a Prereq
+
+    NONE / empty   -> no prerequisite
+    a;FIT1;FIT2    -> all of the units
+    o;FIT1;FIT2    -> one of the units
+    12 / 72        -> credit points, converted to a number of completed units
+    FIT2004        -> that single unit
+    """
+    prereq_str = prereq_str.strip()
+    if not prereq_str or prereq_str.upper() == "NONE":
+        return NO_PREREQ
+
+    if prereq_str.startswith("a;") or prereq_str.startswith("o;"):
+        codes = [normalize_prereq_code(u) for u in prereq_str[2:].split(";") if u.strip()]
+        return Prereq("all" if prereq_str[0] == "a" else "one", codes)
+
+    if prereq_str.isdigit():
+        return Prereq("count", min_units=int(prereq_str) // CREDIT_POINTS_PER_UNIT)
+
+    return Prereq("all", [normalize_prereq_code(prereq_str)])
+
+
+def compile_prereq(prereq_str):
+    """
+    @param prereq_str - prereq column from the unit csv/json
+    @returns the compiled Prereq, each distinct string is parsed only once per process
+    """
+    prereq_str = prereq_str or ""
+    compiled = _compiled.get(prereq_str)
+    if compiled is None:
+        compiled = _parse(prereq_str)
+        with _compiled_lock:
+            compiled = _compiled.setdefault(prereq_str, compiled)
+    return compiled
+
+
+def completed_mask(completed_units):
+    """
+    @param completed_units - list of passed unit codes, or a mask that was already built
+    @returns bitmask of the completed units
+    """
+    if isinstance(completed_units, int):
+        return completed_units
+    return unit_index.mask(completed_units)
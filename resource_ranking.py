@@ -0,0 +1,259 @@
+import heapq
+import math
+import os
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from forum_store import FORUM_FILE_RE, atomic_write_json, file_lock, read_json, _stat_key, _stream_discussions
+
+#bump when extraction, canonical forms or weights change so stored rankings are rebuilt
+RANKING_VERSION = 1
+#file in the forum folder with the ranking over every unit
+RANKING_FILE = "resource_ranking.json"
+
+#a mention loses half its weight every HALF_LIFE_DAYS
+HALF_LIFE_DAYS = 180
+#weights are stored relative to a fixed date, so the order never changes as time passes
+#(every score shrinks by the same factor) and nothing has to be recomputed
+DECAY_EPOCH = datetime(2024, 1, 1)
+#number of resources kept ready per unit and overall
+TOP_K = 20
+
+RESOURCE_KEYWORDS = [
+    "kaggle", "visualgo", "geeksforgeeks", "leetcode", "freecodecamp",
+    "youtube", "coursera", "udemy", "book", "tutorial"
+]
+
+#query parameters that only track where a click came from
+TRACKING_PARAM_RE = re.compile(r"^(utm_\w+|fbclid|gclid|ref|si|feature)$")
+
+
+def extract_links(content):
+    words = content.split()
+    return [w for w in words if w.startswith("http://") or w.startswith("https://") or "www." in w]
+
+
+def detect_common_sources(content):
+    content_lower = content.lower()
+    return [k for k in RESOURCE_KEYWORDS if k in content_lower]
+
+
+def canonical_resource(link):
+    """
+    One name for all variants of a link: no scheme, "www." or trailing slash, no tracking
+    parameters, sorted query, youtu.be links as youtube.com/watch?v=...
+
+    "https://www.YouTube.com/watch?v=abc&utm_source=x" and "youtu.be/abc" -> "youtube.com/watch?v=abc"
+    """
+    link = link.strip().strip("()[]{}<>\"'").rstrip(".,;:!?")
+    try:
+        parts = urlsplit(link if "://" in link else "https://" + link)
+        host = parts.hostname or ""
+        port = parts.port
+    except ValueError:
+        return link.lower()
+
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    path = parts.path.rstrip("/")
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not TRACKING_PARAM_RE.match(k)]
+
+    if host == "youtu.be" and path:
+        host, path, query = "youtube.com", "/watch", [("v", path[1:])]
+    if host == "youtube.com" and path == "/watch":
+        query = [(k, v) for k, v in query if k == "v"]
+
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+    query.sort()
+    return host + path + ("?" + urlencode(query) if query else "")
+
+
+def mention_weight(timestamp):
+    """
+    @param timestamp - ISO time of the post or reply, a missing or invalid one counts as DECAY_EPOCH
+    @returns 2 ** (days since DECAY_EPOCH / HALF_LIFE_DAYS), so newer mentions weigh more
+    """
+    try:
+        when = datetime.fromisoformat(timestamp).replace(tzinfo=None)
+    except (TypeError, ValueError):
+        when = DECAY_EPOCH
+    days = (when - DECAY_EPOCH).total_seconds() / 86400
+    return math.pow(2, days / HALF_LIFE_DAYS)
+
+
+def thread_mentions(discussion):
+    """
+    @returns [[resource, weight]] for every mention in a thread, post first then replies,
+    links in canonical form
+    """
+    mentions = []
+    for message in [discussion] + list(discussion.get("replies", [])):
+        content = message.get("content", "")
+        weight = mention_weight(message.get("timestamp"))
+        for ref in [canonical_resource(link) for link in extract_links(content)] + detect_common_sources(content):
+            mentions.append([ref, weight])
+    return mentions
+
+
+def top_resources(scores, k=TOP_K):
+    """
+    @param scores - {resource: [score, count]}
+    @returns the k resources with the highest decayed score, ties by mention count then name
+    """
+    best = heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1][0], -item[1][1], item[0]))
+    return [ref for ref, _ in best]
+
+
+def add_mentions(scores, mentions, sign):
+    """
+    Add (sign 1) or remove (sign -1) a thread's mentions from {resource: [score, count]}
+    A resource is dropped once its count reaches 0, so no rounding residue is kept
+    """
+    for ref, weight in mentions:
+        entry = scores.setdefault(ref, [0.0, 0])
+        entry[0] += sign * weight
+        entry[1] += sign
+        if entry[1] <= 0:
+            del scores[ref]
+
+
+def merge_scores(units):
+    """
+    @param units - {unit_code: {resource: [score, count]}}
+    @returns the sum over every unit, {resource: [score, count]}
+    """
+    merged = {}
+    for scores in units.values():
+        for ref, (score, count) in scores.items():
+            entry = merged.setdefault(ref, [0.0, 0])
+            entry[0] += score
+            entry[1] += count
+    return merged
+
+
+class ResourceRanking():
+    """
+    Decayed resource popularity over every resources forum in a folder, in resource_ranking.json
+
+    {"version", "units": {unit_code: {resource: [score, mentions]}},
+     "scores": {resource: [score, mentions]}, "top": [resource, ...]}
+
+    The forum writers store the exact scores of the unit they changed (from its ResourceIndex),
+    so the ranking follows the forum change stream without rescanning. If the file is missing
+    (first use, or deleted to force a rebuild) it is built from the forum files under the
+    ranking lock, by whoever needs it first. Lock order is forum file, then ranking file: the
+    rebuild reads the forums without their locks and a writer it races with stores its unit
+    again after it, so no mention is lost or counted twice.
+    """
+
+    def __init__(self, folder):
+        self.folder = Path(folder)
+        self.path = self.folder / RANKING_FILE
+        self._data = None
+        self._key = None
+        self._lock = threading.Lock()
+
+    def _read(self):
+        data = read_json(self.path, None)
+        if not isinstance(data, dict) or data.get("version") != RANKING_VERSION:
+            return None
+        return data
+
+    def _rebuild(self):
+        """
+        Score every resources forum in the folder, caller holds file_lock(self.path)
+        """
+        units = {}
+        if self.folder.is_dir():
+            for entry in self.folder.iterdir():
+                match = FORUM_FILE_RE.match(entry.name)
+                if match and match.group(2) == "resources" and match.group(1) not in units:
+                    scores = {}
+                    for discussion in _stream_discussions(self.folder / f"{match.group(1)}_resources.json"):
+                        add_mentions(scores, thread_mentions(discussion), 1)
+                    units[match.group(1)] = scores
+        return self._ranked(units)
+
+    def _ranked(self, units):
+        units = {unit_code: scores for unit_code, scores in units.items() if scores}
+        scores = merge_scores(units)
+        return {"version": RANKING_VERSION, "units": units, "scores": scores, "top": top_resources(scores)}
+
+    def _read_or_rebuild(self):
+        """
+        Caller holds file_lock(self.path)
+        """
+        data = self._read()
+        if data is None:
+            data = self._rebuild()
+            atomic_write_json(self.path, data)
+        return data
+
+    def set_unit(self, unit_code, scores):
+        """
+        Replace one unit's contribution with its current {resource: [score, count]},
+        called while that forum file's lock is held
+        """
+        with file_lock(self.path):
+            data = self._read_or_rebuild()
+            units = data["units"]
+            if units.get(unit_code, {}) == scores:
+                return
+            units[unit_code] = scores
+            atomic_write_json(self.path, self._ranked(units))
+
+    def invalidate(self):
+        """
+        Drop the stored ranking, the next read rebuilds it from the forum files
+        """
+        with file_lock(self.path):
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def _current(self):
+        key = _stat_key(self.path)
+        with self._lock:
+            if key is not None and key == self._key:
+                return self._data
+
+        data = self._read()
+        if data is None:
+            with file_lock(self.path):
+                data = self._read_or_rebuild()
+            key = _stat_key(self.path)
+
+        with self._lock:
+            self._data = data
+            self._key = key
+        return data
+
+    def top(self, top_n=5):
+        """
+        @returns [(resource, mentions)] of the most popular resources across all units,
+        recent mentions weigh more
+        """
+        data = self._current()
+        refs = data["top"][:top_n] if top_n <= TOP_K else top_resources(data["scores"], top_n)
+        return [(ref, data["scores"][ref][1]) for ref in refs]
+
+
+_rankings = {}
+_rankings_lock = threading.Lock()
+
+
+def resource_ranking(folder):
+    """
+    @returns the process-wide ResourceRanking of a forum folder
+    """
+    key = os.path.abspath(folder)
+    ranking = _rankings.get(key)
+    if ranking is None:
+        with _rankings_lock:
+            ranking = _rankings.setdefault(key, ResourceRanking(folder))
+    return ranking
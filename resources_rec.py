@@ -1,6 +1,145 @@
-import json
+import bisect
+import os
+import threading
 from pathlib import Path
-from collections import Counter, defaultdict
+from forum_store import atomic_write_json, forum_fingerprint, forum_log, iter_discussions, read_json, _stat_key
+from resource_ranking import (
+    TOP_K, add_mentions, detect_common_sources, extract_links, resource_ranking, thread_mentions, top_resources
+)
+
+#bump when the extraction rules change so existing indexes are rebuilt
+INDEX_VERSION = 1
+
+
+class ResourceIndex():
+    """
+    Resource mentions of one unit's resources forum, kept next to it in
+    {unit}_resources.index.json
+
+    {"threads": {thread_id: {"title", "mentions": [[resource, weight]]}},
+     "mentions": {resource: [thread_id, ...]},
+     "scores": {resource: [decayed score, count]}, "top": [resource, ...]}
+
+    The forum writers re-index the one thread they changed while they hold the forum lock
+    and pass the change on to the cross-unit ResourceRanking, so recommend() only reads the
+    ready-made top list. Links are stored in canonical form (resource_ranking.py), mention
+    lists stay in thread order. A missing or outdated index is rebuilt once from the forum.
+    """
+
+    def __init__(self, forum_path):
+        self.forum_path = Path(forum_path)
+        self.path = self.forum_path.with_name(self.forum_path.stem + ".index.json")
+        self._data = None
+        self._key = None
+        self._lock = threading.Lock()
+
+    def _read(self):
+        data = read_json(self.path, None)
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return None
+        return data
+
+    def _build(self, threads):
+        data = {"version": INDEX_VERSION, "threads": {}, "mentions": {}, "scores": {}}
+        for discussion in threads:
+            self._index_thread(data, discussion)
+        data["top"] = top_resources(data["scores"])
+        return data
+
+    def _index_thread(self, data, discussion):
+        mentions = thread_mentions(discussion)
+        data["threads"][str(discussion["id"])] = {"title": discussion.get("title", ""), "mentions": mentions}
+        for ref, _ in mentions:
+            bisect.insort(data["mentions"].setdefault(ref, []), discussion["id"])
+        add_mentions(data["scores"], mentions, 1)
+        return mentions
+
+    def update(self, thread_log, thread_id):
+        """
+        Re-index one thread after it was added, replied to or deleted
+        Called inside forum_log(...).writing(), thread_log is the locked log
+        """
+        data = self._read()
+        if data is None:
+            # Built from a view that already holds this change
+            data = self._build(thread_log.threads.values())
+        else:
+            old = data["threads"].pop(str(thread_id), None)
+            if old is not None:
+                for ref, _ in old["mentions"]:
+                    thread_ids = data["mentions"][ref]
+                    thread_ids.remove(thread_id)
+                    if not thread_ids:
+                        del data["mentions"][ref]
+                add_mentions(data["scores"], old["mentions"], -1)
+
+            discussion = thread_log.get(thread_id)
+            if discussion is not None:
+                self._index_thread(data, discussion)
+            data["top"] = top_resources(data["scores"])
+        atomic_write_json(self.path, data)
+
+        # The ranking gets this unit's exact scores, whatever it missed before
+        unit_code = self.forum_path.name[:-len("_resources.json")]
+        resource_ranking(self.forum_path.parent).set_unit(unit_code, data["scores"])
+
+    def _current(self):
+        """
+        @returns the index data, None if the forum has no file yet
+        """
+        key = _stat_key(self.path)
+        with self._lock:
+            if key is not None and key == self._key:
+                return self._data
+
+        data = self._read()
+        if data is None:
+            if forum_fingerprint(self.forum_path) == [None, 0]:
+                return None
+            # Missing or outdated: build under the forum lock so no write is missed
+            with forum_log(self.forum_path).writing() as thread_log:
+                data = self._read()
+                if data is None:
+                    data = self._build(thread_log.threads.values())
+                    atomic_write_json(self.path, data)
+            key = _stat_key(self.path)
+
+        with self._lock:
+            self._data = data
+            self._key = key
+        return data
+
+    def top(self, top_n):
+        """
+        @returns (thread_count, [(resource, count, [titles of the threads mentioning it, once each])])
+        highest decayed score first, so recent mentions weigh more
+        """
+        data = self._current()
+        if data is None:
+            return 0, []
+        threads = data["threads"]
+        refs = data["top"][:top_n] if top_n <= TOP_K else top_resources(data["scores"], top_n)
+        return len(threads), [
+            (ref, data["scores"][ref][1], [threads[str(thread_id)]["title"] for thread_id in dict.fromkeys(data["mentions"][ref])])
+            for ref in refs
+        ]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def resource_index(forum_path):
+    """
+    @returns the process-wide ResourceIndex of a resources forum file
+    """
+    key = os.path.abspath(forum_path)
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.setdefault(key, ResourceIndex(forum_path))
+    return index
+
 
 class SimpleResourceRecommender:
     """
@@ -13,20 +152,18 @@ class SimpleResourceRecommender:
 
     def load_resources(self, unit_code):
         """
-        Load all saved discussion posts for a specific unit.
+        Stream the saved discussion posts for a specific unit.
 
         @param unit_code (str): The unit code 
 
         @returns
-            list[dict]: A list of posts, where each post is expected to have
-            keys like "title" and "content". Returns an empty list if the
+            iterator[dict]: The posts one at a time, where each post is expected to have
+            keys like "title" and "content". Yields nothing if the
             resource file does not exist.
         """
         path = self.resources_dir / f"{unit_code}_resources.json"
-        if not path.exists():
-            return []
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        # Streams the snapshot and applies the forum log, so posts not compacted yet are included
+        return iter_discussions(path)
 
     def extract_links(self, content):
         """        
@@ -35,8 +172,7 @@ class SimpleResourceRecommender:
         @param content (str): The text content of a post.
 
         @returns list[str]: A list of detected URL"""
-        words = content.split()
-        return [w for w in words if w.startswith("http://") or w.startswith("https://") or "www." in w]
+        return extract_links(content)
 
     def detect_common_sources(self, content):
         """      
@@ -46,21 +182,12 @@ class SimpleResourceRecommender:
 
         @returns list[str]: A list of recognized resource keywords found in the text.
         """
-        content_lower = content.lower()
-        tags = []
-        keywords = [
-            "kaggle", "visualgo", "geeksforgeeks", "leetcode", "freecodecamp",
-            "youtube", "coursera", "udemy", "book", "tutorial"
-        ]
-        for k in keywords:
-            if k in content_lower:
-                tags.append(k)
-        return tags
+        return detect_common_sources(content)
 
     def recommend(self, unit_code, top_n=5):
         """
         Provide a ranked summary of the most mentioned learning resources
-        based on community posts for a given unit.
+        based on community posts for a given unit, recent mentions count more.
 
         @param 
             unit_code (str): The unit code (e.g., "FIT1058").
@@ -70,32 +197,34 @@ class SimpleResourceRecommender:
             str: A formatted text summary showing the top resources and
             where they were mentioned.
         """
-        posts = self.load_resources(unit_code)
-        if not posts:
+        # Ranking comes precomputed from the unit's resource index
+        thread_count, top = resource_index(self.resources_dir / f"{unit_code}_resources.json").top(top_n)
+        if not thread_count:
             return f"No community resources found for {unit_code}."
+        if not top:
+            return f"No links or known resources detected for {unit_code}."
 
-        # Track mentions
-        counter = Counter()
-        resources = defaultdict(list)
+        result = f"Top Learning Resources for {unit_code}:\n\n"
+        for i, (res, count, titles) in enumerate(top, 1):
+            result += f"{i}. {res} — mentioned {count} times\n"
+            examples = ", ".join(titles[:2])
+            if examples:
+                result += f"   Seen in: {examples}\n"
+        return result
 
-        for post in posts:
-            links = self.extract_links(post["content"])
-            tags = self.detect_common_sources(post["content"])
-            all_refs = links + tags
+    def recommend_overall(self, top_n=5):
+        """
+        Provide a ranked summary of the most popular learning resources across all units.
 
-            for ref in all_refs:
-                counter[ref] += 1
-                resources[ref].append(post["title"])
+        @param top_n (int, optional): The number of top resources to display. Defaults to 5.
 
-        if not counter:
-            return f"No links or known resources detected for {unit_code}."
+        @returns str: A formatted text summary of the top resources.
+        """
+        top = resource_ranking(self.resources_dir).top(top_n)
+        if not top:
+            return "No community resources found yet."
 
-        # Get top ones
-        top = counter.most_common(top_n)
-        result = f"Top Learning Resources for {unit_code}:\n\n"
+        result = "Popular Learning Resources across all units:\n\n"
         for i, (res, count) in enumerate(top, 1):
             result += f"{i}. {res} — mentioned {count} times\n"
-            examples = ", ".join(resources[res][:2])
-            if examples:
-                result += f"   Seen in: {examples}\n"
         return result
@@ -1,21 +1,354 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup 
+import hashlib
+import os
+import queue
+import threading
 import time
+import urllib.error
+import urllib.request
 
-# --- Setup Chrome options ---
-chrome_options = Options()
-chrome_options.add_argument("--headless")  
-chrome_options.add_argument("--disable-gpu")
-chrome_options.add_argument("--no-sandbox")
+# --- Path to your chromedriver (unset: selenium looks for one on the PATH) ---
+CHROMEDRIVER_PATH = os.environ.get("CHROMEDRIVER_PATH")
+# --- Handbook site, point it at a local fixture server to test without the live handbook ---
+HANDBOOK_URL = os.environ.get("HANDBOOK_URL", "https://handbook.monash.edu")
+
+# Chrome sessions kept open, and how many more requests may queue for one before new ones are rejected
+SCRAPER_POOL_SIZE = int(os.environ.get("SCRAPER_POOL_SIZE", "2"))
+SCRAPER_MAX_WAITING = int(os.environ.get("SCRAPER_MAX_WAITING", "4"))
+# Seconds one request may take in total (waiting for a driver, loading, expanding)
+SCRAPER_TIMEOUT = float(os.environ.get("SCRAPER_TIMEOUT", "20"))
+# Seconds the plain HTTP fetch may take before the browser is used instead
+STATIC_FETCH_TIMEOUT = float(os.environ.get("STATIC_FETCH_TIMEOUT", "10"))
+USER_AGENT = "Mozilla/5.0 (compatible; unit-planner handbook fetcher)"
+
+UNIT_HEADER = "h2[data-testid='ai-header']"
+ASSESSMENT_BUTTONS = "div[id^='Assessment-'] button"
+# Accordion headings, semester offerings carry exactly both classes, assessment sections the first one
+ACCORDION_HEADING_CLASS = "css-3d3idg-AccordionRowComponent--SDefaultHeading"
+SEMESTER_HEADING_CLASS = ACCORDION_HEADING_CLASS + " evoq1ba0"
+
+# What get_info returns for a unit the handbook has no page for
+NOT_FOUND = (None, None, None, None, None)
+# How a page was obtained: parsed from plain HTML, rendered in Chrome, or unchanged since the cached copy
+FETCH_SOURCES = ("static", "browser", "not_modified")
+
+
+class ScraperBusy(Exception):
+    """
+    Raised when the scraper cannot take a request: every driver is busy and the queue is full,
+    or no driver became free before the request timed out
+    """
+
+
+class HandbookUnavailable(Exception):
+    """
+    Raised when the handbook could not be reached or did not answer with a usable page,
+    which says nothing about whether the unit exists
+    """
+
+
+def page_digest(content):
+    """
+    @param content: page HTML, bytes or str
+    @returns the sha256 hex digest, used to tell whether a page changed
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def parse_static_page(html):
+    """
+    Parse a unit page as served, without running any JavaScript
+    @param html: page HTML
+    @returns unit_name, semester_str, assign, test, final, or None when the browser is needed
+             (the header or an assessment value is only added by JavaScript)
+    """
+    unit_name, semesters_str, rows = parse_unit_page(html)
+    if not unit_name or rows is None or any(value is None for _, value in rows):
+        return None
+    return (unit_name, semesters_str) + extract_assessments(rows)
+
+
+def create_driver():
+    """
+    Start one headless Chrome session
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+
+    # --- Setup Chrome options ---
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")  
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+
+    service = Service(CHROMEDRIVER_PATH) if CHROMEDRIVER_PATH else Service()
+    start = time.perf_counter()
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    print(f"Chrome driver started in {time.perf_counter() - start:.2f}s")
+    return driver
+
+
+class ScraperService():
+    """
+    Handbook scraper, plain HTTP first with a bounded pool of Chrome sessions as fallback
+
+    Every unit page is first fetched without a browser. If the server-rendered HTML already
+    holds the unit header and every assessment value it is parsed directly, the browser is
+    only used when the page needs JavaScript. Hits and fallbacks are counted per unit.
+    fetch() also takes the validators of a cached copy (handbook_cache.py) and reports an
+    unchanged page without parsing it.
+
+    Drivers are started on demand up to pool_size and reused. At most max_waiting requests
+    wait for a free driver, any more are rejected straight away with ScraperBusy, so a burst
+    of /api/update-unit calls cannot pile up behind a slow handbook. Pages are read as soon
+    as the elements they need are present (explicit waits) instead of after fixed sleeps,
+    and every request has one deadline.
+    """
+
+    def __init__(self, base_url=HANDBOOK_URL, pool_size=SCRAPER_POOL_SIZE, max_waiting=SCRAPER_MAX_WAITING,
+                 timeout=SCRAPER_TIMEOUT, driver_factory=create_driver, static_timeout=STATIC_FETCH_TIMEOUT,
+                 wait_for_driver=False):
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = max(1, pool_size)
+        self.timeout = timeout
+        #batch jobs wait for a free driver as long as it takes, the timeout then starts once one is free
+        self.wait_for_driver = wait_for_driver
+        self.static_timeout = static_timeout
+        self.driver_factory = driver_factory
+        self._admission = threading.BoundedSemaphore(self.pool_size + max(0, max_waiting))
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        #{unit_code: {"static": pages served from HTML, "browser": fallbacks,
+        #             "not_modified": revalidated cached copies, "seconds": last fetch}}
+        self._metrics = {}
+
+    #-------------driver pool------------------
+    def _acquire(self, deadline):
+        """
+        @param deadline: time.monotonic() to give up at, None to wait as long as it takes
+        """
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                can_create = self._created < self.pool_size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    return self.driver_factory()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise ScraperBusy("Timed out waiting for a free handbook scraper")
+            # Wake up now and then, a driver that failed frees its slot without returning to the queue
+            try:
+                return self._idle.get(timeout=min(remaining, 1) if remaining is not None else 1)
+            except queue.Empty:
+                continue
+
+    def _release(self, driver, healthy):
+        if healthy:
+            self._idle.put(driver)
+            return
+        # A driver that failed is replaced by a fresh one on a later request
+        with self._lock:
+            self._created -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        """
+        Quit every idle driver
+        """
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._release(driver, healthy=False)
+
+    #-------------metrics------------------
+    def _record(self, unit_code, source, seconds):
+        with self._lock:
+            entry = self._metrics.setdefault(unit_code, {"static": 0, "browser": 0, "not_modified": 0, "seconds": 0.0})
+            entry[source] += 1
+            entry["seconds"] = round(seconds, 3)
+        print(f"Handbook {unit_code} fetched ({source}) in {seconds:.2f}s")
+
+    def metrics(self):
+        """
+        @returns {"static": count, "browser": count, "not_modified": count,
+        "units": {unit_code: {"static", "browser", "not_modified", "seconds"}}}
+        """
+        with self._lock:
+            units = {unit_code: dict(entry) for unit_code, entry in self._metrics.items()}
+        totals = {source: sum(entry[source] for entry in units.values()) for source in FETCH_SOURCES}
+        totals["units"] = units
+        return totals
+
+    #-------------scraping------------------
+    def unit_url(self, year, unit_code):
+        return f"{self.base_url}/{year}/units/{unit_code}"
+
+    def get_info(self, year, unit_code):
+        """
+        Load unit information from the handbook based on intake year and unit code
+
+        @returns unit_name, semester_str, assign, test, final (all None if the unit has no page)
+        @raises ScraperBusy if the page needs the browser and it cannot be served now
+        @raises HandbookUnavailable if the handbook could not be reached or answered with an error
+        """
+        return self.fetch(year, unit_code)["info"]
+
+    def fetch(self, year, unit_code, etag=None, last_modified=None, known_page=None):
+        """
+        Fetch one unit page, plain HTTP first and the browser only when the page needs JavaScript
+
+        @param etag, last_modified: validators of a cached copy, sent as a conditional request
+        @param known_page: digest of the cached copy's HTML, the same page again counts as not modified
+        Only pass validators of a copy parsed from plain HTML: the HTML of a page that needs the
+        browser is a shell that stays the same while the rendered assessments change
+        @returns {"source": "static", "browser" or "not_modified",
+                  "info": (unit_name, semester_str, assign, test, final), None when not modified,
+                  "html": HTTP response body, "page": its digest, "rendered": browser page source,
+                  "etag", "last_modified": validators of the response}
+        @raises ScraperBusy if the page needs the browser and it cannot be served now
+        @raises HandbookUnavailable if the handbook could not be reached or answered with an error
+        """
+        start = time.perf_counter()
+        result = self._fetch_static(year, unit_code, etag, last_modified)
+        result["info"] = None
+        result["rendered"] = None
+
+        if result["status"] == 304 or (known_page and result["page"] == known_page):
+            result["source"] = "not_modified"
+        elif result["status"] == 404:
+            # No such unit, the browser would only wait for a header that never comes
+            result["source"] = "static"
+            result["info"] = NOT_FOUND
+        elif result["status"] == 200:
+            result["info"] = parse_static_page(result["html"]) if result["html"] else None
+            result["source"] = "static"
+            # Only a page that loaded but needs JavaScript is worth a browser
+            if result["info"] is None:
+                result["source"] = "browser"
+                result["info"], result["rendered"] = self._browser_info(year, unit_code)
+        else:
+            # Outage or error page: fail fast instead of holding a browser until the deadline
+            reason = f"answered {result['status']}" if result["status"] else "could not be reached"
+            raise HandbookUnavailable(f"The handbook {reason} for {unit_code} ({year}), try again later")
+
+        self._record(unit_code, result["source"], time.perf_counter() - start)
+        return result
+
+    def _fetch_static(self, year, unit_code, etag, last_modified):
+        """
+        @returns {"status": HTTP status or None if the request failed, "html", "page", "etag", "last_modified"}
+        """
+        headers = {"User-Agent": USER_AGENT}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        result = {"status": None, "html": None, "page": None, "etag": None, "last_modified": None}
+        request = urllib.request.Request(self.unit_url(year, unit_code), headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.static_timeout) as response:
+                result["status"] = response.status
+                result["html"] = response.read()
+                result["etag"] = response.headers.get("ETag")
+                result["last_modified"] = response.headers.get("Last-Modified")
+        except urllib.error.HTTPError as e:
+            result["status"] = e.code
+            result["etag"] = e.headers.get("ETag") if e.headers else None
+            result["last_modified"] = e.headers.get("Last-Modified") if e.headers else None
+        except (OSError, ValueError):
+            pass
+
+        if result["html"] is not None:
+            result["page"] = page_digest(result["html"])
+        return result
+
+    def _browser_info(self, year, unit_code):
+        """
+        @returns (unit info, rendered page source)
+        """
+        if not self._admission.acquire(blocking=False):
+            raise ScraperBusy("Too many handbook requests in progress, try again shortly")
+        try:
+            if self.wait_for_driver:
+                driver = self._acquire(None)
+                deadline = time.monotonic() + self.timeout
+            else:
+                deadline = time.monotonic() + self.timeout
+                driver = self._acquire(deadline)
+            healthy = False
+            try:
+                result = self._scrape(driver, year, unit_code, deadline)
+                healthy = True
+                return result
+            finally:
+                self._release(driver, healthy)
+        finally:
+            self._admission.release()
+
+    def _scrape(self, driver, year, unit_code, deadline):
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
+        driver.set_page_load_timeout(max(1, deadline - time.monotonic()))
+        driver.get(self.unit_url(year, unit_code))
+
+        # The page is rendered client side, wait for the unit header instead of sleeping
+        try:
+            WebDriverWait(driver, max(0, deadline - time.monotonic())).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, UNIT_HEADER))
+            )
+        except TimeoutException:
+            # A slow handbook or an error page, not proof that the unit does not exist
+            # (only a 404 is, see fetch), so nothing may be cached as a miss
+            raise HandbookUnavailable(f"The handbook page of {unit_code} ({year}) did not load in time")
+
+        expand_assessment_sections(driver, max(0, deadline - time.monotonic()))
+        # Name, semesters and assessments all come from one parse of the expanded page
+        rendered = driver.page_source
+        unit_name, semesters_str, rows = parse_unit_page(rendered)
+        if not unit_name:
+            raise HandbookUnavailable(f"The handbook page of {unit_code} ({year}) has no unit name")
+
+        return (unit_name, semesters_str) + extract_assessments(rows or []), rendered
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_scraper():
+    """
+    @returns the process-wide ScraperService, no browser is started until it is used
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ScraperService()
+        return _service
 
-# --- Path to your chromedriver ---
-service = Service("/home/wanyi/Downloads/chromedriver-linux64/chromedriver")
-driver = webdriver.Chrome(service=service, options=chrome_options)
 
 # --- Load the page ---
 def get_info(year, unit_code):
@@ -28,54 +361,96 @@ def get_info(year, unit_code):
 
     @return: unit_name, semester_str, assign, test, final
              (each can replace the user database directly after changes made)
+    @raises ScraperBusy when every scraper is busy and the queue is full
+    @raises HandbookUnavailable when the handbook is down or answers with an error
     """
-    url = f"https://handbook.monash.edu/{year}/units/{unit_code}"
-    driver.get(url)
-    time.sleep(3)
+    return get_scraper().get_info(year, unit_code)
 
-    html = driver.page_source
-    soup = BeautifulSoup(html, "html.parser")
 
-    unit_name = extract_unit_name(soup)
-    if not unit_name:
-        return None, None, None, None, None
+def fetch_metrics():
+    """
+    @returns how many handbook pages were served from plain HTML and how many needed the browser,
+    in total and per unit, since the app started
+    """
+    return get_scraper().metrics()
 
-    semesters_str = extract_semesters(soup)
-    expand_assessment_sections(driver)
-    assign, test, final = extract_assessments(driver)
 
-    return unit_name, semesters_str, assign, test, final
+# -------------------- Helper Functions --------------------
 
+_selectors = threading.local()
+
+
+def selectors():
+    """
+    @returns the XPath selectors of a unit page, compiled once per thread (lxml is imported on first use)
+    """
+    compiled = getattr(_selectors, "compiled", None)
+    if compiled is None:
+        from lxml import etree
+
+        compiled = {
+            "unit_name": etree.XPath("(//h2[@data-testid='ai-header'])[1]"),
+            "semesters": etree.XPath(f"//h4[normalize-space(@class)='{SEMESTER_HEADING_CLASS}']"),
+            "assessment_section": etree.XPath("(//div[starts-with(@id, 'Assessment-')])[1]"),
+            "assessment_headings": etree.XPath(
+                f".//h4[contains(concat(' ', normalize-space(@class), ' '), ' {ACCORDION_HEADING_CLASS} ')]"
+            ),
+            "accordion_header": etree.XPath("ancestor::div[contains(@class, 'SAccordionItemHeader')][1]"),
+            "content": etree.XPath("following-sibling::*[1]"),
+            "card_bodies": etree.XPath(".//div[contains(@class, 'CardBody')]"),
+        }
+        _selectors.compiled = compiled
+    return compiled
 
-# -------------------- Helper Functions --------------------
 
-def extract_unit_name(soup):
+def _text(element):
+    """
+    Text of an element with each piece stripped, as BeautifulSoup get_text(strip=True) gives it
+    """
+    return "".join(piece.strip() for piece in element.itertext())
+
+
+def parse_unit_page(html):
+    """
+    Parse everything get_info needs from a unit page, from one lxml tree
+    @param html: page HTML, bytes or str
+    @return: (unit name or None, semester string, assessment rows or None), see assessment_rows
+    """
+    import lxml.html
+    from lxml import etree
+
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="replace")
+    try:
+        tree = lxml.html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        return None, "NONE", None
+    return extract_unit_name(tree), extract_semesters(tree), assessment_rows(tree)
+
+
+def extract_unit_name(tree):
     """
     Extract the unit name from the Monash Handbook page
-    @param soup: BeautifulSoup object of the page
+    @param tree: lxml tree of the page
     @return: unit name as a string, or None if not found
     """
-    h2_tag = soup.find("h2", {"data-testid": "ai-header"})
-    if not h2_tag:
+    headers = selectors()["unit_name"](tree)
+    if not headers:
         return None
 
-    text = h2_tag.get_text(strip=True)
+    text = _text(headers[0])
     return text.split("-", 1)[1].strip() if "-" in text else text.strip()
 
 
-def extract_semesters(soup):
+def extract_semesters(tree):
     """
     Extract which semesters the unit is available in Malaysia campus
-    @param soup: BeautifulSoup object of the page
+    @param tree: lxml tree of the page
     @return: A string of semester numbers separated by semicolons (e.g., "1;2")
     """
-    semester_headers = soup.find_all(
-        "h4",
-        class_="css-3d3idg-AccordionRowComponent--SDefaultHeading evoq1ba0"
-    )
     semesters_set = set()
-    for h in semester_headers:
-        text = h.get_text(strip=True).  upper()
+    for h in selectors()["semesters"](tree):
+        text = _text(h).upper()
         if "-MALAYSIA-" in text:
             if "S1" in text:
                 semesters_set.add("1")
@@ -84,78 +459,93 @@ def extract_semesters(soup):
     return ";".join(sorted(semesters_set, key=int)) if semesters_set else "NONE"
 
 
-def expand_assessment_sections(driver):
+def expand_assessment_sections(driver, timeout=10):
     """
     Expand all assessment accordion sections on the page to make them visible for scraping
+    Waits until the sections are present and every one reports itself expanded (no fixed sleeps)
     @param driver: Selenium WebDriver instance
+    @param timeout: seconds to wait in total
     """
-    try:
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div[id^='Assessment-']"))
-        )
-        accordion_buttons = driver.find_elements(By.CSS_SELECTOR, "div[id^='Assessment-'] button")
+    from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
 
-        for button in accordion_buttons:
+    # The accordion re-renders while expanding, a stale button just means "check again"
+    wait = WebDriverWait(driver, timeout, ignored_exceptions=(StaleElementReferenceException,))
+    try:
+        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div[id^='Assessment-']")))
+        for button in driver.find_elements(By.CSS_SELECTOR, ASSESSMENT_BUTTONS):
             try:
-                driver.execute_script("arguments[0].scrollIntoView(true);", button)
-                time.sleep(0.3)
                 if button.get_attribute("aria-expanded") != "true":
                     driver.execute_script("arguments[0].click();", button)
-                    time.sleep(0.5)
-            except:
+            except WebDriverException:
                 continue
-        time.sleep(1)
-    except:
+
+        wait.until(lambda d: all(
+            button.get_attribute("aria-expanded") == "true"
+            for button in d.find_elements(By.CSS_SELECTOR, ASSESSMENT_BUTTONS)
+        ))
+    except (TimeoutException, WebDriverException):
+        # Read whatever sections did expand
         pass
 
 
-def extract_assessments(driver):
+def assessment_rows(tree):
+    """
+    Read the assessment accordion of a unit page
+    @param tree: lxml tree of the page
+    @return: [(section title, value)] where value is the "Value %" text, or None when the
+             section's content is not in the page (collapsed and not rendered yet).
+             Sections whose content has no value are left out. None if there is no assessment section
+    """
+    select = selectors()
+    sections = select["assessment_section"](tree)
+    if not sections:
+        return None
+
+    rows = []
+    for section in select["assessment_headings"](sections[0]):
+        section_title = _text(section).lower()
+        accordion_row = select["accordion_header"](section)
+        content = select["content"](accordion_row[0]) if accordion_row else []
+        if not content or not _text(content[0]):
+            rows.append((section_title, None))
+            continue
+
+        for vdiv in select["card_bodies"](content[0]):
+            text = _text(vdiv)
+            if "Value %" in text or "Value%" in text:
+                value = (
+                    text.replace("Value %", "")
+                    .replace("Value%", "")
+                    .replace(":", "")
+                    .strip()
+                )
+                rows.append((section_title, value))
+                break
+    return rows
+
+
+def extract_assessments(rows):
     """
     Extract assessment components (assignment, test, final exam) and their weightings
-    @param driver: Selenium WebDriver instance
+    @param rows: assessment_rows of the page, with the assessment sections expanded
     @return: Tuple of (assign, test, final) strings
     """
-    html = driver.page_source
-    soup = BeautifulSoup(html, "html.parser")
-
     assign_list, test_list, final_list = [], [], []
 
-    assessment_section = soup.find("div", id=lambda x: x and x.startswith("Assessment-"))
-    if assessment_section:
-        sections = assessment_section.find_all(
-            "h4", class_="css-3d3idg-AccordionRowComponent--SDefaultHeading"
-        )
-        for section in sections:
-            section_title = section.get_text(strip=True).lower()
-            accordion_row = section.find_parent(
-                "div", class_=lambda x: x and "SAccordionItemHeader" in str(x)
-            )
-
-            if accordion_row:
-                content_div = accordion_row.find_next_sibling()
-                if content_div:
-                    value_divs = content_div.find_all(
-                        "div", class_=lambda x: x and "CardBody" in str(x)
-                    )
-                    for vdiv in value_divs:
-                        text = vdiv.get_text(strip=True)
-                        if "Value %" in text or "Value%" in text:
-                            value = (
-                                text.replace("Value %", "")
-                                .replace("Value%", "")
-                                .replace(":", "")
-                                .strip()
-                            )
-                            if "quiz" in section_title or "test" in section_title:
-                                test_list.append(value)
-                            elif "examination" in section_title or "final" in section_title:
-                                final_list.append(value)
-                            else:
-                                assign_list.append(value)
-                            break
+    for section_title, value in rows:
+        if value is None:
+            continue
+        if "quiz" in section_title or "test" in section_title:
+            test_list.append(value)
+        elif "examination" in section_title or "final" in section_title:
+            final_list.append(value)
+        else:
+            assign_list.append(value)
 
     assign = ";".join(assign_list) if assign_list else "NONE"
     test = ";".join(test_list) if test_list else "NONE"
     final = ";".join(final_list) if final_list else "NONE"
     return assign, test, final
-
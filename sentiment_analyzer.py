@@ -1,9 +1,8 @@
-import json
 from pathlib import Path
-from nltk.sentiment import SentimentIntensityAnalyzer
-import nltk
-from collections import Counter, defaultdict
-import re
+from forum_store import iter_discussions
+from sentiment_cache import UnitSentimentCache, sentiment_summary, unit_sentiment_cache
+from sentiment_model import get_sentiment_model
+from comment_matcher import CommentMatcher
 
 class SentimentDifficultyAnalyzer:
     """
@@ -37,35 +36,50 @@ class SentimentDifficultyAnalyzer:
         "couldn't", "shouldn't", "mightn't", "mustn't"
     ]
 
+    REASONING_PATTERNS = {
+        'easy': [
+            r'(easy|simple|straightforward).{0,80}(because|since|as|due to)\s*(.{10,80})',
+            r'(prior knowledge|experience|already know).{0,50}(help|made it|so it was)',
+            r'(manageable|not too hard).{0,80}',
+        ],
+        'hard': [
+            r'(hard|difficult|tough|struggle).{0,80}(because|since|due to|as)\s*(.{10,80})',
+            r'(workload|assignment|exam|test).{0,30}(too much|overwhelming|brutal|killer|insane)',
+            r'(confusing|unclear).{0,50}',
+        ]
+    }
+
+    # Built once per process from the tables above
+    _matcher = None
+
+    @classmethod
+    def matcher(cls):
+        """
+        @returns the shared CommentMatcher for the keyword, pain point and reasoning tables
+        """
+        if cls._matcher is None:
+            cls._matcher = CommentMatcher(
+                cls.DIFFICULTY_KEYWORDS, cls.PAIN_POINT_PATTERNS, cls.NEGATIONS, cls.REASONING_PATTERNS
+            )
+        return cls._matcher
+
     def __init__(self):
-        try:
-            nltk.download('vader_lexicon', quiet=True)
-            self.sid = SentimentIntensityAnalyzer()
-        except:
-            print("Warning: VADER lexicon download failed")
-            self.sid = None
+        # Shared model, loaded once per process from the local lexicon (None if unavailable)
+        self.sid = get_sentiment_model()
 
     def get_unit_comments(self, unit_code):
         """
-        Load all comments and replies from forum_data/{unit_code}_general.json
+        Stream all comments and replies from forum_data/{unit_code}_general.json
 
         @param unit_code 
 
-        @returns dictioanry of user comments
+        @returns generator of user comments, posts and replies are read one thread at a time
         """
-        path = Path(f"forum_data/{unit_code}_general.json")
-        if not path.is_file():
-            return []
-        
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        comments = []
-        for post in data:
-            comments.append({'text': post['content'], 'type': 'post'})
+        # Streams the snapshot and applies the forum log, so posts not compacted yet are included
+        for post in iter_discussions(Path(f"forum_data/{unit_code}_general.json")):
+            yield {'text': post['content'], 'type': 'post'}
             for reply in post.get('replies', []):
-                comments.append({'text': reply['content'], 'type': 'reply'})
-        return comments
+                yield {'text': reply['content'], 'type': 'reply'}
 
     def detect_keywords_with_context(self, text):
         """
@@ -76,17 +90,7 @@ class SentimentDifficultyAnalyzer:
         hard -> negated: False
         @return keyword, level of difficulty and negated (True/False) in a dictionary 
         """
-        text_lower = text.lower()
-        found_keywords = []
-        
-        for level, keywords in self.DIFFICULTY_KEYWORDS.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    keyword_index = text_lower.find(keyword)
-                    before_text = text_lower[:keyword_index].split()[-3:]
-                    is_negated = any(neg in before_text for neg in self.NEGATIONS)
-                    found_keywords.append({'word': keyword, 'level': level, 'negated': is_negated})
-        return found_keywords
+        return self.matcher().scan(text).keywords
 
     def extract_pain_points(self, text):
         """
@@ -96,14 +100,7 @@ class SentimentDifficultyAnalyzer:
 
         @returns the pain points
         """
-        text_lower = text.lower()
-        found_pain_points = []
-        for category, pattern in self.PAIN_POINT_PATTERNS.items():
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
-            if matches:
-                match_text = matches[0] if isinstance(matches[0], str) else ' '.join(str(m) for m in matches[0] if m)
-                found_pain_points.append({'category': category, 'match': match_text})
-        return found_pain_points
+        return self.matcher().scan(text).pain_points
 
     def interpret_with_context(self, sentiment_score, keywords_with_context):
         """
@@ -164,99 +161,70 @@ class SentimentDifficultyAnalyzer:
         Uses pattern matching
         @return the reason why people thinks its hard/easy
         """
-        text_lower = text.lower()
-        if opinion_type == 'easy':
-            patterns = [
-                r'(easy|simple|straightforward).{0,80}(because|since|as|due to)\s*(.{10,80})',
-                r'(prior knowledge|experience|already know).{0,50}(help|made it|so it was)',
-                r'(manageable|not too hard).{0,80}',
-            ]
-        elif opinion_type == 'hard':
-            patterns = [
-                r'(hard|difficult|tough|struggle).{0,80}(because|since|due to|as)\s*(.{10,80})',
-                r'(workload|assignment|exam|test).{0,30}(too much|overwhelming|brutal|killer|insane)',
-                r'(confusing|unclear).{0,50}',
-            ]
-        else:
-            return None
+        return self.matcher().scan(text).reasoning(opinion_type)
+
+    def score_comment(self, text):
+        """
+        @param text of one comment
 
-        for pattern in patterns:
-            match = re.search(pattern, text_lower, re.IGNORECASE)
-            if match:
-                return match.group(0).strip('.,;!? ')[:120]
-        return None
+        Run sentiment, keyword, pain point and reasoning detection on one comment
 
-    def analyze_unit(self, unit_code):
+        @return dictionary of the per-comment results (cached by sentiment_cache)
+        """
+        sentiment = self.sid.polarity_scores(text) if self.sid else {"compound": 0, "pos": 0, "neg": 0, "neu": 1}
+        # One scan gives keywords, pain points and the reasoning triggers
+        match = self.matcher().scan(text)
+        keywords = match.keywords
+        meaning = self.interpret_with_context(sentiment, keywords)
+        pain_points = match.pain_points
+
+        reason = None
+        if 'easy' in meaning:
+            reason = match.reasoning('easy')
+        elif 'hard' in meaning:
+            reason = match.reasoning('hard')
+
+        return {
+            "compound": sentiment["compound"],
+            "keywords": [k['word'] for k in keywords],
+            "negations": [k['word'] for k in keywords if k['negated']],
+            "meaning": meaning,
+            "pain_points": [p['category'] for p in pain_points],
+            "reason": reason
+        }
+
+    def analyze_unit(self, unit_code, details=True):
         """
         @param unit_code that user wants to analyse
+        @param details include the per-comment results
 
         Full analysis with reasoning extraction
+        Comments already scored (same text) are taken from the cache, only new or edited ones are scored
 
         @return JSON structure output
         """
-        comments = self.get_unit_comments(unit_code)
-        if not comments:
+        def comment_texts():
+            return (comment['text'] for comment in self.get_unit_comments(unit_code))
+
+        if self.sid is None:
+            # Placeholder scores without VADER are never cached
+            result = UnitSentimentCache(unit_code, folder=None).analyze(comment_texts, self.score_comment, details)
+        else:
+            result = unit_sentiment_cache(unit_code).analyze(comment_texts, self.score_comment, details)
+        if result is None:
             return {"unit": unit_code, "status": "no_data", "message": "No comments found"}
+        return result
 
-        results = []
-        all_pain_points = defaultdict(list)
-        difficulty_distribution = Counter()
-        easy_reasons, hard_reasons = [], []
-
-        for comment in comments:
-            text = comment['text']
-            sentiment = self.sid.polarity_scores(text) if self.sid else {"compound": 0, "pos": 0, "neg": 0, "neu": 1}
-            keywords = self.detect_keywords_with_context(text)
-            meaning = self.interpret_with_context(sentiment, keywords)
-            pain_points = self.extract_pain_points(text)
-
-            if 'easy' in meaning:
-                reason = self.extract_reasoning(text, 'easy')
-                if reason:
-                    easy_reasons.append({'text': text, 'reason': reason})
-            elif 'hard' in meaning:
-                reason = self.extract_reasoning(text, 'hard')
-                if reason:
-                    hard_reasons.append({'text': text, 'reason': reason})
-
-            results.append({
-                "text": text,
-                "compound": sentiment["compound"],
-                "keywords": [k['word'] for k in keywords],
-                "negations": [k['word'] for k in keywords if k['negated']],
-                "meaning": meaning,
-                "pain_points": [p['category'] for p in pain_points]
-            })
-
-            for pain in pain_points:
-                all_pain_points[pain['category']].append(text[:150])
-            difficulty_distribution[meaning] += 1
-
-        avg_sentiment = sum(r["compound"] for r in results) / len(results)
-        dominant_opinion = difficulty_distribution.most_common(1)[0][0]
-
-        top_pain_points = [
-            {"category": category, "count": len(mentions), "example": mentions[0]}
-            for category, mentions in sorted(all_pain_points.items(), key=lambda x: len(x[1]), reverse=True)[:3]
-        ]
+    def unit_summary(self, unit_code):
+        """
+        @param unit_code
 
-        hard_count = sum(1 for r in results if 'hard' in r['meaning'])
-        easy_count = sum(1 for r in results if 'easy' in r['meaning'])
-        difficulty_score = int(((hard_count - easy_count) / len(results) + 1) * 50)
-        negative_count = sum(1 for r in results if r['compound'] < -0.2)
-        struggling_percent = int((negative_count / len(results)) * 100)
+        Unit-level result for readiness and chat, read from the batch artifact
+        (sentiment_batch.py) when it is up to date, otherwise analyzed now
 
-        return {
-            "unit": unit_code,
-            "status": "success",
-            "average_sentiment": round(avg_sentiment, 3),
-            "dominant_opinion": dominant_opinion,
-            "difficulty_score": difficulty_score,
-            "struggling_percent": f"{struggling_percent}%",
-            "total_comments": len(results),
-            "pain_points": top_pain_points,
-            "difficulty_distribution": dict(difficulty_distribution),
-            "easy_reasons": easy_reasons,
-            "hard_reasons": hard_reasons,
-            "details": results
-        }
\ No newline at end of file
+        @return analyze_unit structure, without per-comment details when precomputed
+        """
+        summary = sentiment_summary().get(unit_code)
+        if summary is not None:
+            return summary
+        return self.analyze_unit(unit_code)
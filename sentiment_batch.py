@@ -0,0 +1,119 @@
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from forum_store import FORUM_FILE_RE, atomic_write_json, file_lock, forum_fingerprint, read_json
+from sentiment_cache import ANALYSIS_VERSION, CACHE_FOLDER, SUMMARY_FILE
+from sentiment_model import model_registry
+
+#batch analysis of every unit forum, fanned out over a process pool
+#    python3 sentiment_batch.py [--workers N] [--units FIT1008 FIT2004 ...]
+
+FORUM_SUFFIX = "_general.json"
+
+#per-worker analyzer, built once by the pool initializer
+_analyzer = None
+
+
+def forum_units():
+    """
+    @returns unit codes that have a general forum, snapshot (.json) or log (.jsonl) only,
+    largest forum first so the long units start early and the pool stays busy
+    """
+    sizes = {}
+    folder = Path(CACHE_FOLDER)
+    if folder.is_dir():
+        for entry in folder.iterdir():
+            match = FORUM_FILE_RE.match(entry.name)
+            if match and match.group(2) == "general":
+                # A new forum is only a log until its first compaction
+                sizes[match.group(1)] = sizes.get(match.group(1), 0) + entry.stat().st_size
+    return sorted(sizes, key=lambda unit_code: (-sizes[unit_code], unit_code))
+
+
+def _init_worker():
+    global _analyzer
+    from sentiment_analyzer import SentimentDifficultyAnalyzer
+    _analyzer = SentimentDifficultyAnalyzer()
+
+
+def _analyze(unit_code):
+    """
+    Runs in a worker process
+    @returns (unit_code, fingerprint, summary) - the fingerprint is taken before reading,
+    so a post added during the analysis makes the entry stale instead of wrong
+    """
+    fingerprint = forum_fingerprint(Path(CACHE_FOLDER) / f"{unit_code}{FORUM_SUFFIX}")
+    summary = _analyzer.analyze_unit(unit_code, details=False)
+    summary.pop("details", None)
+    return unit_code, fingerprint, summary
+
+
+def analyze_all_units(unit_codes=None, workers=None):
+    """
+    Analyze unit forums in parallel and write forum_data/unit_sentiment_summary.json
+
+    @param unit_codes - units to (re)analyze, None for every forum in the folder
+    @param workers - number of processes, default one per CPU
+    @returns {unit_code: summary} of the units analyzed, None if the VADER model is unavailable
+    """
+    # Placeholder scores must never end up in the artifact
+    health = model_registry.warm_up()
+    if not health["loaded"]:
+        print(f"Sentiment batch skipped, VADER model unavailable: {health['error']}")
+        return None
+
+    full_run = unit_codes is None
+    if full_run:
+        unit_codes = forum_units()
+    if not unit_codes:
+        print("Sentiment batch: no forums to analyze")
+        return {}
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(unit_codes)))
+    start = time.perf_counter()
+    results = {}
+    # spawn, so a pool started from the web app does not fork its threads and locks
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+        futures = {pool.submit(_analyze, unit_code): unit_code for unit_code in unit_codes}
+        for future in as_completed(futures):
+            try:
+                unit_code, fingerprint, summary = future.result()
+            except Exception as e:
+                print(f"Error analyzing {futures[future]}: {e}")
+                continue
+            results[unit_code] = {"fingerprint": fingerprint, "summary": summary}
+
+    path = Path(CACHE_FOLDER) / SUMMARY_FILE
+    with file_lock(path):
+        data = read_json(path, {})
+        units = data.get("units", {}) if data.get("version") == ANALYSIS_VERSION else {}
+        if full_run:
+            # Forums that no longer exist drop out
+            units = {}
+        units.update(results)
+        atomic_write_json(path, {
+            "version": ANALYSIS_VERSION,
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "units": units
+        })
+
+    elapsed = time.perf_counter() - start
+    print(f"Sentiment batch: {len(results)}/{len(unit_codes)} unit(s) with {workers} worker(s) in {elapsed:.1f}s")
+    return {unit_code: entry["summary"] for unit_code, entry in results.items()}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompute forum sentiment for every unit")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (default: CPU count)")
+    parser.add_argument("--units", nargs="+", default=None, help="only these unit codes")
+    args = parser.parse_args()
+
+    if analyze_all_units(args.units, args.workers) is None:
+        sys.exit(1)
@@ -0,0 +1,256 @@
+import hashlib
+import threading
+from collections import Counter
+from pathlib import Path
+from forum_store import atomic_write_json, forum_fingerprint, read_json, _stat_key
+
+#bump when the scoring rules change so persisted results are recomputed
+ANALYSIS_VERSION = 1
+CACHE_FOLDER = "forum_data"
+#precomputed per-unit summaries written by sentiment_batch.py
+SUMMARY_FILE = "unit_sentiment_summary.json"
+
+
+def comment_key(text):
+    """
+    Content hash of a comment, an edited comment gets a new key
+    """
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class SentimentAggregate():
+    """
+    Unit-level totals over an ordered list of scored comments
+
+    Comments are only ever added at the end, so a new comment costs O(1) to fold in.
+    Totals are kept in the same order the full analysis used (first mention wins for
+    pain point examples, reasons in comment order).
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.compound_sum = 0
+        self.distribution = Counter()
+        self.pain_points = {}
+        self.easy_reasons = []
+        self.hard_reasons = []
+        self.hard_count = 0
+        self.easy_count = 0
+        self.negative_count = 0
+
+    def add(self, key, text, record):
+        self.keys.append(key)
+        self.compound_sum += record["compound"]
+        meaning = record["meaning"]
+        self.distribution[meaning] += 1
+
+        if 'easy' in meaning:
+            self.easy_count += 1
+            if record["reason"]:
+                self.easy_reasons.append({'text': text, 'reason': record["reason"]})
+        elif 'hard' in meaning:
+            self.hard_count += 1
+            if record["reason"]:
+                self.hard_reasons.append({'text': text, 'reason': record["reason"]})
+        if record["compound"] < -0.2:
+            self.negative_count += 1
+
+        for category in record["pain_points"]:
+            if category in self.pain_points:
+                self.pain_points[category][0] += 1
+            else:
+                self.pain_points[category] = [1, text[:150]]
+
+    def summary(self, unit_code, details):
+        """
+        @param details - per-comment results in comment order
+        @returns the analyze_unit result dict
+        """
+        total = len(self.keys)
+        top_pain_points = [
+            {"category": category, "count": count, "example": example}
+            for category, (count, example) in sorted(self.pain_points.items(), key=lambda x: x[1][0], reverse=True)[:3]
+        ]
+        return {
+            "unit": unit_code,
+            "status": "success",
+            "average_sentiment": round(self.compound_sum / total, 3),
+            "dominant_opinion": self.distribution.most_common(1)[0][0],
+            "difficulty_score": int(((self.hard_count - self.easy_count) / total + 1) * 50),
+            "struggling_percent": f"{int((self.negative_count / total) * 100)}%",
+            "total_comments": total,
+            "pain_points": top_pain_points,
+            "difficulty_distribution": dict(self.distribution),
+            "easy_reasons": list(self.easy_reasons),
+            "hard_reasons": list(self.hard_reasons),
+            "details": details
+        }
+
+
+class UnitSentimentCache():
+    """
+    Scored comments of one unit by content hash, in memory and in
+    forum_data/{unit}_general.sentiment.json, plus the running aggregate
+
+    Only comments whose text was never scored before are passed to the scoring function.
+    With folder None nothing is read from or written to disk.
+    """
+
+    def __init__(self, unit_code, folder=CACHE_FOLDER):
+        self.unit_code = unit_code
+        self.path = Path(folder) / f"{unit_code}_general.sentiment.json" if folder is not None else None
+        self.records = None
+        self.aggregate = SentimentAggregate()
+        self.lock = threading.Lock()
+
+    def _load(self):
+        data = read_json(self.path, {}) if self.path is not None else {}
+        if data.get("version") == ANALYSIS_VERSION:
+            self.records = data.get("comments", {})
+        else:
+            self.records = {}
+
+    def _prune(self, keys):
+        """
+        Keep only the records of the comments that still exist, so deleted and edited
+        versions drop out of memory and the side file, caller holds the lock
+
+        @returns the number of records removed
+        """
+        removed = len(self.records) - len(set(keys))
+        if removed:
+            self.records = {key: self.records[key] for key in keys}
+        return removed
+
+    def _save(self):
+        atomic_write_json(self.path, {"version": ANALYSIS_VERSION, "comments": self.records})
+
+    def _scan(self, texts, score_comment, details):
+        """
+        One pass over the comments, scoring new ones and folding comments past the
+        current totals into the aggregate, caller holds the lock
+
+        @returns (keys, scored, details, ok) - ok False when earlier comments were edited
+        or deleted, the totals then have to be rebuilt in a new pass
+        """
+        done = len(self.aggregate.keys)
+        keys = []
+        scored = 0
+        for text in texts:
+            key = comment_key(text)
+            record = self.records.get(key)
+            if record is None:
+                record = self.records[key] = score_comment(text)
+                scored += 1
+
+            position = len(keys)
+            keys.append(key)
+            if position < done:
+                if self.aggregate.keys[position] != key:
+                    return keys, scored, details, False
+            else:
+                self.aggregate.add(key, text, record)
+
+            if details is not None:
+                details.append({
+                    "text": text,
+                    "compound": record["compound"],
+                    "keywords": list(record["keywords"]),
+                    "negations": list(record["negations"]),
+                    "meaning": record["meaning"],
+                    "pain_points": list(record["pain_points"])
+                })
+        return keys, scored, details, len(keys) >= done
+
+    def analyze(self, comment_texts, score_comment, details=True):
+        """
+        @param comment_texts - function returning an iterator over the comment texts in order
+        (posts followed by their replies), called a second time if earlier comments changed
+        @param score_comment - function text -> record, only called for new or edited comments
+        @param details - include the per-comment results (holds every comment text in memory)
+        @returns the analyze_unit result dict, None if there are no comments
+        """
+        with self.lock:
+            if self.records is None:
+                self._load()
+
+            keys, scored, detail_list, ok = self._scan(comment_texts(), score_comment, [] if details else None)
+            if not ok:
+                # an edit or delete changed earlier comments, rebuild the totals from cached records
+                self.aggregate = SentimentAggregate()
+                keys, rescored, detail_list, ok = self._scan(comment_texts(), score_comment, [] if details else None)
+                scored += rescored
+
+            removed = self._prune(keys)
+            if (scored or removed) and self.path is not None:
+                self._save()
+            if not keys:
+                return None
+            return self.aggregate.summary(self.unit_code, detail_list if details else [])
+
+
+_units = {}
+_units_lock = threading.Lock()
+
+
+def unit_sentiment_cache(unit_code):
+    """
+    @returns the process-wide UnitSentimentCache of a unit
+    """
+    cache = _units.get(unit_code)
+    if cache is None:
+        with _units_lock:
+            cache = _units.setdefault(unit_code, UnitSentimentCache(unit_code))
+    return cache
+
+
+class SentimentSummary():
+    """
+    Read side of forum_data/unit_sentiment_summary.json
+
+    Each unit entry stores the fingerprint its forum file had when it was analyzed, an entry
+    is only returned while the forum file is unchanged. The artifact is re-read when
+    sentiment_batch.py rewrites it.
+    """
+
+    def __init__(self, folder=CACHE_FOLDER):
+        self.folder = Path(folder)
+        self.path = self.folder / SUMMARY_FILE
+        self.units = {}
+        self._key = None
+        self.lock = threading.Lock()
+
+    def _units(self):
+        key = _stat_key(self.path)
+        if key != self._key:
+            with self.lock:
+                if key != self._key:
+                    data = read_json(self.path, {})
+                    self.units = data.get("units", {}) if data.get("version") == ANALYSIS_VERSION else {}
+                    self._key = key
+        return self.units
+
+    def get(self, unit_code):
+        """
+        @returns the precomputed analyze_unit result (without per-comment details),
+        None if the unit was not analyzed or its forum changed since
+        """
+        entry = self._units().get(unit_code)
+        if entry is None:
+            return None
+        if entry["fingerprint"] != forum_fingerprint(self.folder / f"{unit_code}_general.json"):
+            return None
+        return entry["summary"]
+
+
+_summary = None
+
+
+def sentiment_summary():
+    """
+    @returns the process-wide SentimentSummary of forum_data
+    """
+    global _summary
+    if _summary is None:
+        _summary = SentimentSummary()
+    return _summary
@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+
+#optional path to vader_lexicon.txt, otherwise the lexicon must already be in the local nltk data
+VADER_LEXICON_PATH = os.environ.get("VADER_LEXICON")
+
+#sentence scored by warm_up so the first real request does not pay for the first call
+WARM_UP_TEXT = "The assignments were hard but the lectures were great."
+
+
+class SentimentModelRegistry():
+    """
+    Process-wide VADER model, built once on first use
+
+    The lexicon is never downloaded, it is read from VADER_LEXICON or from the local
+    nltk data (python -m nltk.downloader vader_lexicon). If it cannot be found the failure
+    is remembered, so later calls return immediately instead of retrying.
+    """
+
+    def __init__(self, lexicon_path=VADER_LEXICON_PATH):
+        self.lexicon_path = lexicon_path
+        self._model = None
+        self._error = None
+        self._source = None
+        self._load_seconds = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """
+        Build the model, caller holds the lock
+        """
+        start = time.perf_counter()
+        try:
+            import nltk
+            from nltk.sentiment import SentimentIntensityAnalyzer
+
+            if self.lexicon_path:
+                if not os.path.isfile(self.lexicon_path):
+                    raise LookupError(f"VADER lexicon not found at {self.lexicon_path}")
+                self._source = os.path.abspath(self.lexicon_path)
+                self._model = SentimentIntensityAnalyzer(lexicon_file=f"file:{self._source}")
+            else:
+                #raises LookupError straight away when the lexicon is not installed, no network access
+                self._source = str(nltk.data.find("sentiment/vader_lexicon.zip"))
+                self._model = SentimentIntensityAnalyzer()
+            self._error = None
+        except (ImportError, LookupError, OSError) as e:
+            self._model = None
+            self._error = str(e).strip() or type(e).__name__
+            print(f"Warning: VADER model unavailable ({self._error.splitlines()[0]})")
+        self._load_seconds = round(time.perf_counter() - start, 3)
+
+    def get(self):
+        """
+        @returns the shared SentimentIntensityAnalyzer, None if the lexicon is unavailable
+        """
+        if self._model is not None or self._error is not None:
+            return self._model
+        with self._lock:
+            if self._model is None and self._error is None:
+                self._load()
+        return self._model
+
+    def warm_up(self):
+        """
+        Load the model (retrying after an earlier failure) and score one sentence
+        Call at startup so readiness requests never pay the setup cost
+
+        @returns health()
+        """
+        with self._lock:
+            if self._model is None:
+                self._load()
+        if self._model is not None:
+            self._model.polarity_scores(WARM_UP_TEXT)
+        return self.health()
+
+    def health(self):
+        """
+        @returns dict describing the model state, without loading it
+        """
+        return {
+            "loaded": self._model is not None,
+            "error": self._error,
+            "lexicon": self._source,
+            "load_seconds": self._load_seconds
+        }
+
+
+model_registry = SentimentModelRegistry()
+
+
+def get_sentiment_model():
+    return model_registry.get()
@@ -0,0 +1,89 @@
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+
+#how many planning sessions are kept and for how long (seconds)
+SESSION_MAX_ENTRIES = 256
+SESSION_TTL_SECONDS = 300
+
+
+def user_folder_fingerprint(username):
+    """
+    Cheap summary of a user's folder: name, mtime and size of every file in it
+    Any write to the folder (from this process or another worker) changes the fingerprint
+
+    @returns tuple that can be compared, empty if the folder does not exist
+    """
+    try:
+        entries = os.scandir(os.path.join("user_info", username))
+    except OSError:
+        return ()
+
+    files = []
+    with entries:
+        for entry in entries:
+            if entry.is_file():
+                stat = entry.stat()
+                files.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(files))
+
+
+class SessionCache():
+    """
+    LRU and TTL bounded cache of initialized planner state
+
+    Entries are keyed by (username, stream, year, sem, intake) and remember the storage
+    version of the user at the time they were built, so any write for that user makes them stale.
+    Callers get a deep copy so changes made while handling one request never leak into the next.
+    """
+
+    def __init__(self, max_entries=SESSION_MAX_ENTRIES, ttl=SESSION_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, fingerprint):
+        """
+        @param key - (username, stream, year, sem, intake)
+        @param fingerprint - current storage version of the user (see storage.UserStore.version)
+        @returns a copy of the cached state, or None if missing, expired or stale
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created, saved_fingerprint, state = entry
+            if time.monotonic() - created > self.ttl or saved_fingerprint != fingerprint:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy.deepcopy(state)
+
+    def put(self, key, fingerprint, state):
+        """
+        Store a copy of state, evicting the least recently used entry when full
+        """
+        state = copy.deepcopy(state)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), fingerprint, state)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, username):
+        """
+        Drop every cached session of a user (called after writing to their files)
+        """
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == username]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+session_cache = SessionCache()
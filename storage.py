@@ -0,0 +1,466 @@
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from unit_overlay import OVERLAY_FILE, diff_units, empty_overlay, merged_units, normalize_overlay, overlay_from_units
+
+#which backend get_store() returns: "file" (user_info/<username>/*.json) or "sqlite"
+STORAGE_BACKEND = os.environ.get("PLANNER_STORAGE", "file")
+SQLITE_PATH = os.environ.get("PLANNER_DB_PATH", "user_info.db")
+
+USER_ROOT = "user_info"
+#folder of the generated course PNGs with the sqlite backend, next to the database
+PLAN_IMAGE_DIR = "plan_images"
+UNIT_KINDS = ("core", "elective")
+
+#Y1S1_units.json -> Y1S1
+PLAN_FILE_RE = re.compile(r"^(Y\d+S\d+)_units\.json$")
+
+#statuses that do not count as passing a unit
+NOT_PASSED = ("planned", "F")
+
+
+def semester_sort_key(semester):
+    """
+    Order semester keys chronologically (Y1S1, Y1S2, Y2S1, ...)
+    """
+    match = re.match(r"Y(\d+)S(\d+)", semester)
+    return (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+
+
+class UserStore():
+    """
+    Interface for reading and writing per-user planner state
+
+    plans - {"Y1S1": {unit_code: status}}, status is "planned" or the grade (HD/D/C/P/F)
+    deferred - {unit_code: "Y1S1"} core units pushed to a later semester
+    units - the user's core/elective unit info (kind is "core" or "elective"), stored as an
+            overlay on the shared catalog (see unit_overlay.py) and merged when read
+    """
+
+    def user_exists(self, username):
+        raise NotImplementedError
+
+    def list_users(self):
+        raise NotImplementedError
+
+    def load_plans(self, username):
+        """
+        @returns dict of semester key -> {unit_code: status}, in chronological order
+        """
+        raise NotImplementedError
+
+    def load_plan(self, username, semester):
+        """
+        @returns {unit_code: status} for one semester key, None if that semester was never saved
+        """
+        raise NotImplementedError
+
+    def save_plan(self, username, semester, units):
+        raise NotImplementedError
+
+    def load_deferred(self, username):
+        raise NotImplementedError
+
+    def save_deferred(self, username, deferred):
+        raise NotImplementedError
+
+    def load_overlay(self, username):
+        """
+        @returns the user's normalized overlay document, an empty overlay if none saved
+        """
+        raise NotImplementedError
+
+    def save_overlay(self, username, overlay):
+        raise NotImplementedError
+
+    def version(self, username):
+        """
+        @returns a value that changes whenever anything of the user is written
+        """
+        raise NotImplementedError
+
+    def plan_image_path(self, username):
+        """
+        @returns the Path the user's course structure PNG is written to and served from
+        """
+        raise NotImplementedError
+
+    #-------------shared helpers------------------
+    def load_units(self, username, kind):
+        """
+        @returns the user's unit info of that kind (catalog merged with overrides), empty dict if none saved
+        """
+        return merged_units(self.load_overlay(username), kind)
+
+    def save_units(self, username, kind, units):
+        """
+        Save a full unit dict of that kind, only the differences from the catalog are stored
+        """
+        overlay = self.load_overlay(username)
+        overlay["overrides"][kind] = diff_units(overlay, kind, units)
+        self.save_overlay(username, overlay)
+
+    def add_core_set(self, username, stream, year):
+        """
+        Add the core units of a stream and year to the user's view
+        @returns True if they were not part of it yet
+        """
+        overlay = self.load_overlay(username)
+        key = [int(stream), int(year)]
+        if key in overlay["core_sets"]:
+            return False
+        overlay["core_sets"].append(key)
+        self.save_overlay(username, overlay)
+        return True
+
+    def enable_electives(self, username):
+        """
+        Add the catalog electives to the user's view
+        @returns True if they were not part of it yet
+        """
+        overlay = self.load_overlay(username)
+        if overlay["electives"]:
+            return False
+        overlay["electives"] = True
+        self.save_overlay(username, overlay)
+        return True
+
+    def update_unit(self, username, kind, unit_code, fields):
+        """
+        Record refreshed info of one unit, only this unit is written
+        """
+        overlay = self.load_overlay(username)
+        overlay["overrides"][kind].setdefault(unit_code, {}).update(fields)
+        self.save_overlay(username, overlay)
+
+    def load_grades(self, username):
+        """
+        Merge every semester into one {unit_code: status}, later semesters win
+        """
+        grades = {}
+        for units in self.load_plans(username).values():
+            grades.update(units)
+        return grades
+
+    def passed_units(self, username):
+        """
+        @returns list of unit codes that the user has passed
+        """
+        return [code for code, status in self.load_grades(username).items() if status not in NOT_PASSED]
+
+
+class FileUserStore(UserStore):
+    """
+    The original layout, one folder per user under user_info/
+    """
+
+    def __init__(self, root=USER_ROOT):
+        self.root = Path(root)
+
+    def _folder(self, username):
+        return self.root / username
+
+    def _read_json(self, path, default):
+        if not path.is_file():
+            return default
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            print(f"Skipping invalid or non-JSON file: {path.name}")
+            return default
+
+    def _write_json(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+
+    def user_exists(self, username):
+        return self._folder(username).is_dir()
+
+    def list_users(self):
+        if not self.root.is_dir():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir())
+
+    def load_plans(self, username):
+        folder = self._folder(username)
+        if not folder.is_dir():
+            return {}
+
+        plans = {}
+        for path in folder.iterdir():
+            match = PLAN_FILE_RE.match(path.name)
+            if match:
+                units = self._read_json(path, None)
+                if units is not None:
+                    plans[match.group(1)] = units
+        return {sem: plans[sem] for sem in sorted(plans, key=semester_sort_key)}
+
+    def load_plan(self, username, semester):
+        return self._read_json(self._folder(username) / f"{semester}_units.json", None)
+
+    def save_plan(self, username, semester, units):
+        self._write_json(self._folder(username) / f"{semester}_units.json", units)
+
+    def load_deferred(self, username):
+        return self._read_json(self._folder(username) / "deferred_units.json", {})
+
+    def save_deferred(self, username, deferred):
+        self._write_json(self._folder(username) / "deferred_units.json", deferred)
+
+    def load_overlay(self, username):
+        overlay = self._read_json(self._folder(username) / OVERLAY_FILE, None)
+        if overlay is None:
+            overlay = self._convert_unit_copies(username)
+        return normalize_overlay(overlay)
+
+    def save_overlay(self, username, overlay):
+        self._write_json(self._folder(username) / OVERLAY_FILE, overlay)
+
+    def _convert_unit_copies(self, username):
+        """
+        Older versions kept a full copy of the catalog in core_units.json / elective_units.json
+        Convert them once into an overlay and remove the copies
+        """
+        folder = self._folder(username)
+        legacy_paths = [folder / f"{kind}_units.json" for kind in UNIT_KINDS]
+        if not any(path.is_file() for path in legacy_paths):
+            return empty_overlay()
+
+        core_units, elective_units = (self._read_json(path, None) for path in legacy_paths)
+        overlay = overlay_from_units(core_units, elective_units)
+        self.save_overlay(username, overlay)
+        for path in legacy_paths:
+            if path.is_file():
+                path.unlink()
+        print(f"Converted {username}'s unit copies into {OVERLAY_FILE}")
+        return overlay
+
+    def version(self, username):
+        from session_cache import user_folder_fingerprint
+        return user_folder_fingerprint(username)
+
+    def plan_image_path(self, username):
+        return self._folder(username) / f"{username}_course_structure.png"
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS plans (
+    username TEXT NOT NULL,
+    semester TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    unit_code TEXT NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (username, semester, unit_code)
+);
+CREATE TABLE IF NOT EXISTS semesters (
+    username TEXT NOT NULL,
+    semester TEXT NOT NULL,
+    PRIMARY KEY (username, semester)
+);
+CREATE INDEX IF NOT EXISTS idx_plans_user_semester ON plans (username, semester, position);
+CREATE INDEX IF NOT EXISTS idx_plans_user_status ON plans (username, status);
+CREATE VIEW IF NOT EXISTS grades AS
+    SELECT username, semester, unit_code, status AS grade FROM plans WHERE status != 'planned';
+CREATE TABLE IF NOT EXISTS deferrals (
+    username TEXT NOT NULL,
+    unit_code TEXT NOT NULL,
+    from_semester TEXT NOT NULL,
+    PRIMARY KEY (username, unit_code)
+);
+CREATE TABLE IF NOT EXISTS unit_overlays (
+    username TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+
+class SQLiteUserStore(UserStore):
+    """
+    All users in one SQLite database with indexed tables for plans, grades (a view over plans),
+    deferrals and unit overlays. Every write is one transaction and bumps the user's version.
+    The semesters table records every saved semester, so one saved without units loads as {}
+    like an empty file of the file backend. Course PNGs go to plan_images/ next to the database.
+    """
+
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        self.image_dir = Path(path).parent / PLAN_IMAGE_DIR
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        #one connection per thread, sqlite connections cannot be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _touch(self, conn, username):
+        conn.execute(
+            "INSERT INTO users (username, version) VALUES (?, 1) "
+            "ON CONFLICT(username) DO UPDATE SET version = version + 1",
+            (username,)
+        )
+
+    def user_exists(self, username):
+        row = self._connect().execute("SELECT 1 FROM users WHERE username = ?", (username,)).fetchone()
+        return row is not None
+
+    def list_users(self):
+        return [row[0] for row in self._connect().execute("SELECT username FROM users ORDER BY username")]
+
+    def load_plans(self, username):
+        plans = {}
+        rows = self._connect().execute(
+            "SELECT semester, unit_code, status FROM plans WHERE username = ? ORDER BY semester, position",
+            (username,)
+        )
+        for semester, unit_code, status in rows:
+            plans.setdefault(semester, {})[unit_code] = status
+        for (semester,) in self._connect().execute("SELECT semester FROM semesters WHERE username = ?", (username,)):
+            plans.setdefault(semester, {})
+        return {sem: plans[sem] for sem in sorted(plans, key=semester_sort_key)}
+
+    def load_plan(self, username, semester):
+        rows = self._connect().execute(
+            "SELECT unit_code, status FROM plans WHERE username = ? AND semester = ? ORDER BY position",
+            (username, semester)
+        ).fetchall()
+        if rows:
+            return dict(rows)
+        saved = self._connect().execute(
+            "SELECT 1 FROM semesters WHERE username = ? AND semester = ?", (username, semester)
+        ).fetchone()
+        return {} if saved is not None else None
+
+    def save_plan(self, username, semester, units):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM plans WHERE username = ? AND semester = ?", (username, semester))
+            conn.execute("INSERT OR IGNORE INTO semesters (username, semester) VALUES (?, ?)", (username, semester))
+            conn.executemany(
+                "INSERT INTO plans (username, semester, position, unit_code, status) VALUES (?, ?, ?, ?, ?)",
+                [(username, semester, i, code, status) for i, (code, status) in enumerate(units.items())]
+            )
+            self._touch(conn, username)
+
+    def load_grades(self, username):
+        rows = self._connect().execute(
+            "SELECT semester, unit_code, status FROM plans WHERE username = ? ORDER BY position", (username,)
+        ).fetchall()
+        grades = {}
+        for _, unit_code, status in sorted(rows, key=lambda r: semester_sort_key(r[0])):
+            grades[unit_code] = status
+        return grades
+
+    def load_deferred(self, username):
+        rows = self._connect().execute(
+            "SELECT unit_code, from_semester FROM deferrals WHERE username = ? ORDER BY rowid", (username,)
+        )
+        return dict(rows)
+
+    def save_deferred(self, username, deferred):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM deferrals WHERE username = ?", (username,))
+            conn.executemany(
+                "INSERT INTO deferrals (username, unit_code, from_semester) VALUES (?, ?, ?)",
+                [(username, code, sem) for code, sem in deferred.items()]
+            )
+            self._touch(conn, username)
+
+    def load_overlay(self, username):
+        conn = self._connect()
+        row = conn.execute("SELECT data FROM unit_overlays WHERE username = ?", (username,)).fetchone()
+        if row is None:
+            return empty_overlay()
+        return normalize_overlay(json.loads(row[0]))
+
+    def save_overlay(self, username, overlay):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO unit_overlays (username, data) VALUES (?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET data = excluded.data",
+                (username, json.dumps(overlay))
+            )
+            self._touch(conn, username)
+
+    def version(self, username):
+        row = self._connect().execute("SELECT version FROM users WHERE username = ?", (username,)).fetchone()
+        return row[0] if row else 0
+
+    def plan_image_path(self, username):
+        return self.image_dir / f"{username}_course_structure.png"
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def create_store(backend, db_path=SQLITE_PATH):
+    if backend == "sqlite":
+        return SQLiteUserStore(db_path)
+    if backend == "file":
+        return FileUserStore()
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def get_store():
+    """
+    @returns the process-wide UserStore selected by PLANNER_STORAGE (default "file")
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_store(STORAGE_BACKEND)
+    return _store
+
+
+def migrate(source, target):
+    """
+    Copy every user's plans, deferrals and unit overlay from one store into another
+    Existing data of the same user in the target is replaced
+
+    @returns number of users copied
+    """
+    count = 0
+    for username in source.list_users():
+        for semester, units in source.load_plans(username).items():
+            target.save_plan(username, semester, units)
+        target.save_deferred(username, source.load_deferred(username))
+        target.save_overlay(username, source.load_overlay(username))
+        count += 1
+        print(f"Migrated {username}")
+    return count
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Copy user_info data between storage backends")
+    parser.add_argument("source", choices=["file", "sqlite"])
+    parser.add_argument("target", choices=["file", "sqlite"])
+    parser.add_argument("--db", default=SQLITE_PATH, help="SQLite database path")
+    args = parser.parse_args()
+
+    if args.source == args.target:
+        sys.exit("Source and target backends must be different")
+
+    total = migrate(create_store(args.source, args.db), create_store(args.target, args.db))
+    print(f"Migrated {total} user(s) from {args.source} to {args.target}")
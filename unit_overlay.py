@@ -0,0 +1,116 @@
+from catalog import CORE_FILES, get_catalog
+
+#name of the per-user overlay file (file backend)
+OVERLAY_FILE = "unit_overrides.json"
+
+
+def empty_overlay():
+    """
+    A user's unit info is the shared catalog plus a small overlay:
+
+    core_sets - [stream, year] core files the user has planned with, in the order they were added
+    electives - True once the user's elective list has been created
+    overrides - {"core"/"elective": {unit_code: changed fields}}, units the user refreshed
+                (an empty dict keeps a unit that is not part of the catalog sets above)
+    """
+    return {"core_sets": [], "electives": False, "overrides": {"core": {}, "elective": {}}}
+
+
+def normalize_overlay(overlay):
+    """
+    Fill in any missing key so older or partial overlay documents can be read
+    """
+    result = empty_overlay()
+    if not overlay:
+        return result
+    result["core_sets"] = [list(pair) for pair in overlay.get("core_sets", [])]
+    result["electives"] = bool(overlay.get("electives", False))
+    for kind, units in overlay.get("overrides", {}).items():
+        result["overrides"][kind] = dict(units)
+    return result
+
+
+def _base_view(overlay, kind, catalog):
+    """
+    @returns dict of unit_code -> unit info taken from the shared catalog only (no overrides)
+    """
+    units = {}
+    if kind == "core":
+        for stream, year in overlay["core_sets"]:
+            codes, set_units = catalog.core_units(stream, year)
+            for code in codes:
+                units.setdefault(code, set_units[code])
+    elif kind == "elective" and overlay["electives"]:
+        #electives that are also a core unit of the user are left out, like the planner does
+        core_codes = set(_base_view(overlay, "core", catalog)) | set(overlay["overrides"]["core"])
+        codes, elective_units = catalog.elective_units()
+        for code in codes:
+            if code not in core_codes:
+                units[code] = elective_units[code]
+    return units
+
+
+def merged_units(overlay, kind, catalog=None):
+    """
+    Merge the shared catalog with the user's overrides
+
+    @param overlay - normalized overlay document
+    @param kind - "core" or "elective"
+    @returns dict of unit_code -> unit info, safe for the caller to change
+    """
+    catalog = catalog or get_catalog()
+    units = _base_view(overlay, kind, catalog)
+    for code, fields in overlay["overrides"].get(kind, {}).items():
+        info = units.get(code)
+        if info is None:
+            info = catalog.get_unit(code) or {}
+            units[code] = info
+        info.update(fields)
+    return units
+
+
+def diff_units(overlay, kind, units, catalog=None):
+    """
+    Reduce a full dict of unit info to the overrides needed on top of the catalog
+
+    @param units - dict of unit_code -> unit info as the user should see it
+    @returns dict of unit_code -> fields that differ from the catalog
+    """
+    catalog = catalog or get_catalog()
+    base_units = _base_view(overlay, kind, catalog)
+    overrides = {}
+    for code, info in units.items():
+        base = base_units.get(code)
+        in_base = base is not None
+        if not in_base:
+            base = catalog.get_unit(code) or {}
+        changed = {key: value for key, value in info.items() if base.get(key) != value}
+        #units outside the catalog sets are always kept so they stay in the user's view
+        if changed or not in_base:
+            overrides[code] = changed
+    return overrides
+
+
+def overlay_from_units(core_units, elective_units, catalog=None):
+    """
+    Convert the old full per-user copies (core_units.json / elective_units.json) into an overlay
+
+    @param core_units - the user's saved core unit dict (None if never saved)
+    @param elective_units - the user's saved elective unit dict (None if never saved)
+    @returns overlay document
+    """
+    catalog = catalog or get_catalog()
+    overlay = empty_overlay()
+
+    #a core file is part of the user's view if every one of its units was copied
+    core_codes = set(core_units or {})
+    for key in CORE_FILES:
+        codes, _ = catalog.core_units(*key)
+        if codes and core_codes.issuperset(codes):
+            overlay["core_sets"].append(list(key))
+    overlay["overrides"]["core"] = diff_units(overlay, "core", core_units or {}, catalog)
+
+    if elective_units is not None:
+        overlay["electives"] = True
+        overlay["overrides"]["elective"] = diff_units(overlay, "elective", elective_units, catalog)
+    return overlay
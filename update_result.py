@@ -1,5 +1,5 @@
-import os, json
 import utilities as u
+from storage import get_store
 from enum import Enum
 
 class ResultMenuEnum(Enum):
@@ -33,13 +33,12 @@ def user_option():
 class UpdateResult():
     def __init__(self):
         """
-        access username and file_path anywhere in the list
-        json_list contain all the filename info of that user
+        access username anywhere in the list
+        plans contain every saved semester of that user {"Y1S1": {unit_code: grade}}
         read_username_bool make sure username is entered once only 
         """
         self.username = ""
-        self.file_path = ""
-        self.json_list = []
+        self.plans = {}
         self.read_username_bool = False
 
     def read_username(self):
@@ -54,17 +53,11 @@ class UpdateResult():
         """
         if user_name havent be recorded, read username here
 
-        read the json file by accesing the folder path (containing username)
-        a list of json_file name of that user is recorded
+        read every saved semester of that user from the store, in chronological order
         """
         if (self.read_username_bool == False):
             self.read_username()
-        self.json_list = []
-        self.file_path = f"user_info/{self.username}" 
-        #listdir list all file inside folder
-        for file in os.listdir(self.file_path):
-            if file.endswith(".json") and file.startswith("Y"):
-                self.json_list.append(file)
+        self.plans = get_store().load_plans(self.username)
 
 
     def check_valid_input(self, prompt):
@@ -98,14 +91,9 @@ class UpdateResult():
         if not self.read_username_bool:
             self.read_username()
         self.read_json()
-        for file in self.json_list:
-            full_path = os.path.join(self.file_path, file)
-            name_only = file.split("_")[0]
+        for name_only, unit_info in self.plans.items():
             print(f"Result For {name_only}")
 
-            with open(full_path, "r") as f:
-                unit_info = json.load(f)
-
             for unit_code, grade in unit_info.items():
                 print(f"{unit_code}: {grade}")
             print("")
@@ -113,31 +101,21 @@ class UpdateResult():
     def access_unplanned_info(self):
         """
         Enter username (if haven't), check folder.
-        Save in a list, check and call update grade function.
-        Only process files that start with 'Y'.
+        Check each saved semester and call update grade function.
         """
         self.read_json()
+        store = get_store()
         
-        for file in self.json_list:
-            if not file.startswith("Y"):
-                continue  # skip files that don't start with 'Y'
-            
-            full_path = os.path.join(self.file_path, file)
-            name_only = file.split("_")[0]
+        for name_only, unit_info_ in self.plans.items():
             print(f"Result For {name_only}")
 
-            # Read file into local variable
-            with open(full_path, "r") as f:
-                unit_info_ = json.load(f)
-
             # Update grades
             self.update_grade(unit_info_)
 
-            # Save back to the same file
-            with open(full_path, "w") as f:
-                json.dump(unit_info_, f, indent=4)
+            # Save back to the same semester
+            store.save_plan(self.username, name_only, unit_info_)
 
-            print("Saved updates for", file)
+            print("Saved updates for", f"{name_only}_units.json")
             print("")
 
         
@@ -1,9 +1,7 @@
-from scrape import get_info
+from handbook_cache import HandbookOffline, get_info
+from scrape import HandbookUnavailable
 import io
-import json
-import matplotlib.pyplot as plt
-from pathlib import Path
-from matplotlib.patches import Rectangle
+from storage import get_store
 
 class UpdateMenu():
     def __init__(self, user_info, update_result, pass_info, core_planner):
@@ -27,29 +25,30 @@ class UpdateMenu():
 
         system will load user data and update the info back into the json file to accessed later at search units
         """
-        # Load user paths
+        # Load user data
         username = input("Enter your username: ").strip()
-        file_path_core = Path(f"user_info/{username}/core_units.json")
-        file_path_elective = Path(f"user_info/{username}/elective_units.json")
+        store = get_store()
 
         # Load core data
-        if not file_path_core.is_file():
+        core_units_data = store.load_units(username, "core")
+        if not core_units_data:
             print("core_units.json not found. Please generate it first.")
             return
-        with open(file_path_core, "r", encoding="utf-8") as f:
-            core_units_data = json.load(f)
 
         # Load elective data
-        if not file_path_elective.is_file():
+        elective_units_data = store.load_units(username, "elective")
+        if not elective_units_data:
             print("elective_units.json not found. Please generate it first.")
             return
-        with open(file_path_elective, "r", encoding="utf-8") as f:
-            elective_units_data = json.load(f)
 
         # Ask for unit to update
         year = input("Enter your intake year: ").strip()
         user_unit_code = input("Enter unit code to update: ").strip().upper()
-        unit_name, semesters_str, assign, test, final = get_info(year, user_unit_code)
+        try:
+            unit_name, semesters_str, assign, test, final = get_info(year, user_unit_code)
+        except (HandbookOffline, HandbookUnavailable) as e:
+            print(f"{e}. Update canceled.")
+            return
 
         if unit_name is None:
             print(f"No unit found for {user_unit_code} in year {year}. Update canceled.")
@@ -59,39 +58,28 @@ class UpdateMenu():
         updated = False
         updated_info = None
 
-        # Try updating in core_units.json
-        if user_unit_code in core_units_data:
-            core_units_data[user_unit_code].update({
-                "unit_name": unit_name,
-                "sem_available": semesters_str,
-                "assign": assign,
-                "test": test,
-                "final": final
-            })
-            updated = True
-            updated_info = core_units_data[user_unit_code]
-
-        # Try updating in elective_units.json
-        elif user_unit_code in elective_units_data:
-            elective_units_data[user_unit_code].update({
-                "unit_name": unit_name,
-                "sem_available": semesters_str,
-                "assign": assign,
-                "test": test,
-                "final": final
-            })
-            updated = True
-            updated_info = elective_units_data[user_unit_code]
+        refreshed = {
+            "unit_name": unit_name,
+            "sem_available": semesters_str,
+            "assign": assign,
+            "test": test,
+            "final": final
+        }
+
+        # Try updating in core units, then in elective units
+        for kind, units_data in (("core", core_units_data), ("elective", elective_units_data)):
+            if user_unit_code in units_data:
+                units_data[user_unit_code].update(refreshed)
+                updated = True
+                updated_info = units_data[user_unit_code]
+                break
 
         if not updated:
             print(f"{user_unit_code} not found in either core or elective files.")
             return
 
-        # Save changes
-        with open(file_path_core, "w", encoding="utf-8") as f:
-            json.dump(core_units_data, f, indent=4)
-        with open(file_path_elective, "w", encoding="utf-8") as f:
-            json.dump(elective_units_data, f, indent=4)
+        # Save changes, only the refreshed unit is stored for the user
+        store.update_unit(username, kind, user_unit_code, refreshed)
 
         # Display updated info
         print("\nUpdated Unit Information:")
@@ -119,14 +107,7 @@ class ViewMenu:
         Read a specific semester's planning JSON for a user
         Returns dict of {unit_code: status} or None if file doesn't exist
         """
-        user_folder = Path("user_info") / username
-        filename = f"Y{year}S{sem}_units.json"
-        file_path = user_folder / filename
-        
-        if file_path.is_file():
-            with open(file_path, 'r') as f:
-                return json.load(f)
-        return None
+        return get_store().load_plan(username, f"Y{year}S{sem}")
 
     def get_all_user_plans(self, username):
         """
@@ -134,35 +115,21 @@ class ViewMenu:
         Only includes semesters that have saved JSON files
         Returns dict: {"Y1S1": {unit: status}, "Y1S2": {...}, ...}
         """
-        all_plans = {}
-        
-        # Check all possible semesters
-        for year in range(1, 4):  # Years 1-3
-            for sem in range(1, 3):  # Semesters 1-2
-                semester_key = f"Y{year}S{sem}"
-                plan = self.read_user_semester_plan(username, year, sem)
-                if plan is not None:  # Only add if file exists
-                    all_plans[semester_key] = plan
+        # Possible semesters, years 1-3 and semesters 1-2
+        semester_keys = {f"Y{year}S{sem}" for year in range(1, 4) for sem in range(1, 3)}
         
-        return all_plans
+        # One read of every saved semester instead of one per possible semester
+        all_plans = get_store().load_plans(username)
+        return {key: plan for key, plan in all_plans.items() if key in semester_keys}
     
 
     def load_unit_names(self, username):
-        core_file = Path(f"user_info/{username}/core_units.json")
-        elective_file = Path(f"user_info/{username}/elective_units.json")
+        store = get_store()
         unit_names = {}
         
-        if core_file.is_file():
-            with open(core_file, 'r', encoding='utf-8') as f:
-                core_units = json.load(f)
-                for code, info in core_units.items():
-                    unit_names[code] = info.get("unit_name", "")
-        
-        if elective_file.is_file():
-            with open(elective_file, 'r', encoding='utf-8') as f:
-                elective_units = json.load(f)
-                for code, info in elective_units.items():
-                    unit_names[code] = info.get("unit_name", "")
+        for kind in ("core", "elective"):
+            for code, info in store.load_units(username, kind).items():
+                unit_names[code] = info.get("unit_name", "")
         
         return unit_names
 
@@ -181,6 +148,10 @@ class ViewMenu:
         # Load unit names
         unit_names = self.load_unit_names(username)
         
+        # matplotlib is only loaded once a plan is drawn
+        import matplotlib.pyplot as plt
+        from matplotlib.patches import Rectangle
+
         fig, ax = plt.subplots(figsize=(12, len(user_plans) * 1.5))
         semesters = sorted(user_plans.keys())  # Y1S1, Y1S2, etc.
         y_pos = len(semesters) - 1
@@ -234,9 +205,9 @@ class ViewMenu:
         plt.title(f'Course Plan for {username}', fontsize=14, fontweight='bold')
         plt.tight_layout()
         
-        # Save to user_info folder
-        user_folder = Path("user_info") / username
-        output_path = user_folder / f'{username}_course_structure.png'
+        # Save where the store keeps the user's course PNG
+        output_path = get_store().plan_image_path(username)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
         plt.savefig(output_path, dpi=150, bbox_inches='tight')
         print(f"Course structure saved to {output_path}")
         plt.close()
@@ -252,6 +223,9 @@ class ViewMenu:
 
         unit_names = self.load_unit_names(username)
 
+        import matplotlib.pyplot as plt
+        from matplotlib.patches import Rectangle
+
         fig, ax = plt.subplots(figsize=(12, len(user_plans) * 1.5))
         semesters = sorted(user_plans.keys())
         y_pos = len(semesters) - 1
@@ -293,9 +267,8 @@ class ViewMenu:
     def run(self):
         username = input("Enter username to view planner: ")
         
-        # Check if user folder exists
-        user_folder = Path("user_info") / username
-        if not user_folder.exists():
+        # Check if user exists
+        if not get_store().user_exists(username):
             print(f"No planning data found for user: {username}")
         else:
             print(f"Viewing current planner for {username}...")
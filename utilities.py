@@ -13,12 +13,18 @@ def read_integer(prompt, start, end):
 def initialize_user(data):
     """
     Helper function to initialize user info, core planner, and elective planner
+
+    The result is kept in session_cache, repeat calls for the same user and semester
+    get a copy of it until it expires or something in the user's folder changes
     """
     # Import here to avoid circular import
     from core_planner import PlannerForCore, UserInfo
     from elective_planner import PlannerForElective
     from pass_info import PreviousDetails
     from update_result import UpdateResult
+    from session_cache import session_cache
+    from storage import get_store
+    from catalog import get_catalog
     
     username = data.get('username')
     intake = data.get('intake')
@@ -26,6 +32,12 @@ def initialize_user(data):
     year = data.get('year')
     sem = data.get('semester')
 
+    session_key = (username, int(stream), int(year), int(sem), int(intake))
+    # The user's unit info is the shared catalog plus their overrides, so both versions count
+    cached = session_cache.get(session_key, (get_store().version(username), get_catalog().version))
+    if cached is not None:
+        return cached
+
     # Initialize UserInfo
     user_info = UserInfo()
     user_info.user_basic_info_web(username, stream, year, sem, intake)
@@ -42,6 +54,7 @@ def initialize_user(data):
     core_planner = PlannerForCore(user_info, pass_info)
     core_planner.read_core_unit()
     core_planner.save_user_core()
+    core_planner.completed_list = pass_info.saved_all_pass_unit()
 
     # Set current semester
     if user_info.intake == 2 and user_info.sem == 1:
@@ -58,4 +71,8 @@ def initialize_user(data):
     elective_planner.read_elective()
     elective_planner.save_user_elective()
 
+    # Fingerprint is taken after the build because save_user_core/save_user_elective may write
+    session_cache.put(session_key, (get_store().version(username), get_catalog().version),
+                      (user_info, core_planner, elective_planner))
+
     return user_info, core_planner, elective_planner
\ No newline at end of file